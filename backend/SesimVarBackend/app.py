@@ -5,6 +5,7 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flasgger import Swagger
 from dotenv import load_dotenv
+import os
 
 # 🔗 Blueprint'leri import et
 from routes.auth_routes import auth_bp
@@ -16,13 +17,24 @@ from routes.push_routes import push_bp
 from routes.simulation_routes import simulation_bp
 from routes.address import address_bp
 from routes.neighborhood import neighborhood_bp
+from routes.monitoring_routes import monitoring_bp
+from routes.alert_routes import alert_bp
+from routes.map_routes import map_bp
+from routes.triage_routes import triage_bp
+from db import init_app as init_db, LAST_WRITE_HEADER
 from scheduler import start_scheduler
+from utils.heatmap import start_heatmap_refresh
+from utils.clusters import start_cluster_refresh
+from utils.write_behind import start_safe_status_writer
 
 # Diğer blueprint'leri de taşıdıkça buraya eklenecek: profile_bp, help_bp, safe_bp
 load_dotenv()
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=[LAST_WRITE_HEADER])
+
+# 🗄️ İstek sonunda havuz bağlantılarını otomatik iade et
+init_db(app)
 
 # 🔐 Rate Limiting
 limiter = Limiter(get_remote_address, app=app, default_limits=["100 per hour"])
@@ -73,7 +85,17 @@ app.register_blueprint(push_bp)
 app.register_blueprint(simulation_bp)
 app.register_blueprint(address_bp)
 app.register_blueprint(neighborhood_bp)
-start_scheduler()
+app.register_blueprint(monitoring_bp)
+app.register_blueprint(alert_bp)
+app.register_blueprint(map_bp)
+app.register_blueprint(triage_bp)
+start_heatmap_refresh()
+start_cluster_refresh()
+start_safe_status_writer()
+
+# ⏰ Zamanlayıcı ayrı süreçte çalışıyorsa (python scheduler.py) EMBEDDED_SCHEDULER=0
+if os.getenv("EMBEDDED_SCHEDULER", "1") == "1":
+    start_scheduler()
 
 # 🚀 Uygulama Başlatma
 if __name__ == "__main__":
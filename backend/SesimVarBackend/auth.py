@@ -7,6 +7,7 @@ from dotenv import load_dotenv  # .env dosyasını okuyabilmek için
 
 load_dotenv()  # .env dosyasını yükle
 JWT_SECRET = os.getenv("JWT_SECRET")
+ALERTS_API_KEY = os.getenv("ALERTS_API_KEY")
 
 def token_required(f):
     @wraps(f)
@@ -36,3 +37,14 @@ def token_required(f):
         return f(*args, **kwargs)
     return decorated
 
+
+def api_key_required(f):
+    # Operasyon uçları (uyarı gönderme vb.) için X-Api-Key kontrolü
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not ALERTS_API_KEY:
+            return jsonify({"status": "error", "message": "API anahtarı yapılandırılmamış"}), 503
+        if request.headers.get("X-Api-Key") != ALERTS_API_KEY:
+            return jsonify({"status": "error", "message": "Geçersiz API anahtarı"}), 401
+        return f(*args, **kwargs)
+    return decorated
@@ -1,19 +1,324 @@
 # -*- coding: utf-8 -*-
+import hashlib
+import hmac
 import mysql.connector
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+from flask import g, has_app_context, has_request_context, request
 from dotenv import load_dotenv
 
-load_dotenv()  
+load_dotenv()
+
+# 🔧 Havuz ayarları (worker başına)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+
+# 📖 Okuma replikaları: "host:port,host:port" (kullanıcı/şifre/veritabanı birincil ile aynı)
+DB_REPLICA_HOSTS = [h.strip() for h in os.getenv("DB_REPLICA_HOSTS", "").split(",") if h.strip()]
+# Kullanıcının kendi yazımından sonra okumaları bu süre boyunca birincile yönlendir
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+# Son yazım zamanı (epoch sn) istemciye çerez ve başlık olarak verilir; sonraki istek hangi
+# worker'a düşerse düşsün geri gönderilen değerle birincile yönlendirilir. Değer kullanıcıya
+# bağlı olarak imzalanır: istemci uydurma/ileri tarihli damgayla okumaları birincide tutamaz
+LAST_WRITE_COOKIE = "sv_last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+_LAST_WRITE_KEY = (os.getenv("JWT_SECRET") or "").encode()
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def _connect(host, port):
+    return mysql.connector.connect(
+        host=host,
+        port=port,
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=os.getenv("DB_NAME")
+    )
+
+
+def _split_host(value, default_port=3306):
+    host, _, port = value.partition(":")
+    return host, int(port) if port else default_port
+
+
+class PooledConnection:
+    """Havuzdan alınan bağlantı. close() bağlantıyı kapatmaz, havuza iade eder."""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """Boyutu sınırlı, alımda ping ile canlılık kontrolü yapan MySQL bağlantı havuzu."""
+
+    def __init__(self, connect, name="primary", size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT):
+        self._connect = connect
+        self.name = name
+        self.size = size
+        self.timeout = timeout
+        self._idle = deque()
+        self._cond = threading.Condition()
+        self._open = 0
+        self._in_use = 0
+        self._waiters = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._errors = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        with self._cond:
+            while not self._idle and self._open >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(f"{timeout} sn içinde boş bağlantı bulunamadı")
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+
+            raw = self._idle.pop() if self._idle else None
+            if raw is None:
+                self._open += 1
+            self._in_use += 1
+            self._checkouts += 1
+            waited = time.monotonic() - start
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        try:
+            if raw is None:
+                raw = self._connect()
+            else:
+                # Boşta beklerken düşmüş bağlantıları yeniden kur
+                raw.ping(reconnect=True, attempts=1, delay=0)
+        except Exception:
+            self._discard(raw)
+            raise
+
+        return PooledConnection(self, raw)
+
+    def release(self, raw):
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+
+        with self._cond:
+            self._idle.append(raw)
+            self._in_use -= 1
+            self._cond.notify()
+
+    def _discard(self, raw):
+        if raw is not None:
+            try:
+                raw.close()
+            except Exception:
+                pass
+        with self._cond:
+            self._open -= 1
+            self._in_use -= 1
+            self._errors += 1
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "name": self.name,
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiters": self._waiters,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "errors": self._errors,
+                "avg_wait_ms": round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+            }
+
+
+_pools = None
+_pools_pid = None
+_pools_lock = threading.Lock()
+_replica_cursor = 0
+
+_recent_writes = {}
+_recent_writes_lock = threading.Lock()
+
+
+def _get_pools():
+    global _pools, _pools_pid
+    # Fork sonrası (gunicorn worker) ebeveynin bağlantıları paylaşılmasın
+    if _pools is None or _pools_pid != os.getpid():
+        with _pools_lock:
+            if _pools is None or _pools_pid != os.getpid():
+                primary = _split_host(os.getenv("DB_HOST") or "localhost", int(os.getenv("DB_PORT", "3306")))
+                replicas = [_split_host(h) for h in DB_REPLICA_HOSTS]
+                _pools = {
+                    "primary": ConnectionPool(partial(_connect, *primary)),
+                    "replicas": [
+                        ConnectionPool(partial(_connect, host, port), name=f"replica:{host}:{port}")
+                        for host, port in replicas
+                    ],
+                }
+                _pools_pid = os.getpid()
+    return _pools
+
+
+def get_pool():
+    return _get_pools()["primary"]
+
+
+def pool_stats():
+    pools = _get_pools()
+    return {
+        "primary": pools["primary"].stats(),
+        "replicas": [p.stats() for p in pools["replicas"]],
+    }
+
+
+def mark_user_write(user_id):
+    now = time.time()
+    with _recent_writes_lock:
+        _recent_writes[user_id] = now
+        if len(_recent_writes) > 10000:
+            cutoff = now - DB_READ_YOUR_WRITES_SECONDS
+            for uid in [u for u, t in _recent_writes.items() if t < cutoff]:
+                del _recent_writes[uid]
+    return now
+
+
+def _last_write_signature(user_id, written_at):
+    message = f"{user_id}:{written_at}".encode()
+    return hmac.new(_LAST_WRITE_KEY, message, hashlib.sha256).hexdigest()[:32]
+
+
+def sign_last_write(user_id, written_at):
+    written_at = f"{written_at:.3f}"
+    return f"{written_at}:{_last_write_signature(user_id, written_at)}"
+
+
+def _client_last_write(user_id):
+    """
+    İstemcinin geri gönderdiği son yazım zamanı (başlık öncelikli; mobil istemciler çerez tutmayabilir).
+    İmzası tutmayan değer yok sayılır; gelecekteki damga (sunucular arası saat farkı) şimdiye kırpılır.
+    """
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    if not value or not _LAST_WRITE_KEY:
+        return None
+    written_at, _, signature = value.partition(":")
+    if not hmac.compare_digest(signature, _last_write_signature(user_id, written_at)):
+        return None
+    try:
+        return min(float(written_at), time.time())
+    except ValueError:
+        return None
+
+
+def _wrote_recently(user_id):
+    """
+    Aynı worker'daki yazım bellekte, başka worker'daki yazım istemcinin taşıdığı imzalı zaman damgasıyla görülür.
+    Damgayı göndermeyen istemci için yönlendirme yalnızca bu süreçteki yazımları kapsar.
+    """
+    with _recent_writes_lock:
+        last = _recent_writes.get(user_id)
+    client_last = _client_last_write(user_id)
+    if client_last is not None:
+        last = max(last or 0, client_last)
+    return last is not None and 0 <= time.time() - last < DB_READ_YOUR_WRITES_SECONDS
+
+
+def _track(conn):
+    # İstek içinde alınan bağlantılar istek sonunda otomatik iade edilir
+    if has_app_context():
+        g.setdefault("_db_connections", []).append(conn)
+    return conn
+
 
 def get_db_connection():
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv("DB_HOST"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_NAME")
-        )
-        return conn
+        conn = get_pool().acquire()
     except Exception as e:
         print("? Veritabanı bağlantı hatası:", e)
         return None
+    return _track(conn)
+
+
+def get_read_connection():
+    """Salt okunur sorgular için replikadan bağlantı; replika yoksa veya kullanıcı az önce yazdıysa birincil."""
+    global _replica_cursor
+    replicas = _get_pools()["replicas"]
+    user_id = getattr(request, "user_id", None) if has_request_context() else None
+
+    if replicas and not (user_id is not None and _wrote_recently(user_id)):
+        _replica_cursor += 1
+        for i in range(len(replicas)):
+            pool = replicas[(_replica_cursor + i) % len(replicas)]
+            try:
+                return _track(pool.acquire())
+            except Exception as e:
+                print(f"? Replika bağlantı hatası ({pool.name}):", e)
+
+    return get_db_connection()
+
+
+@contextmanager
+def db_connection():
+    conn = get_pool().acquire()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _release_request_connections(exc=None):
+    for conn in g.pop("_db_connections", []):
+        conn.close()
+
+
+def _remember_user_write(response):
+    user_id = getattr(request, "user_id", None)
+    if user_id is not None and request.method in ("POST", "PUT", "DELETE") and response.status_code < 400:
+        written_at = sign_last_write(user_id, mark_user_write(user_id))
+        response.headers[LAST_WRITE_HEADER] = written_at
+        response.set_cookie(LAST_WRITE_COOKIE, written_at, max_age=int(DB_READ_YOUR_WRITES_SECONDS) + 1,
+                            httponly=True, samesite="Lax")
+    return response
+
+
+def init_app(app):
+    app.after_request(_remember_user_write)
+    app.teardown_appcontext(_release_request_connections)
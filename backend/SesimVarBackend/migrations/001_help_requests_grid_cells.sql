@@ -0,0 +1,13 @@
+-- Yardım çağrıları için ızgara hücresi (utils/geo.cell_of).
+-- classify_zone_risk ABS() taraması yerine 9 hücrenin cell_id aralıklarını okur; pencereli sayım
+-- (cell_id, created_at) indeksiyle yapılır (011). zone_cell_counts sayacı artık kullanılmıyor, 016'da kaldırılır.
+-- Mevcut kayıtlar için: python -m scripts.backfill_zone_cells
+
+ALTER TABLE help_requests
+    ADD COLUMN cell_id INT NULL,
+    ADD INDEX idx_help_requests_cell (cell_id);
+
+CREATE TABLE IF NOT EXISTS zone_cell_counts (
+    cell_id INT NOT NULL PRIMARY KEY,
+    call_count INT NOT NULL DEFAULT 0
+);
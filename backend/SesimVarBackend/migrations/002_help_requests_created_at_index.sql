@@ -0,0 +1,4 @@
+-- Isı haritası başlangıçta son 24 saati created_at aralığıyla yükler.
+
+ALTER TABLE help_requests
+    ADD INDEX idx_help_requests_created (created_at);
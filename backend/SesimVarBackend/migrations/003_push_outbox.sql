@@ -0,0 +1,30 @@
+-- Kalıcı push kuyruğu (outbox). Route'lar buraya yazar, push_worker.py süreçleri boşaltır.
+-- push_messages.next_attempt_at hem yeniden deneme zamanı hem kiralama (lease) bitişidir:
+-- kiralanan mesajın zamanı ileri alınır, worker ölürse süre dolunca mesaj yeniden alınır.
+
+CREATE TABLE IF NOT EXISTS push_jobs (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    kind VARCHAR(32) NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    body TEXT NOT NULL,
+    dedupe_key VARCHAR(128) NULL,
+    total INT NOT NULL DEFAULT 0,
+    created_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    UNIQUE KEY uq_push_jobs_dedupe (dedupe_key)
+);
+
+CREATE TABLE IF NOT EXISTS push_messages (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    job_id BIGINT NOT NULL,
+    token VARCHAR(255) NOT NULL,
+    status ENUM('pending', 'sent', 'failed', 'dead') NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    next_attempt_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    lease_owner VARCHAR(64) NULL,
+    ticket_id VARCHAR(64) NULL,
+    last_error VARCHAR(255) NULL,
+    sent_at DATETIME(3) NULL,
+    UNIQUE KEY uq_push_messages_job_token (job_id, token),
+    INDEX idx_push_messages_due (status, next_attempt_at),
+    CONSTRAINT fk_push_messages_job FOREIGN KEY (job_id) REFERENCES push_jobs (id) ON DELETE CASCADE
+);
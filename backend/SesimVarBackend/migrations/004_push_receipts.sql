@@ -0,0 +1,7 @@
+-- Expo receipt takibi. Gönderilen mesajın ticket'ı ~15 dk sonra getReceipts ile sorgulanır;
+-- DeviceNotRegistered dönen token'lar silinir.
+
+ALTER TABLE push_messages
+    ADD COLUMN receipt_checked_at DATETIME(3) NULL,
+    ADD COLUMN receipt_error VARCHAR(64) NULL,
+    ADD INDEX idx_push_messages_receipt (status, receipt_checked_at, id);
@@ -0,0 +1,7 @@
+-- Bölgesel deprem uyarısı hedef kitlesi: episentr çevresindeki mahalleler -> adresler -> token'lar.
+
+ALTER TABLE neighborhoods
+    ADD INDEX idx_neighborhoods_lat_lon (latitude, longitude);
+
+ALTER TABLE addresses
+    ADD INDEX idx_addresses_neighborhood (neighborhood_id);
@@ -0,0 +1,27 @@
+-- Tek push token kaydı. notification_tokens ve expo_push_tokens birleştirilir;
+-- aynı token yalnızca bir kez (son kaydeden kullanıcıya ait) tutulur.
+-- Tüm gönderim yolları push_tokens'ı okur. Eski tablolar geri dönüş için bırakılmıştır,
+-- yeni sürüm yayındayken kaldırılabilir.
+
+CREATE TABLE IF NOT EXISTS push_tokens (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    token VARCHAR(255) NOT NULL,
+    device_id VARCHAR(128) NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_seen_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_push_tokens_token (token),
+    INDEX idx_push_tokens_user (user_id, last_seen_at)
+);
+
+INSERT INTO push_tokens (user_id, token)
+SELECT user_id, expo_token
+FROM notification_tokens
+WHERE expo_token IS NOT NULL AND expo_token <> ''
+ON DUPLICATE KEY UPDATE user_id = VALUES(user_id);
+
+INSERT INTO push_tokens (user_id, token)
+SELECT user_id, token
+FROM expo_push_tokens
+WHERE token IS NOT NULL AND token <> ''
+ON DUPLICATE KEY UPDATE user_id = VALUES(user_id);
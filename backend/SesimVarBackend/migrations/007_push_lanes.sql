@@ -0,0 +1,17 @@
+-- Push öncelik şeritleri: emergency (can güvenliği), general, test.
+-- Worker'lar şerit başına ayrı eşzamanlılık bütçesiyle kiralar; emergency bekliyorsa diğerleri durur.
+
+ALTER TABLE push_jobs
+    ADD COLUMN lane ENUM('emergency', 'general', 'test') NOT NULL DEFAULT 'general';
+
+ALTER TABLE push_messages
+    ADD COLUMN lane ENUM('emergency', 'general', 'test') NOT NULL DEFAULT 'general',
+    DROP INDEX idx_push_messages_due,
+    ADD INDEX idx_push_messages_due (status, lane, next_attempt_at),
+    ADD INDEX idx_push_messages_lane_sent (lane, sent_at);
+
+UPDATE push_jobs SET lane = 'emergency' WHERE kind IN ('earthquake', 'broadcast');
+
+UPDATE push_messages m
+JOIN push_jobs j ON j.id = m.job_id
+SET m.lane = j.lane;
@@ -0,0 +1,8 @@
+-- Zamanlayıcı lider seçimi. Her satır bir kira (lease): süresi dolmadan yenileyen süreç lider kalır,
+-- lider ölürse expires_at geçtikten sonra başka bir süreç kirayı devralır.
+
+CREATE TABLE IF NOT EXISTS scheduler_leases (
+    name VARCHAR(64) NOT NULL PRIMARY KEY,
+    owner VARCHAR(128) NOT NULL,
+    expires_at DATETIME(3) NOT NULL
+);
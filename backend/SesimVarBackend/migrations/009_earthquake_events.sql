@@ -0,0 +1,24 @@
+-- Deprem olay akışı (feed) alımı. Her olay id ile bir kez kaydedilir; eşik altı olaylar da
+-- 'ignored' olarak tutulur ki tekrar değerlendirilmesin.
+-- feed_cursors kaynak başına en son görülen olay zamanını (high-water mark) saklar;
+-- yeniden başlatmada eski olaylar için tekrar uyarı gönderilmez.
+
+CREATE TABLE IF NOT EXISTS earthquake_events (
+    id VARCHAR(64) NOT NULL PRIMARY KEY,
+    source VARCHAR(64) NOT NULL,
+    magnitude DECIMAL(3, 1) NOT NULL,
+    latitude DECIMAL(10, 7) NOT NULL,
+    longitude DECIMAL(10, 7) NOT NULL,
+    depth_km DECIMAL(6, 2) NULL,
+    place VARCHAR(255) NULL,
+    occurred_at DATETIME(3) NOT NULL,
+    detected_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    status ENUM('ignored', 'alerted') NOT NULL,
+    INDEX idx_earthquake_events_detected (detected_at)
+);
+
+CREATE TABLE IF NOT EXISTS feed_cursors (
+    source VARCHAR(64) NOT NULL PRIMARY KEY,
+    high_water DATETIME(3) NOT NULL,
+    updated_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3)
+);
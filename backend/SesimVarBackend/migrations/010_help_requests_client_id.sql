@@ -0,0 +1,6 @@
+-- Çevrimdışı kuyruğa alınıp toplu gönderilen çağrılar için istemci kimliği.
+-- Bağlantı geri geldiğinde aynı paket tekrar gönderilirse çağrılar iki kez yazılmaz.
+
+ALTER TABLE help_requests
+    ADD COLUMN client_id VARCHAR(64) NULL,
+    ADD UNIQUE KEY uq_help_requests_client (user_id, client_id);
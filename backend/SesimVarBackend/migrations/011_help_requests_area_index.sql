@@ -0,0 +1,6 @@
+-- Harita görünümü (bbox) sorgusu: hücre aralıkları + created_at sırası tek indeksten okunur.
+-- idx_help_requests_cell bu indeksin ön eki olduğundan kaldırılır.
+
+ALTER TABLE help_requests
+    ADD INDEX idx_help_requests_cell_created (cell_id, created_at),
+    DROP INDEX idx_help_requests_cell;
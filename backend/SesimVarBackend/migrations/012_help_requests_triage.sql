@@ -0,0 +1,12 @@
+-- Ekip triyaj kuyruğu. Öncelik saklanan üretilmiş sütundur: user_risk/zone_risk her nereden
+-- yazılırsa yazılsın (oluşturma, toplu gönderim, toplu yeniden hesaplama) kendiliğinden güncel kalır.
+-- Kuyruk sırası (öncelik azalan, en eski önce) doğrudan indeksten okunur; sahiplenme kira (lease) ile.
+
+ALTER TABLE help_requests
+    ADD COLUMN triage_priority TINYINT AS (
+        (user_risk = 'kritik') * 3
+        + CASE zone_risk WHEN 'yüksek' THEN 2 WHEN 'orta' THEN 1 ELSE 0 END
+    ) STORED,
+    ADD COLUMN claimed_by VARCHAR(64) NULL,
+    ADD COLUMN claim_expires_at DATETIME(3) NULL,
+    ADD INDEX idx_help_requests_triage (status, triage_priority DESC, created_at, id);
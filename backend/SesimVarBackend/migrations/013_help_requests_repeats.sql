@@ -0,0 +1,6 @@
+-- Aynı kullanıcının kısa sürede aynı yerden tekrar gönderdiği çağrılar tek olayda birleştirilir;
+-- yeni satır yerine repeat_count artırılır ve mesaj güncellenir.
+
+ALTER TABLE help_requests
+    ADD COLUMN repeat_count INT NOT NULL DEFAULT 0,
+    ADD COLUMN last_repeat_at DATETIME NULL;
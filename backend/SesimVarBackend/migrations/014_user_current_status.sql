@@ -0,0 +1,27 @@
+-- Kullanıcı başına güncel durum (son "güvendeyim" konumu + son yardım çağrısının durumu).
+-- safe_status ve help_requests yalnızca eklenerek büyür; harita ve toplu sorgular bu tablodan
+-- birincil anahtarla okur. Her yazımda aynı işlemde güncellenir.
+
+CREATE TABLE IF NOT EXISTS user_current_status (
+    user_id INT NOT NULL PRIMARY KEY,
+    safe_latitude DECIMAL(10, 7) NULL,
+    safe_longitude DECIMAL(10, 7) NULL,
+    safe_at DATETIME NULL,
+    help_id INT NULL,
+    help_status VARCHAR(20) NULL,
+    help_at DATETIME NULL,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_user_current_status_help (help_id)
+);
+
+-- Mevcut veriden doldur
+INSERT INTO user_current_status (user_id, safe_latitude, safe_longitude, safe_at)
+SELECT s.user_id, s.latitude, s.longitude, s.created_at
+FROM safe_status s
+JOIN (SELECT user_id, MAX(id) AS id FROM safe_status GROUP BY user_id) latest ON latest.id = s.id;
+
+INSERT INTO user_current_status (user_id, help_id, help_status, help_at)
+SELECT h.user_id, h.id, h.status, COALESCE(h.last_repeat_at, h.created_at)
+FROM help_requests h
+JOIN (SELECT user_id, MAX(id) AS id FROM help_requests GROUP BY user_id) latest ON latest.id = h.id
+ON DUPLICATE KEY UPDATE help_id = VALUES(help_id), help_status = VALUES(help_status), help_at = VALUES(help_at);
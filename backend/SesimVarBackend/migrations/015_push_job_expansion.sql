@@ -0,0 +1,9 @@
+-- Büyük kitleli işler (tatbikat) istek içinde değil push_worker'da genişletilir:
+-- route yalnızca hedef tanımını (audience) yazar, worker token'ları push_messages'a ekler.
+-- Genişletme tek işlemdedir; worker yarıda ölürse iş 'pending' kalır ve başka worker alır.
+
+ALTER TABLE push_jobs
+    ADD COLUMN audience JSON NULL,
+    ADD COLUMN expand_status ENUM('pending', 'done', 'failed') NOT NULL DEFAULT 'done',
+    ADD COLUMN expand_error VARCHAR(255) NULL,
+    ADD INDEX idx_push_jobs_expand (expand_status, id);
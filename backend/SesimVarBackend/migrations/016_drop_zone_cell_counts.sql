@@ -0,0 +1,4 @@
+-- Bölge riski help_requests üzerinden pencereli sayılır ((cell_id, created_at) indeksi, 011);
+-- hücre başına toplam sayaç okunmuyordu, her çağrı yazımında boşuna sıcak satır güncelleniyordu.
+
+DROP TABLE IF EXISTS zone_cell_counts;
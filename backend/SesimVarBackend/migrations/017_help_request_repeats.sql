@@ -0,0 +1,11 @@
+-- Toplu (çevrimdışı) gönderimde mevcut olaya eklenen çağrıların client_id'leri. Birleşen çağrının
+-- kendi help_requests satırı olmadığından paket tekrar gönderilince "duplicate" buradan anlaşılır.
+
+CREATE TABLE IF NOT EXISTS help_request_repeats (
+    user_id INT NOT NULL,
+    client_id VARCHAR(64) NOT NULL,
+    help_id INT NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, client_id),
+    INDEX idx_help_request_repeats_help (help_id)
+);
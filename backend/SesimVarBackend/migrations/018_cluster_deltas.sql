@@ -0,0 +1,9 @@
+-- Harita küme indeksi (utils/clusters) her worker'da kısa aralıkla yalnızca değişen satırları okur.
+-- changed_at her UPDATE'te (tekrar basış, durum, konum, risk yeniden hesaplama) kendiliğinden ilerler.
+
+ALTER TABLE help_requests
+    ADD COLUMN changed_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+    ADD INDEX idx_help_requests_changed (changed_at);
+
+ALTER TABLE user_current_status
+    ADD INDEX idx_user_current_status_updated (updated_at);
@@ -0,0 +1,172 @@
+# push_worker.py
+# -*- coding: utf-8 -*-
+"""
+Outbox (push_messages) boşaltan bağımsız worker süreçleri.
+Yatay ölçekleme için birden fazla makinede/süreçte aynı anda çalıştırılabilir.
+Her süreç şerit (emergency/general/test) başına ayrı bir thread ve eşzamanlılık bütçesi kullanır;
+gönderilmeyi bekleyen acil mesaj varken alt şeritler yeni mesaj kiralamaz.
+
+Kullanım:
+    python push_worker.py --processes 4
+    python push_worker.py --lanes emergency
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+from db import db_connection
+from utils.notifications import FanoutEngine, build_message
+from utils.push_outbox import (LANES, LANE_CONCURRENCY, PUSH_LEASE_SECONDS, emergency_due, expand_pending_job,
+                               lease_messages, record_results, renew_lease)
+
+PUSH_WORKER_BATCH = int(os.getenv("PUSH_WORKER_BATCH", "1000"))
+PUSH_WORKER_IDLE_SLEEP = float(os.getenv("PUSH_WORKER_IDLE_SLEEP", "0.5"))
+
+
+class LeaseRenewer:
+    """
+    Gönderim sürerken kiralanan satırların kirasını PUSH_LEASE_SECONDS / 3'te bir uzatır; böylece
+    Expo tekrar denemeleri kiradan uzun sürse de satırlar başka worker'a geçip iki kez gönderilmez.
+    Satırlardan biri başka worker'a geçmişse veya kira yenilenemeden dolmak üzereyse `lost` kurulur;
+    FanoutEngine kalan partileri göndermez (yalnızca uçuştakiler tamamlanır).
+    """
+
+    def __init__(self, worker_id, ids, ttl=PUSH_LEASE_SECONDS):
+        self.worker_id = worker_id
+        self.ids = ids
+        self.interval = ttl / 3
+        self.ttl = ttl
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        valid_until = time.monotonic() + self.ttl
+        while not self._stop.wait(self.interval):
+            started = time.monotonic()
+            try:
+                with db_connection() as conn:
+                    kept = renew_lease(conn, self.worker_id, self.ids)
+                if kept < len(self.ids):
+                    print(f"[PUSH_WORKER] {self.worker_id} kira kaybedildi ({kept}/{len(self.ids)}), gönderim kesiliyor")
+                    self.lost.set()
+                    return
+                valid_until = started + self.ttl
+            except Exception as e:
+                print(f"[PUSH_WORKER ERROR] Kira yenilenemedi: {e}")
+            if time.monotonic() + self.interval >= valid_until:
+                print(f"[PUSH_WORKER] {self.worker_id} kira dolmak üzere, gönderim kesiliyor")
+                self.lost.set()
+                return
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name="lease-renewer", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_lane(lane, worker_id, batch_size, stopping):
+    engine = FanoutEngine(concurrency=LANE_CONCURRENCY[lane], per_host=LANE_CONCURRENCY[lane])
+
+    while not stopping.is_set():
+        try:
+            with db_connection() as conn:
+                # Alt şeritler acil kuyruk boşalana kadar bekler
+                if lane != "emergency" and emergency_due(conn):
+                    rows = []
+                else:
+                    rows = lease_messages(conn, worker_id, batch_size, lane)
+
+            if not rows:
+                stopping.wait(PUSH_WORKER_IDLE_SLEEP)
+                continue
+
+            messages = [build_message(r["token"], r["title"], r["body"]) for r in rows]
+            with LeaseRenewer(worker_id, [r["id"] for r in rows]) as lease:
+                report = engine.send(messages, cancelled=lease.lost)
+            tickets = [ticket for _, ticket in report.tickets]
+
+            with db_connection() as conn:
+                result = record_results(conn, worker_id, rows, tickets)
+
+            print(f"[PUSH_WORKER] {worker_id} [{lane}] | {result} | {report.rate:.0f} mesaj/sn")
+
+        except Exception as e:
+            print(f"[PUSH_WORKER ERROR] [{lane}] {e}")
+            stopping.wait(PUSH_WORKER_IDLE_SLEEP)
+
+
+def run_expander(stopping):
+    # Route'ların ertelediği işlerin kitlesini çözüp kuyruğa ekler (HTTP isteğini bekletmeden)
+    while not stopping.is_set():
+        try:
+            with db_connection() as conn:
+                expanded = expand_pending_job(conn)
+            if expanded is None:
+                stopping.wait(PUSH_WORKER_IDLE_SLEEP)
+                continue
+            print(f"[PUSH_WORKER] İş #{expanded[0]} genişletildi ({expanded[1]} alıcı)")
+        except Exception as e:
+            print(f"[PUSH_WORKER ERROR] [expander] {e}")
+            stopping.wait(PUSH_WORKER_IDLE_SLEEP)
+
+
+def run_worker(batch_size=PUSH_WORKER_BATCH, lanes=LANES):
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"[:64]
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+
+    threads = [
+        threading.Thread(target=run_lane, args=(lane, worker_id, batch_size, stopping), name=f"lane-{lane}")
+        for lane in lanes
+    ]
+    threads.append(threading.Thread(target=run_expander, args=(stopping,), name="expander"))
+    for t in threads:
+        t.start()
+
+    print(f"✅ Push worker başladı ({worker_id}, şeritler: {', '.join(lanes)})")
+    # Ana thread sinyalleri alabilsin diye join zaman aşımıyla beklenir
+    while any(t.is_alive() for t in threads):
+        for t in threads:
+            t.join(timeout=0.5)
+
+    print(f"🛑 Push worker durdu ({worker_id})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Push outbox worker")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--batch", type=int, default=PUSH_WORKER_BATCH)
+    parser.add_argument("--lanes", default=",".join(LANES), help="Virgülle ayrılmış şerit listesi")
+    args = parser.parse_args()
+    lanes = tuple(lane for lane in args.lanes.split(",") if lane in LANES)
+
+    if args.processes == 1:
+        run_worker(args.batch, lanes)
+        return
+
+    procs = [multiprocessing.Process(target=run_worker, args=(args.batch, lanes)) for _ in range(args.processes)]
+    for p in procs:
+        p.start()
+
+    def stop(*_):
+        for p in procs:
+            p.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for p in procs:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()
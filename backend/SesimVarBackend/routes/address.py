@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from flask import Blueprint, request, jsonify
-from db import get_db_connection
+from db import get_db_connection, get_read_connection
 from auth import token_required
 
 address_bp = Blueprint("address", __name__, url_prefix="/user")
@@ -118,7 +118,7 @@ def get_address():
     try:
         user_id = request.user_id
 
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor(dictionary=True)
 
         cursor.execute("""
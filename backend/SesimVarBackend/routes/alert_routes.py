@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+from flask import Blueprint, request, jsonify
+from auth import api_key_required
+from utils.alerts import send_targeted_alert, ALERT_TITLE, ALERT_MESSAGE
+
+alert_bp = Blueprint('alert', __name__, url_prefix='/alerts')
+
+
+# 🚨 Bölgesel Deprem Uyarısı
+@alert_bp.route('/earthquake', methods=['POST'])
+@api_key_required
+def create_earthquake_alert():
+    """
+    Bölgesel Deprem Uyarısı Gönder
+    ---
+    tags:
+      - Uyarı
+    consumes:
+      - application/json
+    parameters:
+      - in: header
+        name: X-Api-Key
+        type: string
+        required: true
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            latitude:
+              type: number
+              example: 38.6766
+            longitude:
+              type: number
+              example: 39.2238
+            radius_km:
+              type: number
+              example: 50
+            rings_km:
+              type: array
+              description: Halkalar halinde genişletme (radius_km yerine)
+              items:
+                type: number
+              example: [25, 50, 100]
+            ring_delay_sec:
+              type: integer
+              description: Dış halkaların gönderim gecikmesi
+              example: 30
+            neighborhood_ids:
+              type: array
+              description: Episentr yerine doğrudan etkilenen mahalleler
+              items:
+                type: integer
+              example: [3, 7]
+            title:
+              type: string
+              example: "Deprem Uyarısı"
+            message:
+              type: string
+              example: "📢 Deprem tespit edildi. Güvende misiniz?"
+    responses:
+      202:
+        description: Uyarı kuyruğa alındı
+      400:
+        description: Eksik veya hatalı bilgi
+      401:
+        description: Geçersiz API anahtarı
+      500:
+        description: Sunucu hatası
+    """
+    try:
+        data = request.get_json() or {}
+        latitude = data.get("latitude")
+        longitude = data.get("longitude")
+        neighborhood_ids = data.get("neighborhood_ids")
+        rings_km = data.get("rings_km") or ([data["radius_km"]] if data.get("radius_km") else None)
+
+        if not neighborhood_ids and (latitude is None or longitude is None or not rings_km):
+            return jsonify({
+                "status": "error",
+                "message": "Episentr ve yarıçap (radius_km/rings_km) veya neighborhood_ids zorunludur."
+            }), 400
+
+        rings = send_targeted_alert(
+            latitude=latitude,
+            longitude=longitude,
+            rings_km=[float(r) for r in rings_km] if rings_km else None,
+            neighborhood_ids=[int(i) for i in neighborhood_ids] if neighborhood_ids else None,
+            title=data.get("title") or ALERT_TITLE,
+            message=data.get("message") or ALERT_MESSAGE,
+            ring_delay_sec=int(data.get("ring_delay_sec", 0)),
+        )
+
+        return jsonify({
+            "status": "success",
+            "message": "Uyarı kuyruğa alındı.",
+            "rings": rings
+        }), 202
+
+    except Exception as e:
+        print(f"[EARTHQUAKE_ALERT ERROR] {e}")
+        return jsonify({"status": "error", "message": "Uyarı gönderilemedi."}), 500
@@ -1,34 +1,116 @@
 # routes/help_routes.py
 
 from flask import Blueprint, request, jsonify
-from db import get_db_connection
+import mysql.connector
+from db import get_db_connection, get_read_connection
 from auth import token_required
+from utils.geo import cell_of, neighbor_cells, cell_center, cell_ranges, parse_bbox, haversine_km
+from utils.heatmap import heatmap, zone_risk_level, WINDOWS, ZONE_RISK_WINDOW
+from utils.risk_matcher import get_matcher
+from utils.clusters import help_clusters, help_risk_rank
+from utils.user_status import record_help, set_help_status, clear_help
+from datetime import datetime, timedelta
+import base64
+import os
+import time
+import uuid
 
 help_bp = Blueprint('help', __name__, url_prefix='/user')
 
+# Toplu gönderimde istek başına en fazla çağrı ve kabul edilen en eski istemci zamanı
+HELP_BULK_MAX = int(os.getenv("HELP_BULK_MAX", "500"))
+HELP_BULK_MAX_AGE_SEC = 7 * 24 * 60 * 60
+# Harita görünümü: sayfa boyutu üst sınırı ve en fazla kaç hücre satırı (~1.1 km) kapsanabileceği
+AREA_PAGE_MAX = int(os.getenv("AREA_PAGE_MAX", "500"))
+AREA_MAX_CELL_ROWS = int(os.getenv("AREA_MAX_CELL_ROWS", "200"))
+# Bu kadar hücreye kadar her hücre ayrı, sınırlı bir alt sorguyla okunur (bkz. area_query)
+AREA_UNION_MAX_CELLS = int(os.getenv("AREA_UNION_MAX_CELLS", "400"))
+# Aynı kullanıcının bu süre (son basıştan itibaren) ve mesafe içindeki yeni çağrısı mevcut olaya eklenir
+HELP_DEDUP_SECONDS = int(os.getenv("HELP_DEDUP_SECONDS", "600"))
+HELP_DEDUP_METERS = float(os.getenv("HELP_DEDUP_METERS", "250"))
+
 # 🔍 AI destekli risk analiz fonksiyonları
 def classify_zone_risk(latitude, longitude, conn):
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("""
-        SELECT COUNT(*) AS nearby_calls
+    return classify_zone_risks([(latitude, longitude)], conn)[0]
+
+def classify_zone_risks(points, conn):
+    """
+    Birden çok konum için bölge riski; aynı hücredekiler bir kez hesaplanır, tek sorgu atılır.
+    Sayım bilinçli olarak veritabanından yapılır: süreç içi ısı haritası diğer worker'ların son
+    çağrılarını fark okumasına kadar görmez ve risk, kaydedilen çağrıda kalıcıdır. Bedel oluşturma
+    başına tek sorgu; (cell_id, created_at) indeksinde 9 hücrenin pencere aralığı okunur, tablo taranmaz
+    (ölçüm: scripts/bench_zone_risk.py).
+    """
+    centers = {cell_of(lat, lon) for lat, lon in points}
+    cells = sorted({c for center in centers for c in neighbor_cells(center)})
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT cell_id, COUNT(*)
         FROM help_requests
-        WHERE ABS(latitude - %s) < 0.01 AND ABS(longitude - %s) < 0.01
-    """, (latitude, longitude))
-    count = cursor.fetchone()["nearby_calls"]
+        WHERE cell_id IN ({", ".join(["%s"] * len(cells))})
+          AND created_at >= NOW() - INTERVAL %s SECOND
+        GROUP BY cell_id
+    """, (*cells, WINDOWS[ZONE_RISK_WINDOW]))
+    per_cell = dict(cursor.fetchall())
+    counts = {center: sum(per_cell.get(c, 0) for c in neighbor_cells(center)) for center in centers}
 
-    if count > 20:
-        return "yüksek"
-    elif count > 10:
-        return "orta"
-    else:
-        return "düşük"
+    return [zone_risk_level(counts[cell_of(lat, lon)]) for lat, lon in points]
 
 def determine_user_risk(message):
-    critical_words = ["enkaz", "yangın", "nefes", "kan", "yaralı", "çökme", "sıkıştım"]
-    for word in critical_words:
-        if word in message.lower():
-            return "kritik"
-    return "orta"
+    return get_matcher().assess(message)["level"]
+
+# Tekrar basış tespiti bilinçli olarak bellekte değil veritabanında yapılır: çağrılar birden çok
+# worker'a dağılır ve süreç başına bir "son çağrılar" dizini diğer worker'daki çağrıyı görmez,
+# aynı olay iki kez yazılırdı. Bedeli istek başına kullanıcı kilidi + (user_id, ...) indeksinden
+# küçük bir okuma; kilit yalnızca aynı kullanıcının eşzamanlı isteklerini sıraya sokar.
+def lock_user(cursor, user_id):
+    # İşlem sonuna kadar aynı kullanıcının diğer çağrı oluşturma istekleri bekler
+    cursor.execute("SELECT id FROM users WHERE id = %s FOR UPDATE", (user_id,))
+    cursor.fetchall()
+
+def find_repeat_call(cursor, user_id, latitude, longitude):
+    """
+    Kullanıcının pencere içindeki en yakın aktif çağrısının id'si veya None.
+    Veritabanından okunur; hangi worker'a düşerse düşsün tekrar aynı olayı bulur.
+    Çağıran, aynı kullanıcının eşzamanlı isteklerini sıraya sokmak için users satırını kilitler.
+    """
+    cursor.execute("""
+        SELECT id, latitude, longitude
+        FROM help_requests
+        WHERE user_id = %s AND status = 'aktif'
+          AND COALESCE(last_repeat_at, created_at) >= NOW() - INTERVAL %s SECOND
+    """, (user_id, HELP_DEDUP_SECONDS))
+    best, best_km = None, None
+    for help_id, lat, lon in cursor.fetchall():
+        km = haversine_km(latitude, longitude, lat, lon)
+        if km <= HELP_DEDUP_METERS / 1000 and (best_km is None or km < best_km):
+            best, best_km = help_id, km
+    return best
+
+def merge_repeat_call(conn, help_id, user_id, message, user_risk):
+    """
+    Tekrar basışı mevcut aktif çağrıya ekler: sayaç artar, mesaj güncellenir, risk düşmez.
+    Bölge sayaçlarına ve ısı haritasına dokunulmaz. Çağrı artık aktif değilse None döner.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE help_requests
+        SET message = %s,
+            user_risk = IF(user_risk = 'kritik', user_risk, %s),
+            repeat_count = repeat_count + 1,
+            last_repeat_at = NOW()
+        WHERE id = %s AND user_id = %s AND status = 'aktif'
+    """, (message, user_risk, help_id, user_id))
+    if cursor.rowcount != 1:
+        conn.rollback()
+        return None
+    cursor.execute("SELECT user_risk, repeat_count FROM help_requests WHERE id = %s", (help_id,))
+    current_risk, repeat_count = cursor.fetchone()
+    record_help(cursor, user_id, help_id, "aktif")
+    conn.commit()
+
+    help_clusters.raise_rank(help_id, help_risk_rank(current_risk, None))
+    return {"user_risk": current_risk, "repeat_count": repeat_count}
 
 # 🔸 POST - Yardım Çağrısı Oluştur
 @help_bp.route('/help-calls', methods=['POST'])
@@ -60,6 +142,8 @@ def create_help_call():
               type: number
               example: 35.321
     responses:
+      200:
+        description: Aynı kullanıcının yakın zamandaki yakın çağrısıyla birleştirildi (merged=true)
       201:
         description: Çağrı oluşturuldu
     """
@@ -73,21 +157,48 @@ def create_help_call():
         if not all([message, latitude, longitude]):
             return jsonify({"status": "error", "message": "Tüm alanlar zorunludur."}), 400
 
-        conn = get_db_connection()
-        zone_risk = classify_zone_risk(latitude, longitude, conn)
         user_risk = determine_user_risk(message)
+        conn = get_db_connection()
 
+        # Tekrar basış: aynı kullanıcının istekleri users satırı kilidiyle sıraya girer,
+        # yakın aktif çağrı bulunursa yeni satır yerine mevcut olay güncellenir
         cursor = conn.cursor()
+        lock_user(cursor, user_id)
+        existing_id = find_repeat_call(cursor, user_id, latitude, longitude)
+        if existing_id is not None:
+            merged = merge_repeat_call(conn, existing_id, user_id, message, user_risk)
+            if merged:
+                conn.close()
+                return jsonify({
+                    "status": "success",
+                    "message": "Yardım çağrınız güncellendi.",
+                    "merged": True,
+                    "id": existing_id,
+                    "user_risk": merged["user_risk"],
+                    "repeat_count": merged["repeat_count"]
+                }), 200
+            # Çağrı arada kapandıysa kilit bırakıldı; yeniden alınıp yeni çağrı yazılır
+            lock_user(cursor, user_id)
+
+        zone_risk = classify_zone_risk(latitude, longitude, conn)
+
+        cell_id = cell_of(latitude, longitude)
+
         cursor.execute("""
-            INSERT INTO help_requests (user_id, message, latitude, longitude, zone_risk, user_risk, status, created_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
-        """, (user_id, message, latitude, longitude, zone_risk, user_risk, "aktif"))
+            INSERT INTO help_requests (user_id, message, latitude, longitude, cell_id, zone_risk, user_risk, status, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
+        """, (user_id, message, latitude, longitude, cell_id, zone_risk, user_risk, "aktif"))
+        help_id = cursor.lastrowid
+        record_help(cursor, user_id, help_id, "aktif")
         conn.commit()
+        heatmap.add(help_id, cell_id)
+        help_clusters.upsert(help_id, latitude, longitude, help_risk_rank(user_risk, zone_risk))
         conn.close()
 
         return jsonify({
             "status": "success",
             "message": "Yardım çağrısı oluşturuldu.",
+            "id": help_id,
             "zone_risk": zone_risk,
             "user_risk": user_risk
         }), 201
@@ -96,6 +207,267 @@ def create_help_call():
         print(f"[HELP_CALL ERROR] {str(e)}")
         return jsonify({"status": "error", "message": "İşlem başarısız"}), 500
 
+def _parse_client_time(value, now):
+    """Epoch (sn/ms) veya ISO 8601. Yoksa şimdi; gelecekteki zaman şimdiye çekilir. Geçersizse None."""
+    if value is None:
+        return now
+    try:
+        if isinstance(value, (int, float)):
+            ts = value / 1000 if value > 1e12 else float(value)
+        else:
+            ts = datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if ts < now - HELP_BULK_MAX_AGE_SEC:
+        return None
+    return min(ts, now)
+
+def _parse_point(latitude, longitude):
+    # Sayı olmayan veya aralık dışı konum, paketin tamamını düşürmesin diye çağrı başına reddedilir
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return latitude, longitude
+
+def group_repeat_calls(candidates, calls):
+    """
+    Çevrimdışı paketteki tekrar basışları olaylara ayırır (saf mantık, veritabanına gitmez).
+    candidates: kullanıcının aktif çağrıları [(id, enlem, boylam, son basış zamanı)].
+    calls: [(index, client_id, call, ts)]. İstemci zamanına göre sırayla işlenir; bir çağrı,
+    son basışına HELP_DEDUP_SECONDS ve HELP_DEDUP_METERS içinde olan en yakın olaya eklenir,
+    yoksa yeni olay açar (paketteki sonraki çağrılar da ona eklenebilir).
+    Döner: [{"id": mevcut id | None, "first": yeni olayın ilk çağrısı | None, "repeats": [...]}]
+    """
+    incidents = [{"id": help_id, "lat": float(lat), "lon": float(lon), "last": last_at, "first": None, "repeats": []}
+                 for help_id, lat, lon, last_at in candidates]
+    for item in sorted(calls, key=lambda c: c[3]):
+        call, at = item[2], datetime.fromtimestamp(item[3])
+        best, best_km = None, None
+        for incident in incidents:
+            if abs((at - incident["last"]).total_seconds()) > HELP_DEDUP_SECONDS:
+                continue
+            km = haversine_km(call["latitude"], call["longitude"], incident["lat"], incident["lon"])
+            if km <= HELP_DEDUP_METERS / 1000 and (best_km is None or km < best_km):
+                best, best_km = incident, km
+        if best is None:
+            incidents.append({"id": None, "lat": call["latitude"], "lon": call["longitude"], "last": at,
+                              "first": item, "repeats": []})
+        else:
+            best["repeats"].append(item)
+            best["last"] = max(best["last"], at)
+    return [incident for incident in incidents if incident["first"] or incident["repeats"]]
+
+def _merge_bulk_repeats(cursor, user_id, help_id, repeats, user_risks):
+    # Paketteki tekrarlar tek UPDATE: sayaç kadar artar, en yeni mesaj yalnızca olaydan yeniyse yazılır
+    latest = max(repeats, key=lambda c: c[3])
+    risk = "kritik" if any(user_risks[client_id] == "kritik" for _, client_id, _, _ in repeats) else "orta"
+    latest_at = datetime.fromtimestamp(latest[3])
+    cursor.execute("""
+        UPDATE help_requests
+        SET message = IF(%s >= COALESCE(last_repeat_at, created_at), %s, message),
+            user_risk = IF(user_risk = 'kritik', user_risk, %s),
+            repeat_count = repeat_count + %s,
+            last_repeat_at = GREATEST(COALESCE(last_repeat_at, created_at), %s)
+        WHERE id = %s AND user_id = %s
+    """, (latest_at, latest[2]["message"], risk, len(repeats), latest_at, help_id, user_id))
+    cursor.executemany("""
+        INSERT INTO help_request_repeats (user_id, client_id, help_id) VALUES (%s, %s, %s)
+    """, [(user_id, client_id, help_id) for _, client_id, _, _ in repeats])
+
+def _insert_help_calls(conn, user_id, calls):
+    """
+    calls: [(index, client_id, call, ts)]. Daha önce yazılmış (veya bir olaya eklenmiş) client_id'ler
+    atlanır. Kalanlar tekli POST ile aynı kuralla tekrar basış olarak mevcut/paketteki olaya eklenir,
+    yeni olaylar tek çok satırlı INSERT ile yazılır; hepsi aynı işlemde. Döner: index → sonuç.
+    """
+    cursor = conn.cursor()
+    results = {}
+    lock_user(cursor, user_id)
+
+    client_ids = list(dict.fromkeys(client_id for _, client_id, _, _ in calls))
+    placeholders = ", ".join(["%s"] * len(client_ids))
+    cursor.execute(f"""
+        SELECT client_id, id FROM help_requests
+        WHERE user_id = %s AND client_id IN ({placeholders})
+        UNION ALL
+        SELECT client_id, help_id FROM help_request_repeats
+        WHERE user_id = %s AND client_id IN ({placeholders})
+    """, (user_id, *client_ids, user_id, *client_ids))
+    existing = dict(cursor.fetchall())
+
+    fresh, seen = [], set()
+    for i, client_id, call, ts in calls:
+        if client_id in existing or client_id in seen:
+            results[i] = {"index": i, "client_id": client_id, "status": "duplicate", "id": existing.get(client_id)}
+        else:
+            seen.add(client_id)
+            fresh.append((i, client_id, call, ts))
+
+    if not fresh:
+        conn.commit()
+        return results
+
+    since = datetime.fromtimestamp(min(ts for _, _, _, ts in fresh)) - timedelta(seconds=HELP_DEDUP_SECONDS)
+    cursor.execute("""
+        SELECT id, latitude, longitude, COALESCE(last_repeat_at, created_at)
+        FROM help_requests
+        WHERE user_id = %s AND status = 'aktif' AND COALESCE(last_repeat_at, created_at) >= %s
+    """, (user_id, since))
+    incidents = group_repeat_calls(cursor.fetchall(), fresh)
+    firsts = [incident["first"] for incident in incidents if incident["first"]]
+    user_risks = dict(zip((client_id for _, client_id, _, _ in fresh),
+                          (r["level"] for r in get_matcher().assess_many([c["message"] for _, _, c, _ in fresh]))))
+
+    inserted = {}
+    if firsts:
+        zone_risks = classify_zone_risks([(c["latitude"], c["longitude"]) for _, _, c, _ in firsts], conn)
+        cells = [cell_of(c["latitude"], c["longitude"]) for _, _, c, _ in firsts]
+
+        rows = []
+        for (i, client_id, call, ts), cell_id, zone_risk in zip(firsts, cells, zone_risks):
+            rows.extend((user_id, call["message"], call["latitude"], call["longitude"], cell_id,
+                         zone_risk, user_risks[client_id], "aktif", datetime.fromtimestamp(ts), client_id))
+
+        cursor.execute(f"""
+            INSERT INTO help_requests
+                (user_id, message, latitude, longitude, cell_id, zone_risk, user_risk, status, created_at, client_id)
+            VALUES {", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(firsts))}
+        """, rows)
+
+        first_ids = [client_id for _, client_id, _, _ in firsts]
+        cursor.execute(f"""
+            SELECT client_id, id FROM help_requests
+            WHERE user_id = %s AND client_id IN ({", ".join(["%s"] * len(first_ids))})
+        """, (user_id, *first_ids))
+        inserted = dict(cursor.fetchall())
+
+    for incident in incidents:
+        if incident["first"]:
+            incident["id"] = inserted[incident["first"][1]]
+        if incident["repeats"]:
+            _merge_bulk_repeats(cursor, user_id, incident["id"], incident["repeats"], user_risks)
+
+    record_help(cursor, user_id, max(incident["id"] for incident in incidents), "aktif")
+    conn.commit()
+
+    if firsts:
+        for (i, client_id, call, ts), cell_id, zone_risk in zip(firsts, cells, zone_risks):
+            heatmap.add(inserted[client_id], cell_id, ts)
+            help_clusters.upsert(inserted[client_id], call["latitude"], call["longitude"],
+                                 help_risk_rank(user_risks[client_id], zone_risk))
+            results[i] = {"index": i, "client_id": client_id, "status": "created", "id": inserted[client_id],
+                          "zone_risk": zone_risk, "user_risk": user_risks[client_id]}
+    for incident in incidents:
+        for i, client_id, _, _ in incident["repeats"]:
+            help_clusters.raise_rank(incident["id"], help_risk_rank(user_risks[client_id], None))
+            results[i] = {"index": i, "client_id": client_id, "status": "merged", "id": incident["id"]}
+    # Aynı paket içinde tekrarlanan client_id'ler yeni yazılan kaydı gösterir
+    for result in results.values():
+        if result["status"] == "duplicate" and result["id"] is None:
+            result["id"] = next((r["id"] for r in results.values()
+                                 if r["client_id"] == result["client_id"] and r["status"] != "duplicate"), None)
+    return results
+
+# 📦 POST - Toplu Yardım Çağrısı (çevrimdışı kuyruk)
+@help_bp.route('/help-calls/bulk', methods=['POST'])
+@token_required
+def create_help_calls_bulk():
+    """
+    Toplu Yardım Çağrısı Oluştur
+    ---
+    tags:
+      - Yardım
+    security:
+      - Bearer: []
+    description: >
+      Çevrimdışıyken biriken çağrılar tek istekte, tek işlemde yazılır.
+      client_id ile tekrar gönderilen çağrılar "duplicate" olarak döner, yeniden yazılmaz.
+      Tekli POST'taki gibi aynı yerden kısa sürede tekrarlanan çağrılar mevcut olaya eklenir ("merged").
+    consumes:
+      - application/json
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            calls:
+              type: array
+              items:
+                type: object
+                properties:
+                  client_id:
+                    type: string
+                    example: "3f2a9c1e-offline-1"
+                  message:
+                    type: string
+                    example: "Enkaz altındayım"
+                  latitude:
+                    type: number
+                    example: 37.001
+                  longitude:
+                    type: number
+                    example: 35.321
+                  created_at:
+                    type: string
+                    description: İstemci zamanı (ISO 8601 veya epoch ms)
+                    example: "2024-02-06T04:20:00+03:00"
+    responses:
+      200:
+        description: Çağrı başına sonuç (created, merged, duplicate, error)
+      400:
+        description: Geçersiz istek
+    """
+    try:
+        user_id = request.user_id
+        calls = (request.get_json(silent=True) or {}).get("calls")
+
+        if not isinstance(calls, list) or not calls:
+            return jsonify({"status": "error", "message": "calls listesi zorunludur."}), 400
+        if len(calls) > HELP_BULK_MAX:
+            return jsonify({"status": "error", "message": f"En fazla {HELP_BULK_MAX} çağrı gönderilebilir."}), 400
+
+        now = time.time()
+        results = [None] * len(calls)
+        valid = []
+        for i, call in enumerate(calls):
+            call = call if isinstance(call, dict) else {}
+            client_id = str(call.get("client_id") or uuid.uuid4())[:64]
+            ts = _parse_client_time(call.get("created_at"), now)
+            if not all([call.get("message"), call.get("latitude"), call.get("longitude")]) or ts is None:
+                results[i] = {"index": i, "client_id": client_id, "status": "error",
+                              "message": "Eksik alan veya geçersiz zaman."}
+                continue
+            point = _parse_point(call.get("latitude"), call.get("longitude"))
+            if point is None:
+                results[i] = {"index": i, "client_id": client_id, "status": "error",
+                              "message": "Geçersiz konum."}
+                continue
+            valid.append((i, client_id, dict(call, latitude=point[0], longitude=point[1]), ts))
+
+        if valid:
+            conn = get_db_connection()
+            try:
+                results_by_index = _insert_help_calls(conn, user_id, valid)
+            except mysql.connector.IntegrityError:
+                # Aynı paket eşzamanlı gönderildi: geri al, tekrarında kayıtlar "duplicate" döner
+                conn.rollback()
+                results_by_index = _insert_help_calls(conn, user_id, valid)
+            conn.close()
+            for i, result in results_by_index.items():
+                results[i] = result
+
+        summary = {status: sum(1 for r in results if r["status"] == status) for status in ("created", "merged", "duplicate", "error")}
+        return jsonify({"status": "success", "summary": summary, "results": results}), 200
+
+    except Exception as e:
+        print(f"[HELP_CALL_BULK ERROR] {e}")
+        return jsonify({"status": "error", "message": "İşlem başarısız"}), 500
+
 # 🔹 GET - Yardım Çağrılarını Getir
 @help_bp.route('/help-calls', methods=['GET'])
 @token_required
@@ -113,7 +485,7 @@ def get_help_calls():
     """
     try:
         user_id = request.user_id
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor(dictionary=True)
         cursor.execute("""
             SELECT id, user_id, message, latitude, longitude, status, created_at 
@@ -145,6 +517,219 @@ def get_help_calls():
         print(f"[GET_HELP_CALLS ERROR] {str(e)}")
         return jsonify({"status": "error", "message": "Veri alınamadı"}), 500
 
+# 🔥 GET - Yardım Çağrısı Yoğunluk Haritası
+@help_bp.route('/help-calls/heatmap', methods=['GET'])
+@token_required
+def get_help_call_heatmap():
+    """
+    Yardım Çağrısı Yoğunluk Haritası
+    ---
+    tags:
+      - Yardım
+    security:
+      - Bearer: []
+    parameters:
+      - name: window
+        in: query
+        type: string
+        enum: ["15m", "1h", "24h"]
+        default: "1h"
+        description: Zaman penceresi
+    responses:
+      200:
+        description: Hücre başına çağrı sayıları
+        schema:
+          type: object
+          properties:
+            status:
+              type: string
+              example: "success"
+            window:
+              type: string
+              example: "1h"
+            data:
+              type: array
+              items:
+                type: object
+                properties:
+                  cell_id:
+                    type: integer
+                  latitude:
+                    type: number
+                  longitude:
+                    type: number
+                  count:
+                    type: integer
+      400:
+        description: Geçersiz pencere
+    """
+    window = request.args.get("window", "1h")
+    if window not in WINDOWS:
+        return jsonify({"status": "error", "message": "Geçersiz pencere."}), 400
+
+    data = []
+    for cell_id, count in heatmap.snapshot(window).items():
+        latitude, longitude = cell_center(cell_id)
+        data.append({
+            "cell_id": cell_id,
+            "latitude": round(latitude, 5),
+            "longitude": round(longitude, 5),
+            "count": count
+        })
+
+    return jsonify({"status": "success", "window": window, "data": data}), 200
+
+def encode_cursor(created_at, row_id):
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode()
+
+def decode_cursor(value):
+    created_at, row_id = base64.urlsafe_b64decode(value.encode()).decode().split("|")
+    return datetime.fromisoformat(created_at), int(row_id)
+
+def _csv_arg(name):
+    return [v for v in request.args.get(name, "").split(",") if v]
+
+
+_AREA_COLUMNS = "id, message, latitude, longitude, status, zone_risk, user_risk, created_at"
+
+
+def area_query(ranges, where, params, limit):
+    """
+    Kutudaki çağrılar için (sql, parametreler); en yeniden eskiye, en fazla limit satır.
+    cell_id aralıkları OR ile birleşince MySQL tek bir sıralı indeks okuması yapamaz, kutudaki tüm
+    satırları filesort ile sıralar. Bu yüzden her hücre kendi alt sorgusunda (cell_id = ?) okunur:
+    (cell_id, created_at) indeksi (InnoDB'de id ile biter) tersten taranır ve limit satırda durur,
+    dıştaki sıralama en fazla hücre sayısı x limit satırı birleştirir.
+    Hücre sayısı AREA_UNION_MAX_CELLS'i aşarsa tek sorgu kullanılır (kutuyla sınırlı filesort).
+    """
+    cells = [cell for first, last in ranges for cell in range(first, last + 1)]
+    if len(cells) <= AREA_UNION_MAX_CELLS:
+        parts = [f"""(
+            SELECT {_AREA_COLUMNS} FROM help_requests
+            WHERE cell_id = %s AND {" AND ".join(where)}
+            ORDER BY created_at DESC, id DESC LIMIT %s
+        )""" for _ in cells]
+        sql = " UNION ALL ".join(parts) + " ORDER BY created_at DESC, id DESC LIMIT %s"
+        return sql, [v for cell in cells for v in (cell, *params, limit)] + [limit]
+
+    sql = f"""
+        SELECT {_AREA_COLUMNS} FROM help_requests
+        WHERE ({" OR ".join(["cell_id BETWEEN %s AND %s"] * len(ranges))}) AND {" AND ".join(where)}
+        ORDER BY created_at DESC, id DESC
+        LIMIT %s
+    """
+    return sql, [v for r in ranges for v in r] + list(params) + [limit]
+
+# 🗺️ GET - Harita Görünümündeki Yardım Çağrıları
+@help_bp.route('/help-calls/area', methods=['GET'])
+@token_required
+def get_help_calls_in_area():
+    """
+    Harita Görünümündeki Yardım Çağrıları
+    ---
+    tags:
+      - Yardım
+    security:
+      - Bearer: []
+    description: >
+      Kutudaki çağrılar en yeniden eskiye, sayfa sayfa döner.
+      Sonraki sayfa için yanıttaki next_cursor değeri cursor parametresiyle gönderilir.
+    parameters:
+      - {name: min_lat, in: query, type: number, required: true, example: 37.0}
+      - {name: min_lon, in: query, type: number, required: true, example: 35.2}
+      - {name: max_lat, in: query, type: number, required: true, example: 37.1}
+      - {name: max_lon, in: query, type: number, required: true, example: 35.4}
+      - name: status
+        in: query
+        type: string
+        description: Virgülle ayrılmış (aktif, tamamlandı, iptal)
+      - name: user_risk
+        in: query
+        type: string
+        description: Virgülle ayrılmış (kritik, orta)
+      - name: zone_risk
+        in: query
+        type: string
+        description: Virgülle ayrılmış (yüksek, orta, düşük)
+      - name: window
+        in: query
+        type: string
+        enum: ["15m", "1h", "24h"]
+        description: Yalnızca bu penceredeki çağrılar
+      - {name: limit, in: query, type: integer, default: 200}
+      - {name: cursor, in: query, type: string}
+    responses:
+      200:
+        description: Çağrılar ve sonraki sayfa imleci (son sayfada null)
+      400:
+        description: Geçersiz kutu, pencere veya imleç; ya da alan çok büyük
+    """
+    try:
+        bbox = parse_bbox(request.args)
+        if bbox is None:
+            return jsonify({"status": "error", "message": "Geçersiz kutu (min_lat, min_lon, max_lat, max_lon)."}), 400
+
+        ranges = cell_ranges(*bbox)
+        if len(ranges) > AREA_MAX_CELL_ROWS:
+            return jsonify({"status": "error", "message": "Alan çok büyük; /user/map/clusters kullanın."}), 400
+
+        window = request.args.get("window")
+        if window is not None and window not in WINDOWS:
+            return jsonify({"status": "error", "message": "Geçersiz pencere."}), 400
+
+        limit = max(1, min(request.args.get("limit", 200, type=int), AREA_PAGE_MAX))
+        min_lat, min_lon, max_lat, max_lon = bbox
+
+        where = ["latitude BETWEEN %s AND %s", "longitude BETWEEN %s AND %s"]
+        params = [min_lat, max_lat, min_lon, max_lon]
+
+        for column in ("status", "user_risk", "zone_risk"):
+            values = _csv_arg(column)
+            if values:
+                where.append(f"{column} IN ({', '.join(['%s'] * len(values))})")
+                params.extend(values)
+
+        if window:
+            where.append("created_at >= NOW() - INTERVAL %s SECOND")
+            params.append(WINDOWS[window])
+
+        if request.args.get("cursor"):
+            try:
+                created_at, row_id = decode_cursor(request.args["cursor"])
+            except Exception:
+                return jsonify({"status": "error", "message": "Geçersiz imleç."}), 400
+            where.append("(created_at < %s OR (created_at = %s AND id < %s))")
+            params.extend([created_at, created_at, row_id])
+
+        sql, sql_params = area_query(ranges, where, params, limit + 1)
+        conn = get_read_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(sql, sql_params)
+        rows = cursor.fetchall()
+        conn.close()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+        data = [{
+            "id": row["id"],
+            "message": row["message"],
+            "latitude": float(row["latitude"]),
+            "longitude": float(row["longitude"]),
+            "status": row["status"],
+            "zone_risk": row["zone_risk"],
+            "user_risk": row["user_risk"],
+            "created_at": row["created_at"].strftime("%Y-%m-%d %H:%M:%S") if row["created_at"] else None
+        } for row in rows]
+
+        return jsonify({"status": "success", "data": data, "next_cursor": next_cursor}), 200
+
+    except Exception as e:
+        print(f"[HELP_CALLS_AREA ERROR] {e}")
+        return jsonify({"status": "error", "message": "Veri alınamadı"}), 500
+
 # 🔄 PUT - Yardım Çağrısı Güncelle
 @help_bp.route('/help-calls/<int:help_id>', methods=['PUT'])
 @token_required
@@ -192,20 +777,28 @@ def update_help_call(help_id):
             return jsonify({"status": "error", "message": "Lütfen tüm alanları girin."}), 400
 
         conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM help_requests WHERE id = %s AND user_id = %s", (help_id, user_id))
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT status, user_risk, zone_risk FROM help_requests
+            WHERE id = %s AND user_id = %s FOR UPDATE
+        """, (help_id, user_id))
         existing = cursor.fetchone()
 
         if not existing:
             conn.close()
             return jsonify({"status": "error", "message": "Yardım çağrısı bulunamadı."}), 404
 
+        cell_id = cell_of(latitude, longitude)
         cursor.execute("""
             UPDATE help_requests
-            SET message = %s, latitude = %s, longitude = %s
+            SET message = %s, latitude = %s, longitude = %s, cell_id = %s
             WHERE id = %s AND user_id = %s
-        """, (message, latitude, longitude, help_id, user_id))
+        """, (message, latitude, longitude, cell_id, help_id, user_id))
         conn.commit()
+        heatmap.move(help_id, cell_id)
+        if existing["status"] == "aktif":
+            help_clusters.upsert(help_id, latitude, longitude,
+                                 help_risk_rank(existing["user_risk"], existing["zone_risk"]))
         conn.close()
 
         return jsonify({"status": "success", "message": "Güncellendi."}), 200
@@ -243,6 +836,8 @@ def update_help_status(help_id):
     responses:
       200:
         description: Durum güncellendi
+      404:
+        description: Çağrı bulunamadı (veya kullanıcıya ait değil)
     """
     try:
         user_id = request.user_id
@@ -254,14 +849,33 @@ def update_help_status(help_id):
 
         conn = get_db_connection()
         cursor = conn.cursor()
+        cursor.execute("""
+            SELECT latitude, longitude, user_risk, zone_risk FROM help_requests
+            WHERE id = %s AND user_id = %s FOR UPDATE
+        """, (help_id, user_id))
+        row = cursor.fetchone()
+
+        # Çağrı yoksa veya başkasınınsa hiçbir önbelleğe dokunulmaz
+        if not row:
+            conn.rollback()
+            conn.close()
+            return jsonify({"status": "error", "message": "Yardım çağrısı bulunamadı."}), 404
+
         cursor.execute("""
             UPDATE help_requests
             SET status = %s
             WHERE id = %s AND user_id = %s
         """, (new_status, help_id, user_id))
+        set_help_status(cursor, help_id, new_status)
         conn.commit()
         conn.close()
 
+        # Haritada yalnızca aktif çağrılar kümelenir
+        if new_status == "aktif":
+            help_clusters.upsert(help_id, row[0], row[1], help_risk_rank(row[2], row[3]))
+        else:
+            help_clusters.remove(help_id)
+
         return jsonify({"status": "success", "message": "Durum güncellendi."}), 200
 
     except Exception as e:
@@ -292,8 +906,8 @@ def delete_help_call(help_id):
     try:
         user_id = request.user_id
         conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM help_requests WHERE id = %s AND user_id = %s", (help_id, user_id))
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT id FROM help_requests WHERE id = %s AND user_id = %s FOR UPDATE", (help_id, user_id))
         existing = cursor.fetchone()
 
         if not existing:
@@ -301,7 +915,10 @@ def delete_help_call(help_id):
             return jsonify({"status": "error", "message": "Çağrı bulunamadı."}), 404
 
         cursor.execute("DELETE FROM help_requests WHERE id = %s", (help_id,))
+        clear_help(cursor, help_id)
         conn.commit()
+        heatmap.remove(help_id)
+        help_clusters.remove(help_id)
         conn.close()
 
         return jsonify({"status": "success", "message": "Silindi."}), 200
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from flask import Blueprint, request, jsonify
+from auth import token_required
+from utils.geo import parse_bbox
+from utils.clusters import help_clusters, safe_clusters
+
+map_bp = Blueprint('map', __name__, url_prefix='/user/map')
+
+LAYERS = {"help": help_clusters, "safe": safe_clusters}
+
+
+# 🗺️ GET - Harita Kümeleri
+@map_bp.route('/clusters', methods=['GET'])
+@token_required
+def get_map_clusters():
+    """
+    Harita Kümeleri
+    ---
+    tags:
+      - Harita
+    security:
+      - Bearer: []
+    description: >
+      Aktif yardım çağrıları ve son "güvendeyim" konumları, zoom seviyesine göre
+      sunucuda kümelenmiş olarak döner (adet, ağırlık merkezi, en yüksek risk).
+    parameters:
+      - {name: min_lat, in: query, type: number, required: true, example: 36.0}
+      - {name: min_lon, in: query, type: number, required: true, example: 35.0}
+      - {name: max_lat, in: query, type: number, required: true, example: 38.5}
+      - {name: max_lon, in: query, type: number, required: true, example: 40.0}
+      - {name: zoom, in: query, type: integer, required: true, example: 8}
+      - name: layers
+        in: query
+        type: string
+        default: "help,safe"
+        description: Virgülle ayrılmış katmanlar (help, safe)
+    responses:
+      200:
+        description: Katman başına kümeler
+        schema:
+          type: object
+          properties:
+            zoom:
+              type: integer
+              description: Kullanılan seviye (kutu çok büyükse istenenden kaba olabilir)
+            data:
+              type: object
+              properties:
+                help:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      count:
+                        type: integer
+                        example: 42
+                      latitude:
+                        type: number
+                        example: 37.58
+                      longitude:
+                        type: number
+                        example: 36.93
+                      max_risk:
+                        type: string
+                        example: "yüksek"
+      400:
+        description: Geçersiz kutu, zoom veya katman
+    """
+    bbox = parse_bbox(request.args)
+    zoom = request.args.get("zoom", type=int)
+    layers = [layer for layer in request.args.get("layers", "help,safe").split(",") if layer]
+
+    if bbox is None or zoom is None:
+        return jsonify({"status": "error", "message": "Geçersiz kutu veya zoom."}), 400
+    if not layers or any(layer not in LAYERS for layer in layers):
+        return jsonify({"status": "error", "message": "Geçersiz katman."}), 400
+
+    data = {}
+    used_zoom = zoom
+    for layer in layers:
+        used_zoom, data[layer] = LAYERS[layer].clusters(*bbox, zoom)
+
+    return jsonify({"status": "success", "zoom": used_zoom, "data": data}), 200
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+from flask import Blueprint, request, jsonify
+from db import pool_stats, get_db_connection
+from auth import api_key_required
+from utils.push_outbox import outbox_stats
+from utils.push_receipts import audience_metrics
+from utils.earthquake_feed import alert_latency
+from utils.write_behind import safe_status_buffer
+
+monitoring_bp = Blueprint('monitoring', __name__, url_prefix='/monitoring')
+
+
+# 📊 Veritabanı havuz istatistikleri
+@monitoring_bp.route('/db', methods=['GET'])
+@api_key_required
+def get_db_pool_stats():
+    """
+    Veritabanı Bağlantı Havuzu İstatistikleri
+    ---
+    tags:
+      - İzleme
+    parameters:
+      - in: header
+        name: X-Api-Key
+        type: string
+        required: true
+    responses:
+      200:
+        description: Havuz istatistikleri getirildi
+        schema:
+          type: object
+          properties:
+            primary:
+              $ref: '#/definitions/PoolStats'
+            replicas:
+              type: array
+              items:
+                $ref: '#/definitions/PoolStats'
+    definitions:
+      PoolStats:
+        type: object
+        properties:
+          name:
+            type: string
+            example: "primary"
+          size:
+            type: integer
+            example: 10
+          open:
+            type: integer
+            example: 4
+          idle:
+            type: integer
+            example: 1
+          in_use:
+            type: integer
+            example: 3
+          waiters:
+            type: integer
+            example: 0
+          checkouts:
+            type: integer
+            example: 1520
+          timeouts:
+            type: integer
+            example: 0
+          errors:
+            type: integer
+            example: 0
+          avg_wait_ms:
+            type: number
+            example: 0.12
+          max_wait_ms:
+            type: number
+            example: 48.7
+    """
+    return jsonify({"status": "success", "data": pool_stats()}), 200
+
+
+# 📬 Push kuyruğu (outbox) durumu
+@monitoring_bp.route('/push', methods=['GET'])
+@api_key_required
+def get_push_outbox_stats():
+    """
+    Push Kuyruğu İstatistikleri
+    ---
+    tags:
+      - İzleme
+    parameters:
+      - in: header
+        name: X-Api-Key
+        type: string
+        required: true
+    responses:
+      200:
+        description: Şerit başına (emergency, general, test) kuyruk durumları getirildi
+        schema:
+          type: object
+          additionalProperties:
+            type: object
+            properties:
+              depth:
+                type: integer
+                example: 1200
+              max_depth:
+                type: integer
+                example: 10000
+              concurrency:
+                type: integer
+                example: 64
+              oldest_pending_sec:
+                type: integer
+                example: 4
+              sent_per_sec:
+                type: number
+                example: 850.5
+              sent:
+                type: integer
+                example: 98000
+              failed:
+                type: integer
+                example: 35
+              dead:
+                type: integer
+                example: 2
+      500:
+        description: Sunucu hatası
+    """
+    try:
+        conn = get_db_connection()
+        stats = outbox_stats(conn)
+        conn.close()
+        return jsonify({"status": "success", "data": stats}), 200
+
+    except Exception as e:
+        print(f"[PUSH_STATS ERROR] {e}")
+        return jsonify({"status": "error", "message": "İstatistikler alınamadı."}), 500
+
+
+# 🎯 Hedef kitle ve boşa giden gönderimler
+@monitoring_bp.route('/push/audience', methods=['GET'])
+@api_key_required
+def get_push_audience_metrics():
+    """
+    Push Hedef Kitle Metrikleri
+    ---
+    tags:
+      - İzleme
+    parameters:
+      - in: header
+        name: X-Api-Key
+        type: string
+        required: true
+    responses:
+      200:
+        description: Kayıtlı token sayısı ve son işlerin fan-out / boşa gönderim sayıları
+        schema:
+          type: object
+          properties:
+            registered_tokens:
+              type: integer
+              example: 48210
+            jobs:
+              type: array
+              items:
+                type: object
+                properties:
+                  job_id:
+                    type: integer
+                  kind:
+                    type: string
+                  fanout:
+                    type: integer
+                  wasted:
+                    type: integer
+                  created_at:
+                    type: string
+      500:
+        description: Sunucu hatası
+    """
+    try:
+        conn = get_db_connection()
+        metrics = audience_metrics(conn)
+        conn.close()
+        return jsonify({"status": "success", "data": metrics}), 200
+
+    except Exception as e:
+        print(f"[PUSH_AUDIENCE ERROR] {e}")
+        return jsonify({"status": "error", "message": "Metrikler alınamadı."}), 500
+
+
+# 🛟 Güvendeyim yazım tamponu
+@monitoring_bp.route('/safe-status-buffer', methods=['GET'])
+@api_key_required
+def get_safe_status_buffer_stats():
+    """
+    Güvendeyim Yazım Tamponu Durumu
+    ---
+    tags:
+      - İzleme
+    parameters:
+      - in: header
+        name: X-Api-Key
+        type: string
+        required: true
+    responses:
+      200:
+        description: Bekleyen, yazılan ve geri çevrilen satır sayıları
+    """
+    return jsonify({"status": "success", "data": safe_status_buffer.stats()}), 200
+
+
+# 🌍 Deprem akışı: tespit → ilk push gecikmesi
+@monitoring_bp.route('/earthquakes', methods=['GET'])
+@api_key_required
+def get_earthquake_alert_latency():
+    """
+    Deprem Uyarı Gecikmesi
+    ---
+    tags:
+      - İzleme
+    parameters:
+      - in: header
+        name: X-Api-Key
+        type: string
+        required: true
+      - name: limit
+        in: query
+        type: integer
+        default: 20
+    responses:
+      200:
+        description: Uyarı gönderilen son olaylar ve tespit → ilk push gecikmesi
+        schema:
+          type: object
+          properties:
+            p50_sec:
+              type: number
+              example: 1.8
+            max_sec:
+              type: number
+              example: 3.2
+            events:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: string
+                  magnitude:
+                    type: number
+                  detection_to_first_push_sec:
+                    type: number
+      500:
+        description: Sunucu hatası
+    """
+    try:
+        limit = min(request.args.get("limit", 20, type=int), 200)
+        conn = get_db_connection()
+        data = alert_latency(conn, limit)
+        conn.close()
+        return jsonify({"status": "success", "data": data}), 200
+
+    except Exception as e:
+        print(f"[EARTHQUAKE_LATENCY ERROR] {e}")
+        return jsonify({"status": "error", "message": "Gecikme bilgisi alınamadı."}), 500
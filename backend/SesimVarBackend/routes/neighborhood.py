@@ -1,5 +1,5 @@
 from flask import Blueprint, jsonify
-from db import get_db_connection
+from db import get_read_connection
 
 neighborhood_bp = Blueprint("neighborhood", __name__, url_prefix="/neighborhoods")
 
@@ -39,7 +39,7 @@ def list_neighborhoods():
                 example: 39.2238
     """
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT * FROM neighborhoods")
         neighborhoods = cursor.fetchall()
@@ -1,7 +1,8 @@
 ﻿# -*- coding: utf-8 -*-
 from flask import Blueprint, request, jsonify
-from db import get_db_connection
+from db import get_db_connection, get_read_connection
 from auth import token_required
+from utils.push_tokens import register_token
 
 notifications_bp = Blueprint('notifications', __name__, url_prefix='/user')
 
@@ -37,7 +38,7 @@ def get_notification_settings():
     """
     try:
         user_id = request.user_id
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor(dictionary=True)
 
         cursor.execute("SELECT * FROM notification_settings WHERE user_id = %s", (user_id,))
@@ -155,6 +156,10 @@ def save_notification_token():
             expo_token:
               type: string
               example: "ExponentPushToken[xxxxxxxxxxxxxxxxxxxxxx]"
+            device_id:
+              type: string
+              description: Opsiyonel cihaz kimliği (aynı cihazın eski token'ı silinir)
+              example: "b7f3c9d2"
     responses:
       200:
         description: Token başarıyla kaydedildi
@@ -173,11 +178,7 @@ def save_notification_token():
 
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO notification_tokens (user_id, expo_token)
-            VALUES (%s, %s)
-            ON DUPLICATE KEY UPDATE expo_token = VALUES(expo_token)
-        """, (user_id, expo_token))
+        register_token(cursor, user_id, expo_token, data.get("device_id"))
         conn.commit()
         conn.close()
 
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from flask import Blueprint, request, jsonify
-from db import get_db_connection
+from db import get_db_connection, get_read_connection
 from auth import token_required
 
 profile_bp = Blueprint('profile', __name__, url_prefix='/user')
@@ -24,7 +24,7 @@ def get_profile():
     """
     try:
         user_id = request.user_id
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor(dictionary=True)
         cursor.execute("""
             SELECT id, tc_no, full_name, phone_number, blood_type, health_status
@@ -73,6 +73,7 @@ def delete_profile():
         user_id = request.user_id
         conn = get_db_connection()
         cursor = conn.cursor()
+        cursor.execute("DELETE FROM push_tokens WHERE user_id = %s", (user_id,))
         cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
         conn.commit()
         conn.close()
@@ -2,12 +2,11 @@
 from flask import Blueprint, request, jsonify
 from db import get_db_connection
 from auth import token_required
-import requests
+from utils.push_tokens import register_token
+from utils.push_outbox import LaneFull, create_push_job, enqueue_tokens
 
 push_bp = Blueprint('push', __name__, url_prefix='/user')
 
-EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
-
 # 🔹 Expo Push Token Kaydet
 @push_bp.route('/save-token', methods=['POST'])
 @token_required
@@ -31,6 +30,10 @@ def save_expo_token():
             token:
               type: string
               example: "ExponentPushToken[xxxxxxxxxxxxxxxxxxxxxx]"
+            device_id:
+              type: string
+              description: Opsiyonel cihaz kimliği (aynı cihazın eski token'ı silinir)
+              example: "b7f3c9d2"
     responses:
       200:
         description: Token başarıyla kaydedildi
@@ -49,11 +52,7 @@ def save_expo_token():
 
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO expo_push_tokens (user_id, token)
-            VALUES (%s, %s)
-            ON DUPLICATE KEY UPDATE token = VALUES(token)
-        """, (user_id, token))
+        register_token(cursor, user_id, token, data.get("device_id"))
         conn.commit()
         conn.close()
 
@@ -63,17 +62,6 @@ def save_expo_token():
         print(f"[SAVE_TOKEN_ERROR] {e}")
         return jsonify({"status": "error", "message": "Token kaydedilemedi"}), 500
 
-# 🔸 Yardımcı fonksiyon (bildirim gönderme)
-def send_push_notification(expo_token, title, message):
-    body = {
-        "to": expo_token,
-        "title": title,
-        "body": message,
-        "sound": "default"
-    }
-    response = requests.post(EXPO_PUSH_URL, json=body)
-    return response.status_code, response.text
-
 # 🔔 Test Bildirim Gönder
 @push_bp.route('/send-demo', methods=['POST'])
 @token_required
@@ -85,11 +73,14 @@ def send_demo_notification():
       - Bildirim
     security:
       - Bearer: []
+    description: Bildirim "test" şeridinde kuyruğa alınır; acil uyarıları geciktirmez.
     responses:
-      200:
-        description: Bildirim başarıyla gönderildi
+      202:
+        description: Bildirim kuyruğa alındı
       404:
         description: Token bulunamadı
+      503:
+        description: Test şeridi dolu
       500:
         description: Bildirim gönderilirken hata oluştu
     """
@@ -97,21 +88,31 @@ def send_demo_notification():
         user_id = request.user_id
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT token FROM expo_push_tokens WHERE user_id = %s", (user_id,))
+        cursor.execute("""
+            SELECT token FROM push_tokens
+            WHERE user_id = %s
+            ORDER BY last_seen_at DESC
+            LIMIT 1
+        """, (user_id,))
         result = cursor.fetchone()
-        conn.close()
 
         if not result:
             return jsonify({"status": "error", "message": "Token bulunamadı"}), 404
 
-        token = result["token"]
-        status, response = send_push_notification(token, "SesimVar", "Bu bir test bildirimi")
+        cursor = conn.cursor()
+        job_id, _ = create_push_job(cursor, "demo", "SesimVar", "Bu bir test bildirimi", lane="test")
+        enqueue_tokens(cursor, job_id, [result["token"]])
+        conn.commit()
+        conn.close()
 
         return jsonify({
             "status": "success",
-            "message": "Bildirim gönderildi",
-            "expo_response": response
-        }), 200
+            "message": "Bildirim kuyruğa alındı",
+            "job_id": job_id
+        }), 202
+
+    except LaneFull as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
 
     except Exception as e:
         print(f"[SEND_NOTIFICATION_ERROR] {e}")
@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
-from db import get_db_connection
-from auth import token_required
+from db import get_db_connection, get_read_connection
+from auth import token_required, api_key_required
+from utils.clusters import safe_clusters
+from utils.user_status import STATUS_LOOKUP_MAX, record_safe, get_statuses
+from utils.write_behind import SAFE_STATUS_WRITE_BEHIND, safe_status_buffer, queue_safe_status
 
 safe_bp = Blueprint('safe', __name__, url_prefix='/user')
 
@@ -33,8 +36,12 @@ def create_safe_status():
     responses:
       201:
         description: Bildirim gönderildi
+      202:
+        description: Bildirim alındı, toplu yazım için sıraya kondu (SAFE_STATUS_WRITE_BEHIND=1)
       400:
         description: Eksik bilgi
+      503:
+        description: Yazım tamponu dolu, Retry-After sonra tekrar deneyin
     """
     try:
         user_id = request.user_id
@@ -45,14 +52,29 @@ def create_safe_status():
         if not all([latitude, longitude]):
             return jsonify({"status": "error", "message": "Konum bilgisi gerekli."}), 400
 
+        # Deprem sonrası yoğunlukta: tampona ekle, toplu INSERT arka planda
+        if SAFE_STATUS_WRITE_BEHIND:
+            try:
+                accepted = queue_safe_status(user_id, latitude, longitude)
+            except ValueError:
+                return jsonify({"status": "error", "message": "Geçersiz konum."}), 400
+            if not accepted:
+                response = jsonify({"status": "error", "message": "Sistem yoğun, lütfen tekrar deneyin."})
+                response.headers["Retry-After"] = "1"
+                return response, 503
+            safe_clusters.upsert(user_id, latitude, longitude)
+            return jsonify({"status": "success", "message": "Bildiriminiz alındı."}), 202
+
         conn = get_db_connection()
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO safe_status (user_id, latitude, longitude, created_at)
             VALUES (%s, %s, %s, NOW())
         """, (user_id, latitude, longitude))
+        record_safe(cursor, [(user_id, latitude, longitude, None)])
         conn.commit()
         conn.close()
+        safe_clusters.upsert(user_id, latitude, longitude)
 
         return jsonify({"status": "success", "message": "Bildiriminiz alındı."}), 201
 
@@ -78,7 +100,7 @@ def get_safe_status():
     """
     try:
         user_id = request.user_id
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor(dictionary=True)
         cursor.execute("""
             SELECT id, user_id, latitude, longitude, created_at 
@@ -89,6 +111,13 @@ def get_safe_status():
         result = cursor.fetchall()
         conn.close()
 
+        # Tamponda bekleyen (henüz yazılmamış) bildirimler de gösterilir
+        pending = safe_status_buffer.pending(lambda row: row[0] == user_id)
+        result[:0] = [
+            {"id": None, "user_id": uid, "latitude": lat, "longitude": lon, "created_at": created}
+            for uid, lat, lon, created in reversed(pending)
+        ]
+
         # ✅ Harita uyumlu JSON cevabı
         formatted = []
         for row in result:
@@ -115,3 +144,114 @@ def get_safe_status():
             "status": "error",
             "message": "Veri alınamadı"
         }), 500
+
+
+def _with_pending(statuses, user_ids):
+    # Yazım tamponunda bekleyen son bildirim güncel konumdur (tampon tek geçişte taranır)
+    wanted = set(user_ids)
+    for user_id, latitude, longitude, created in safe_status_buffer.pending(lambda row: row[0] in wanted):
+        statuses[user_id] = _pending_safe(statuses.get(user_id), user_id, latitude, longitude, created)
+    return statuses
+
+
+def _pending_safe(status, user_id, latitude, longitude, created):
+    status = dict(status or {"user_id": user_id, "help": None})
+    status["safe"] = {
+        "latitude": float(latitude),
+        "longitude": float(longitude),
+        "created_at": created.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    return status
+
+
+# 📍 Güncel Durumum (son konum + son yardım çağrısı)
+@safe_bp.route('/current-status', methods=['GET'])
+@token_required
+def get_current_status():
+    """
+    Güncel Durum
+    ---
+    tags:
+      - Güvende
+    security:
+      - Bearer: []
+    description: >
+      Kullanıcının son "güvendeyim" konumu ve son yardım çağrısının durumu.
+      Geçmişi taramaz; user_current_status tablosundan birincil anahtarla okunur.
+    responses:
+      200:
+        description: Güncel durum (hiç kayıt yoksa data null)
+    """
+    try:
+        user_id = request.user_id
+        conn = get_read_connection()
+        statuses = _with_pending(get_statuses(conn, [user_id]), [user_id])
+        conn.close()
+
+        return jsonify({"status": "success", "data": statuses.get(user_id)}), 200
+
+    except Exception as e:
+        print(f"[GET_CURRENT_STATUS ERROR] {e}")
+        return jsonify({"status": "error", "message": "Veri alınamadı"}), 500
+
+
+# 👥 Toplu Güncel Durum (harita, yakın/ekip sorguları)
+@safe_bp.route('/current-status/lookup', methods=['POST'])
+@api_key_required
+def lookup_current_status():
+    """
+    Toplu Güncel Durum
+    ---
+    tags:
+      - Güvende
+    consumes:
+      - application/json
+    parameters:
+      - in: header
+        name: X-Api-Key
+        type: string
+        required: true
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            user_ids:
+              type: array
+              items:
+                type: integer
+              example: [12, 57, 301]
+    responses:
+      200:
+        description: Kullanıcı başına güncel durum; kaydı olmayanlar "missing" listesinde
+      400:
+        description: Geçersiz istek
+      401:
+        description: Geçersiz API anahtarı
+    """
+    try:
+        user_ids = (request.get_json(silent=True) or {}).get("user_ids")
+        if not isinstance(user_ids, list) or not user_ids:
+            return jsonify({"status": "error", "message": "user_ids listesi zorunludur."}), 400
+        if len(user_ids) > STATUS_LOOKUP_MAX:
+            return jsonify({"status": "error", "message": f"En fazla {STATUS_LOOKUP_MAX} kullanıcı sorgulanabilir."}), 400
+        try:
+            user_ids = [int(u) for u in user_ids]
+        except (TypeError, ValueError):
+            return jsonify({"status": "error", "message": "user_ids tam sayı olmalıdır."}), 400
+
+        conn = get_read_connection()
+        statuses = _with_pending(get_statuses(conn, user_ids), user_ids)
+        conn.close()
+
+        user_ids = list(dict.fromkeys(user_ids))
+        return jsonify({
+            "status": "success",
+            "data": [statuses[u] for u in user_ids if u in statuses],
+            "missing": [u for u in user_ids if u not in statuses]
+        }), 200
+
+    except Exception as e:
+        print(f"[LOOKUP_CURRENT_STATUS ERROR] {e}")
+        return jsonify({"status": "error", "message": "Veri alınamadı"}), 500
@@ -1,35 +1,175 @@
 ﻿# routes/simulation_routes.py
 # -*- coding: utf-8 -*-
-from flask import Blueprint, jsonify
-from db import get_db_connection
-from utils.notifications import send_push_notification
+from flask import Blueprint, request, jsonify
+from db import db_connection, get_db_connection
+from auth import api_key_required
+from utils.alerts import neighborhoods_in_ring
+from utils.push_outbox import create_deferred_job, job_progress
 
 simulation_bp = Blueprint('simulation', __name__, url_prefix='/simulate')
 
+
+def _parse_epicenter(data):
+    """
+    Döner: (enlem, boylam, yarıçap) | None (episentr verilmemiş, tüm ülke).
+    Alanlardan biri bile verilip geçersizse ValueError; eksik episentr sessizce tüm ülkeye dönmesin.
+    """
+    values = [data.get(k) for k in ("latitude", "longitude", "radius_km")]
+    if all(v is None for v in values):
+        return None
+    try:
+        latitude, longitude, radius_km = (float(v) for v in values)
+    except (TypeError, ValueError):
+        raise ValueError("Geçersiz episentr")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180 and 0 < radius_km <= 1000):
+        raise ValueError("Geçersiz episentr")
+    return latitude, longitude, radius_km
+
+
 @simulation_bp.route('/earthquake', methods=['POST'])
+@api_key_required
 def simulate_earthquake():
+    """
+    Deprem Tatbikatı Başlat
+    ---
+    tags:
+      - Simülasyon
+    description: >
+      İş hemen oluşturulur ve id'si döner; hedef kitlenin çözülmesi ve kuyruğa eklenmesi
+      push_worker.py süreçlerinde yapılır ("general" şeridi). Şerit doluysa ilerleme "failed" olur.
+    consumes:
+      - application/json
+    parameters:
+      - in: header
+        name: X-Api-Key
+        type: string
+        required: true
+      - in: body
+        name: body
+        required: false
+        schema:
+          type: object
+          properties:
+            latitude:
+              type: number
+              example: 38.6766
+            longitude:
+              type: number
+              example: 39.2238
+            radius_km:
+              type: number
+              example: 50
+    responses:
+      202:
+        description: Tatbikat işi kuyruğa alındı; ilerleme /simulate/earthquake/{job_id} ile izlenir
+      400:
+        description: Geçersiz veya eksik episentr (latitude, longitude, radius_km birlikte verilmeli)
+      401:
+        description: Geçersiz API anahtarı
+      500:
+        description: Sunucu hatası
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT expo_token FROM notification_tokens")
-        tokens = cursor.fetchall()
-        conn.close()
+        # Opsiyonel episentr: {"latitude", "longitude", "radius_km"} verilirse yalnızca etkilenen bölge
+        data = request.get_json(silent=True) or {}
+        try:
+            epicenter = _parse_epicenter(data)
+        except ValueError:
+            return jsonify({
+                "status": "error",
+                "message": "Geçersiz episentr: latitude, longitude ve radius_km (0-1000 km) birlikte verilmelidir."
+            }), 400
 
         title = "Deprem Uyarısı"
         message = "📢 Deprem tespit edildi. Güvende misiniz? Lütfen bildirimden giriş yapın."
 
-        results = []
-        for t in tokens:
-            expo_token = t["expo_token"]
-            status, response = send_push_notification(expo_token, title, message)
-            results.append({"token": expo_token, "status": status, "response": response})
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            # Mahalleler burada (indeksli kutu sorgusu, ucuz); token'lar worker'da çözülür
+            if epicenter:
+                latitude, longitude, radius_km = epicenter
+                target = {"neighborhood_ids": neighborhoods_in_ring(cursor, latitude, longitude, 0, radius_km)}
+            else:
+                target = {}
+            job_id = create_deferred_job(cursor, "simulation", title, message, target, lane="general")
+            conn.commit()
 
         return jsonify({
             "status": "success",
-            "message": "Deprem bildirimi gönderildi.",
-            "results": results
-        }), 200
+            "message": "Deprem bildirimi kuyruğa alındı.",
+            "job_id": job_id
+        }), 202
 
     except Exception as e:
         print(f"[SIMULATE_EARTHQUAKE_ERROR] {e}")
         return jsonify({"status": "error", "message": "Bildirim gönderilemedi."}), 500
+
+@simulation_bp.route('/earthquake/<int:job_id>', methods=['GET'])
+@api_key_required
+def get_simulation_progress(job_id):
+    """
+    Tatbikat İlerlemesi
+    ---
+    tags:
+      - Simülasyon
+    parameters:
+      - in: header
+        name: X-Api-Key
+        type: string
+        required: true
+      - in: path
+        name: job_id
+        type: integer
+        required: true
+    responses:
+      200:
+        description: İlerleme getirildi
+        schema:
+          type: object
+          properties:
+            state:
+              type: string
+              enum: [queued, running, done, failed]
+            queued:
+              type: integer
+              example: 100000
+            pending:
+              type: integer
+              example: 42000
+            sent:
+              type: integer
+              example: 57800
+            failed:
+              type: integer
+              example: 190
+            dead:
+              type: integer
+              example: 10
+            messages_per_sec:
+              type: number
+              example: 2400.5
+            eta_sec:
+              type: number
+              example: 17.5
+            errors:
+              type: object
+              example: {"DeviceNotRegistered": 190, "HTTP503": 10}
+      401:
+        description: Geçersiz API anahtarı
+      404:
+        description: İş bulunamadı
+      500:
+        description: Sunucu hatası
+    """
+    try:
+        conn = get_db_connection()
+        progress = job_progress(conn, job_id)
+        conn.close()
+
+        if progress is None:
+            return jsonify({"status": "error", "message": "İş bulunamadı."}), 404
+        return jsonify({"status": "success", "data": progress}), 200
+
+    except Exception as e:
+        print(f"[SIMULATION_PROGRESS_ERROR] {e}")
+        return jsonify({"status": "error", "message": "İlerleme alınamadı."}), 500
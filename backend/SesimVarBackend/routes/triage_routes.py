@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+from flask import Blueprint, request, jsonify
+from db import get_db_connection, get_read_connection
+from auth import api_key_required
+from utils.clusters import help_clusters
+from utils.triage import (TRIAGE_LEASE_SECONDS, TRIAGE_MAX_CLAIM, peek_queue, claim_calls,
+                          renew_claim, release_claim, resolve_call)
+
+triage_bp = Blueprint('triage', __name__, url_prefix='/triage')
+
+RESOLVED_STATUSES = ("tamamlandı", "iptal")
+
+
+def _team():
+    data = request.get_json(silent=True) or {}
+    team = data.get("team")
+    return str(team)[:64] if team else None, data
+
+
+# 📋 Kuyruğa göz at
+@triage_bp.route('/queue', methods=['GET'])
+@api_key_required
+def get_triage_queue():
+    """
+    Triyaj Kuyruğu
+    ---
+    tags:
+      - Triyaj
+    parameters:
+      - in: header
+        name: X-Api-Key
+        type: string
+        required: true
+      - {name: limit, in: query, type: integer, default: 20}
+    responses:
+      200:
+        description: Sahipsiz aktif çağrılar (kritik → bölge riski → en eski)
+      401:
+        description: Geçersiz API anahtarı
+    """
+    try:
+        limit = max(1, min(request.args.get("limit", 20, type=int), 200))
+        conn = get_read_connection()
+        calls = peek_queue(conn, limit)
+        conn.close()
+        return jsonify({"status": "success", "data": calls}), 200
+
+    except Exception as e:
+        print(f"[TRIAGE_QUEUE ERROR] {e}")
+        return jsonify({"status": "error", "message": "Kuyruk alınamadı."}), 500
+
+
+# 🙋 Sıradaki çağrıları sahiplen
+@triage_bp.route('/claim', methods=['POST'])
+@api_key_required
+def claim_triage_calls():
+    """
+    Çağrı Sahiplen
+    ---
+    tags:
+      - Triyaj
+    parameters:
+      - in: header
+        name: X-Api-Key
+        type: string
+        required: true
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            team:
+              type: string
+              example: "AFAD-Malatya-3"
+            count:
+              type: integer
+              example: 1
+            lease_seconds:
+              type: integer
+              example: 900
+    responses:
+      200:
+        description: Sahiplenilen çağrılar (kuyruk boşsa boş liste)
+      400:
+        description: Ekip bilgisi eksik
+    """
+    try:
+        team, data = _team()
+        if not team:
+            return jsonify({"status": "error", "message": "Ekip bilgisi gerekli."}), 400
+
+        count = max(1, min(int(data.get("count") or 1), TRIAGE_MAX_CLAIM))
+        lease = max(60, min(int(data.get("lease_seconds") or TRIAGE_LEASE_SECONDS), 4 * 3600))
+
+        conn = get_db_connection()
+        calls = claim_calls(conn, team, count, lease)
+        conn.close()
+        return jsonify({"status": "success", "lease_seconds": lease, "data": calls}), 200
+
+    except Exception as e:
+        print(f"[TRIAGE_CLAIM ERROR] {e}")
+        return jsonify({"status": "error", "message": "Sahiplenme başarısız."}), 500
+
+
+# ⏱️ Kirayı uzat / bırak / kapat
+@triage_bp.route('/<int:help_id>/<action>', methods=['POST'])
+@api_key_required
+def update_triage_claim(help_id, action):
+    """
+    Sahiplenilen Çağrıyı Güncelle
+    ---
+    tags:
+      - Triyaj
+    parameters:
+      - in: header
+        name: X-Api-Key
+        type: string
+        required: true
+      - {name: help_id, in: path, type: integer, required: true}
+      - name: action
+        in: path
+        type: string
+        enum: [renew, release, resolve]
+        required: true
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            team:
+              type: string
+              example: "AFAD-Malatya-3"
+            status:
+              type: string
+              description: Yalnızca resolve için (tamamlandı, iptal)
+              example: "tamamlandı"
+    responses:
+      200:
+        description: İşlem başarılı
+      400:
+        description: Eksik veya hatalı bilgi
+      409:
+        description: Çağrı bu ekipte değil veya kira dolmuş
+    """
+    try:
+        team, data = _team()
+        if not team:
+            return jsonify({"status": "error", "message": "Ekip bilgisi gerekli."}), 400
+
+        conn = get_db_connection()
+        if action == "renew":
+            ok = renew_claim(conn, help_id, team)
+        elif action == "release":
+            ok = release_claim(conn, help_id, team)
+        elif action == "resolve":
+            status = data.get("status", "tamamlandı")
+            if status not in RESOLVED_STATUSES:
+                conn.close()
+                return jsonify({"status": "error", "message": "Geçersiz durum."}), 400
+            ok = resolve_call(conn, help_id, team, status)
+            if ok:
+                help_clusters.remove(help_id)
+        else:
+            conn.close()
+            return jsonify({"status": "error", "message": "Geçersiz işlem."}), 400
+        conn.close()
+
+        if not ok:
+            return jsonify({"status": "error", "message": "Çağrı bu ekipte değil veya kira dolmuş."}), 409
+        return jsonify({"status": "success", "message": "Güncellendi."}), 200
+
+    except Exception as e:
+        print(f"[TRIAGE_UPDATE ERROR] {e}")
+        return jsonify({"status": "error", "message": "İşlem başarısız."}), 500
@@ -1,35 +1,111 @@
 ﻿# scheduler.py
 # -*- coding: utf-8 -*-
 
+"""
+Zamanlanmış işler. Web uygulamasına gömülü çalışabilir (EMBEDDED_SCHEDULER=1, varsayılan)
+veya ayrı süreç olarak:
+    python scheduler.py
+Kaç süreç başlatılırsa başlatılsın işleri yalnızca lider olan çalıştırır.
+"""
+import os
+import signal
+import threading
+from functools import wraps
+
 from apscheduler.schedulers.background import BackgroundScheduler
-from db import get_db_connection
-from utils.notifications import send_push_notification
+from db import db_connection
+from utils.audience import all_tokens
+from utils.push_outbox import create_push_job, enqueue_tokens
+from utils.push_receipts import poll_receipts
+from utils.leader import LeaderLease
+from utils.earthquake_feed import ingest_feed
+from utils.risk_recompute import recompute_risks, RISK_RECOMPUTE_SECONDS
+
+EARTHQUAKE_POLL_SECONDS = int(os.getenv("EARTHQUAKE_POLL_SECONDS", "10"))
+
+_lease = None
+_scheduler = None
+
 
 def send_earthquake_notifications():
     print("[SIMULATION] Deprem bildirimi gönderiliyor...")
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT expo_token FROM notification_tokens")
-        tokens = cursor.fetchall()
-        conn.close()
-
         title = "Deprem Uyarısı"
         message = "📢 Deprem tespit edildi. Güvende misiniz?"
 
-        for t in tokens:
-            expo_token = t["expo_token"]
-            if expo_token:
-                send_push_notification(expo_token, title, message)
+        # Gönderim push_worker.py süreçlerine bırakılır
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            job_id, _ = create_push_job(cursor, "earthquake", title, message, lane="test")
+            queued = enqueue_tokens(cursor, job_id, all_tokens(cursor))
+            conn.commit()
 
-        print("[SIMULATION] Bildirimler başarıyla gönderildi.")
+        print(f"[SIMULATION] Bildirimler kuyruğa alındı (iş #{job_id}, {queued} alıcı).")
 
     except Exception as e:
         print(f"[SIMULATION ERROR] {str(e)}")
 
-def start_scheduler():
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(send_earthquake_notifications, 'interval', seconds=30)  # Test için 30 saniyede bir
-    scheduler.start()
+def _leader_only(job):
+    # Kira yenilenemediyse (ör. veritabanı kesintisi) sıradaki çalıştırma atlanır
+    @wraps(job)
+    def wrapper():
+        if _lease is not None and _lease.is_leader:
+            return job()
+        print(f"[SCHEDULER] Lider değil, {job.__name__} atlandı.")
+    return wrapper
+
+
+def _start_jobs():
+    global _scheduler
+    _scheduler = BackgroundScheduler()
+    # Sabit 30 sn yayın yerine deprem akışı izlenir; yalnızca eşiği geçen yeni olaylar uyarı üretir
+    _scheduler.add_job(_leader_only(ingest_feed), 'interval', seconds=EARTHQUAKE_POLL_SECONDS, max_instances=1)
+    _scheduler.add_job(_leader_only(poll_receipts), 'interval', seconds=60, max_instances=1)  # Expo receipt kontrolü
+    # Ekleme anında donan bölge/kullanıcı riskleri güncellenir (RISK_RECOMPUTE_SECONDS=0 ile kapalı)
+    if RISK_RECOMPUTE_SECONDS > 0:
+        _scheduler.add_job(_leader_only(recompute_risks), 'interval', seconds=RISK_RECOMPUTE_SECONDS, max_instances=1)
+    _scheduler.start()
     print("✅ Zamanlayıcı başlatıldı.")
+
+
+def _stop_jobs():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
+        print("🛑 Zamanlayıcı durduruldu.")
+
+
+def start_scheduler():
+    """
+    Lider seçimine katılır; işler yalnızca kirayı tutan tek süreçte çalışır.
+    Lider ölürse kira süresi dolunca başka bir süreç devralır.
+    """
+    global _lease
+    if _lease is None:
+        _lease = LeaderLease("scheduler", on_elected=_start_jobs, on_revoked=_stop_jobs).start()
+        print(f"✅ Zamanlayıcı lider seçimine katıldı ({_lease.owner}).")
+    return _lease
+
+
+def stop_scheduler():
+    global _lease
+    if _lease is not None:
+        _lease.stop()
+        _lease = None
+
+
+def main():
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+
+    start_scheduler()
+    while not stopping.is_set():
+        stopping.wait(1)
+    stop_scheduler()
+
+
+if __name__ == "__main__":
+    main()
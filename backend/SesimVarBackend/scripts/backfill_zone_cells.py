@@ -0,0 +1,61 @@
+# scripts/backfill_zone_cells.py
+# -*- coding: utf-8 -*-
+"""
+cell_id alanı boş olan eski help_requests kayıtlarını doldurur (bölge riski ve harita
+sorguları hücre indeksinden okur). Canlı trafik altında çalıştırılabilir;
+her parça kendi transaction'ında kilitlenip işlenir.
+
+Kullanım (backend dizininden):
+    python -m scripts.backfill_zone_cells --chunk 5000
+"""
+import argparse
+from collections import defaultdict
+
+from db import db_connection
+from utils.geo import cell_of
+
+
+def backfill(chunk_size):
+    last_id = 0
+    total = 0
+
+    with db_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+
+        while True:
+            cursor.execute("""
+                SELECT id, latitude, longitude
+                FROM help_requests
+                WHERE id > %s AND cell_id IS NULL
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE
+            """, (last_id, chunk_size))
+            rows = cursor.fetchall()
+            if not rows:
+                conn.commit()
+                break
+
+            ids_by_cell = defaultdict(list)
+            for row in rows:
+                ids_by_cell[cell_of(row["latitude"], row["longitude"])].append(row["id"])
+
+            for cell_id, ids in ids_by_cell.items():
+                cursor.execute(
+                    f"UPDATE help_requests SET cell_id = %s WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                    [cell_id] + ids
+                )
+            conn.commit()
+
+            last_id = rows[-1]["id"]
+            total += len(rows)
+            print(f"[BACKFILL] {total} kayıt işlendi (son id: {last_id})")
+
+    print(f"[BACKFILL] Tamamlandı. Toplam {total} kayıt.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="help_requests.cell_id backfill")
+    parser.add_argument("--chunk", type=int, default=5000)
+    args = parser.parse_args()
+    backfill(args.chunk)
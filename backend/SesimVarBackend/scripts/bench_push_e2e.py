@@ -0,0 +1,230 @@
+# scripts/bench_push_e2e.py
+# -*- coding: utf-8 -*-
+"""
+Uçtan uca push benchmark'ı: N token'ı yerel veritabanına yükler, mock Expo sunucusunu başlatır,
+her gönderim yolunu tetikleyip kuyruk tamamen boşalana kadar süreyi ölçer.
+    - scheduler      : scheduler.send_earthquake_notifications
+    - simulate       : POST /simulate/earthquake
+    - notification   : utils.notifications.send_push_notification
+Sonuçlar regresyon takibi için JSON olarak yazılır.
+
+Yalnızca yerel/test veritabanında çalıştırın (.env içindeki DB_* ayarları kullanılır).
+Yüklenen token'lar ve benchmark işleri sonunda silinir.
+
+Kullanım (backend dizininden):
+    python -m scripts.bench_push_e2e --tokens 100000 --latency-ms 150 --output bench.json
+    python -m scripts.bench_push_e2e --scenarios simulate --throttle-rate 0.05 --unregistered-rate 0.01
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from scripts.bench_push_fanout import free_port, wait_for_port
+
+BENCH_TOKEN_PREFIX = "ExponentPushToken[bench-"
+BENCH_USER_BASE = 900000000
+SCENARIOS = ("scheduler", "simulate", "notification")
+
+
+def seed_tokens(count):
+    from db import db_connection
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        rows = [(BENCH_USER_BASE + i, f"{BENCH_TOKEN_PREFIX}{i}]") for i in range(count)]
+        for i in range(0, len(rows), 5000):
+            cursor.executemany("INSERT IGNORE INTO push_tokens (user_id, token) VALUES (%s, %s)", rows[i:i + 5000])
+        conn.commit()
+
+
+def cleanup(first_job_id):
+    from db import db_connection
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM push_jobs WHERE id > %s", (first_job_id,))
+        cursor.execute("DELETE FROM push_tokens WHERE user_id >= %s", (BENCH_USER_BASE,))
+        conn.commit()
+
+
+def max_job_id():
+    from db import db_connection
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM push_jobs")
+        return cursor.fetchone()[0]
+
+
+def first_sent_at(job_ids):
+    from db import db_connection
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT UNIX_TIMESTAMP(MIN(sent_at))
+            FROM push_messages
+            WHERE job_id IN ({", ".join(["%s"] * len(job_ids))})
+        """, job_ids)
+        value = cursor.fetchone()[0]
+        return float(value) if value is not None else None
+
+
+def trigger(scenario):
+    if scenario == "scheduler":
+        from scheduler import send_earthquake_notifications
+        send_earthquake_notifications()
+    elif scenario == "simulate":
+        from flask import Flask
+        from auth import ALERTS_API_KEY
+        from routes.simulation_routes import simulation_bp
+
+        # app.py içe aktarılmaz; gömülü zamanlayıcı ölçüme iş eklemesin
+        app = Flask(__name__)
+        app.register_blueprint(simulation_bp)
+        response = app.test_client().post("/simulate/earthquake", json={},
+                                           headers={"X-Api-Key": ALERTS_API_KEY or ""})
+        if response.status_code != 202:
+            raise RuntimeError(f"simulate_earthquake {response.status_code}: {response.get_json()}")
+    else:
+        from utils.notifications import send_push_notification
+        send_push_notification("Deprem Uyarısı", "Benchmark", kind="bench")
+
+
+def wait_for_drain(job_ids, timeout):
+    from db import db_connection
+    from utils.push_outbox import job_progress
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with db_connection() as conn:
+            progress = [job_progress(conn, job_id) for job_id in job_ids]
+        if all(p["state"] in ("done", "failed") for p in progress):
+            return progress
+        time.sleep(0.2)
+    raise TimeoutError(f"{timeout} sn içinde kuyruk boşalmadı")
+
+
+def run_scenario(scenario, timeout):
+    before = max_job_id()
+    started = time.time()
+    trigger(scenario)
+    enqueued = time.time()
+
+    job_ids = list(range(before + 1, max_job_id() + 1))
+    if not job_ids:
+        raise RuntimeError(f"{scenario}: iş oluşturulmadı")
+
+    progress = wait_for_drain(job_ids, timeout)
+    finished = time.time()
+    first = first_sent_at(job_ids)
+
+    total = sum(p["queued"] for p in progress)
+    sent = sum(p["sent"] for p in progress)
+    errors = {}
+    for p in progress:
+        for error, count in p["errors"].items():
+            errors[error] = errors.get(error, 0) + count
+
+    return {
+        "scenario": scenario,
+        "jobs": job_ids,
+        "lanes": sorted({p["lane"] for p in progress}),
+        "queued": total,
+        "sent": sent,
+        "failed": sum(p["failed"] for p in progress),
+        "dead": sum(p["dead"] for p in progress),
+        "errors": errors,
+        "enqueue_sec": round(enqueued - started, 3),
+        "first_push_sec": round(first - started, 3) if first else None,
+        "total_sec": round(finished - started, 3),
+        "messages_per_sec": round(sent / (finished - started), 1) if finished > started else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uçtan uca push benchmark")
+    parser.add_argument("--tokens", type=int, default=100000)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--unregistered-rate", type=float, default=0.0)
+    parser.add_argument("--batch", type=int, default=1000, help="Worker kiralama boyutu")
+    parser.add_argument("--timeout", type=float, default=600, help="Senaryo başına azami süre (sn)")
+    parser.add_argument("--output", help="JSON sonuç dosyası (verilmezse stdout)")
+    args = parser.parse_args()
+    scenarios = [s for s in args.scenarios.split(",") if s in SCENARIOS]
+
+    port = free_port()
+    server = subprocess.Popen([
+        sys.executable, "-m", "scripts.mock_expo_server", "--port", str(port),
+        "--latency-ms", str(args.latency_ms), "--error-rate", str(args.error_rate),
+        "--throttle-rate", str(args.throttle_rate), "--unregistered-rate", str(args.unregistered_rate),
+    ], stdout=subprocess.DEVNULL)
+
+    stopping = threading.Event()
+    first_job_id = None
+    try:
+        wait_for_port(port)
+        # Modüller içe aktarılmadan önce ayarlanmalı
+        os.environ["EXPO_PUSH_URL"] = f"http://127.0.0.1:{port}/--/api/v2/push/send"
+        os.environ["EXPO_RECEIPTS_URL"] = f"http://127.0.0.1:{port}/--/api/v2/push/getReceipts"
+        os.environ["PUSH_LANE_TEST_MAX_DEPTH"] = str(max(args.tokens * 2, 10000))
+        os.environ["PUSH_BACKOFF_BASE"] = os.getenv("PUSH_BACKOFF_BASE", "0.05")
+
+        from push_worker import run_lane, run_expander
+        from utils.push_outbox import LANES
+
+        first_job_id = max_job_id()
+        seed_tokens(args.tokens)
+
+        worker_id = f"bench:{os.getpid()}"
+        lanes = [threading.Thread(target=run_lane, args=(lane, worker_id, args.batch, stopping), daemon=True)
+                 for lane in LANES]
+        lanes.append(threading.Thread(target=run_expander, args=(stopping,), daemon=True))
+        for t in lanes:
+            t.start()
+
+        results = []
+        for scenario in scenarios:
+            print(f"▶ {scenario} ...", file=sys.stderr)
+            results.append(run_scenario(scenario, args.timeout))
+
+        import requests
+        mock_stats = requests.get(f"http://127.0.0.1:{port}/stats", timeout=5).json()
+
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "config": {
+                "tokens": args.tokens,
+                "latency_ms": args.latency_ms,
+                "error_rate": args.error_rate,
+                "throttle_rate": args.throttle_rate,
+                "unregistered_rate": args.unregistered_rate,
+                "batch": args.batch,
+            },
+            "results": results,
+            "mock": mock_stats,
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(output + "\n")
+        else:
+            print(output)
+
+    finally:
+        stopping.set()
+        if first_job_id is not None:
+            cleanup(first_job_id)
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
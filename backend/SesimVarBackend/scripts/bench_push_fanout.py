@@ -0,0 +1,86 @@
+# scripts/bench_push_fanout.py
+# -*- coding: utf-8 -*-
+"""
+Push dağıtım hızı: sıralı toplu gönderim ile eşzamanlı FanoutEngine karşılaştırması.
+Mock Expo sunucusunu ayrı bir süreçte başlatır (gerçekçi gecikme ile).
+
+Kullanım (backend dizininden):
+    python -m scripts.bench_push_fanout --tokens 1000000 --latency-ms 150 --concurrency 64
+    python -m scripts.bench_push_fanout --tokens 100000 --json > fanout.json
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("Mock sunucu başlatılamadı")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Push fan-out benchmark")
+    parser.add_argument("--tokens", type=int, default=1000000)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--sequential-sample", type=int, default=5000,
+                        help="Sıralı yol bu kadar token ile ölçülüp ölçeklenir")
+    parser.add_argument("--json", action="store_true", help="Sonucu JSON olarak yaz")
+    args = parser.parse_args()
+
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "-m", "scripts.mock_expo_server",
+                               "--port", str(port), "--latency-ms", str(args.latency_ms)],
+                              stdout=subprocess.DEVNULL if args.json else None)
+    try:
+        wait_for_port(port)
+        os.environ["EXPO_PUSH_URL"] = f"http://127.0.0.1:{port}/--/api/v2/push/send"
+
+        from utils.notifications import FanoutEngine, build_message
+
+        tokens = [f"ExponentPushToken[bench-{i}]" for i in range(args.tokens)]
+        messages = [build_message(t, "Deprem Uyarısı", "Benchmark") for t in tokens]
+
+        sample = messages[:args.sequential_sample]
+        seq = FanoutEngine(concurrency=1, per_host=1).send(sample, keep_tickets=False)
+        seq_projected = seq.elapsed * len(messages) / max(len(sample), 1)
+
+        fan = FanoutEngine(concurrency=args.concurrency, per_host=args.concurrency).send(messages, keep_tickets=False)
+
+        if args.json:
+            print(json.dumps({
+                "tokens": len(messages),
+                "latency_ms": args.latency_ms,
+                "concurrency": args.concurrency,
+                "sequential": {**seq.summary(), "projected_total_sec": round(seq_projected, 1)},
+                "fanout": fan.summary(),
+            }, indent=2))
+            return
+
+        print(f"tokens={len(messages)} latency={args.latency_ms}ms concurrency={args.concurrency}")
+        print(f"  sıralı     : {seq.rate:>10.0f} mesaj/sn  (tahmini toplam {seq_projected:.1f} sn)")
+        print(f"  fan-out    : {fan.rate:>10.0f} mesaj/sn  (toplam {fan.elapsed:.1f} sn, "
+              f"{fan.ok} ok / {fan.failed} hata, {fan.retries} tekrar)")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
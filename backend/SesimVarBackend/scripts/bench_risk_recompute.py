@@ -0,0 +1,70 @@
+# scripts/bench_risk_recompute.py
+# -*- coding: utf-8 -*-
+"""
+recompute_risks'in hesaplama kısmını ölçer: N aktif çağrı için ızgara sayacından bölge riski
+ve toplu kullanıcı riski (ayrıca ikisinin payı ayrı ayrı). Veritabanı gerektirmez; okuma/yazma süresi parça başına bir SELECT
+ve bir UPDATE olduğundan satır sayısıyla değil parça sayısıyla büyür.
+
+Kullanım (backend dizininden):
+    python -m scripts.bench_risk_recompute --rows 1000000 --chunk 5000
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from utils.geo import cell_of
+from utils.risk_matcher import get_matcher
+from utils.risk_recompute import ZoneGrid, recompute_rows
+from scripts.bench_user_risk import make_messages
+from scripts.bench_zone_risk import random_point
+
+
+def make_rows(count):
+    messages = make_messages(min(count, 50000), list(get_matcher().terms.values()))
+    rows = []
+    for help_id in range(1, count + 1):
+        lat, lon = random_point()
+        rows.append((help_id, cell_of(lat, lon), lat, lon, messages[help_id % len(messages)],
+                     "orta", "düşük", 0))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Risk yeniden hesaplama ölçümü")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--chunk", type=int, default=5000)
+    parser.add_argument("--window-share", type=float, default=0.2,
+                        help="Çağrıların ne kadarı pencere içinde sayılsın")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    cell_counts = Counter(row[1] for row in rows if random.random() < args.window_share)
+    matcher = get_matcher()
+
+    started = time.perf_counter()
+    grid = ZoneGrid(cell_counts)
+    changed = 0
+    for i in range(0, len(rows), args.chunk):
+        changed += len(recompute_rows(rows[i:i + args.chunk], grid, matcher))
+    elapsed = time.perf_counter() - started
+
+    # Pay dağılımı: ızgara (bölge riski) ve sözlük eşleştirme (kullanıcı riski) ayrı ayrı
+    started = time.perf_counter()
+    grid = ZoneGrid(cell_counts)
+    for row in rows:
+        grid.level(row[1])
+    zone_elapsed = time.perf_counter() - started
+    started = time.perf_counter()
+    for i in range(0, len(rows), args.chunk):
+        matcher.assess_many([row[4] for row in rows[i:i + args.chunk]])
+    user_elapsed = time.perf_counter() - started
+
+    print(f"{args.rows} çağrı, {len(cell_counts)} dolu hücre, {changed} değişen satır")
+    print(f"hesaplama: {elapsed:.2f} sn ({args.rows / elapsed:,.0f} çağrı/sn), "
+          f"{-(-args.rows // args.chunk)} parça → {-(-args.rows // args.chunk)} SELECT + en fazla aynı sayıda UPDATE")
+    print(f"  bölge riski (ızgara): {zone_elapsed:.2f} sn, kullanıcı riski (sözlük): {user_elapsed:.2f} sn")
+
+
+if __name__ == "__main__":
+    main()
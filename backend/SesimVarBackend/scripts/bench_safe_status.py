@@ -0,0 +1,125 @@
+# scripts/bench_safe_status.py
+# -*- coding: utf-8 -*-
+"""
+"Güvendeyim" yazım karşılaştırması: istek başına tek satır INSERT + commit ile
+write-behind tamponu (çok satırlı INSERT). Geçici bench_safe_status tablosunu kullanır,
+gerçek tablolara dokunmaz.
+
+Kullanım (backend dizininden):
+    python -m scripts.bench_safe_status --rows 20000 --threads 16
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from datetime import datetime
+
+from db import db_connection, get_pool
+from utils.write_behind import WriteBehindBuffer, SAFE_FLUSH_ROWS, SAFE_FLUSH_MS
+
+
+def setup():
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DROP TABLE IF EXISTS bench_safe_status")
+        cursor.execute("CREATE TABLE bench_safe_status LIKE safe_status")
+        conn.commit()
+
+
+def teardown():
+    with db_connection() as conn:
+        conn.cursor().execute("DROP TABLE IF EXISTS bench_safe_status")
+
+
+def row_count():
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM bench_safe_status")
+        return cursor.fetchone()[0]
+
+
+def per_request(user_id, lat, lon):
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO bench_safe_status (user_id, latitude, longitude, created_at)
+            VALUES (%s, %s, %s, NOW())
+        """, (user_id, lat, lon))
+        conn.commit()
+
+
+def write_rows(rows):
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO bench_safe_status (user_id, latitude, longitude, created_at) VALUES "
+            + ", ".join(["(%s, %s, %s, %s)"] * len(rows)),
+            [v for row in rows for v in row])
+        conn.commit()
+
+
+def run(rows, threads, handle):
+    """rows isteği threads eşzamanlı "istemci" ile gönderir. Döner: (süre, istek gecikmeleri ms)."""
+    latencies = []
+    lock = threading.Lock()
+    per_thread = rows // threads
+
+    def client(offset):
+        local = []
+        for i in range(per_thread):
+            lat, lon = 37 + random.random(), 37 + random.random()
+            started = time.perf_counter()
+            handle(900000000 + offset * per_thread + i, lat, lon)
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=client, args=(t,)) for t in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - started, sorted(latencies)
+
+
+def report(name, rows, elapsed, latencies):
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:>14} | {rows / elapsed:>10,.0f} | {statistics.median(latencies):>8.3f} | {p95:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Güvendeyim yazım karşılaştırması")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--flush-rows", type=int, default=SAFE_FLUSH_ROWS)
+    parser.add_argument("--flush-ms", type=int, default=SAFE_FLUSH_MS)
+    args = parser.parse_args()
+    rows = args.rows // args.threads * args.threads
+
+    setup()
+    print(f"havuz: {get_pool().size} bağlantı, {args.threads} eşzamanlı istemci, {rows} bildirim")
+    print(f"{'yol':>14} | {'satır/sn':>10} | {'p50 ms':>8} | {'p95 ms':>8}")
+    try:
+        elapsed, latencies = run(rows, args.threads, per_request)
+        report("istek başına", rows, elapsed, latencies)
+
+        buffer = WriteBehindBuffer(write_rows, max_rows=rows, flush_rows=args.flush_rows,
+                                   flush_ms=args.flush_ms, name="bench-writer").start()
+        started = time.perf_counter()
+        _, latencies = run(rows, args.threads,
+                           lambda uid, lat, lon: buffer.append((uid, lat, lon, datetime.now())))
+        buffer.stop()
+        # Tampon yolunda süre, tüm satırlar veritabanına yazılana kadar ölçülür
+        report("write-behind", rows, time.perf_counter() - started, latencies)
+
+        stats = buffer.stats()
+        print(f"toplu yazım: {stats['batches']} INSERT, ortalama {stats['flushed'] / max(stats['batches'], 1):.0f} satır; "
+              f"tabloda {row_count()} satır (beklenen {rows * 2})")
+    finally:
+        teardown()
+
+
+if __name__ == "__main__":
+    main()
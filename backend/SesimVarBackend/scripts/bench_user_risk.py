@@ -0,0 +1,68 @@
+# scripts/bench_user_risk.py
+# -*- coding: utf-8 -*-
+"""
+determine_user_risk karşılaştırması: eski lower() + kelime başına `in` taraması ile
+derlenmiş RiskMatcher. Veritabanı gerektirmez.
+
+Kullanım (backend dizininden):
+    python -m scripts.bench_user_risk --messages 200000 --lexicon-size 200
+"""
+import argparse
+import random
+import time
+
+from utils.risk_matcher import DEFAULT_LEXICON, RiskMatcher
+
+FILLER = ["yardım", "lütfen", "binada", "kaldık", "su", "yok", "annem", "burada", "kat", "merdiven",
+          "ses", "duyuyoruz", "bekliyoruz", "sokak", "apartman", "kapı", "açılmıyor", "soğuk", "gece"]
+
+
+def legacy(message, words):
+    for word in words:
+        if word in message.lower():
+            return "kritik"
+    return "orta"
+
+
+def make_messages(count, terms):
+    messages = []
+    for _ in range(count):
+        words = random.choices(FILLER, k=random.randint(4, 14))
+        if random.random() < 0.3:
+            words.insert(random.randrange(len(words)), random.choice(terms).upper())
+        messages.append(" ".join(words))
+    return messages
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kullanıcı risk sınıflandırma benchmark")
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--lexicon-size", type=int, default=len(DEFAULT_LEXICON),
+                        help="Sözlük bu boyuta sentetik terimlerle büyütülür")
+    args = parser.parse_args()
+
+    lexicon = dict(DEFAULT_LEXICON)
+    for i in range(args.lexicon_size - len(lexicon)):
+        lexicon[f"terim{i}"] = 1
+    terms = list(DEFAULT_LEXICON)
+    messages = make_messages(args.messages, terms)
+
+    matcher, build = timed(lambda: RiskMatcher(lexicon))
+    old, old_sec = timed(lambda: [legacy(m, list(lexicon)) for m in messages])
+    new, new_sec = timed(lambda: matcher.assess_many(messages))
+
+    critical_old = old.count("kritik")
+    critical_new = sum(1 for r in new if r["level"] == "kritik")
+    print(f"messages={len(messages)} lexicon={len(lexicon)} (derleme {build * 1000:.1f} ms)")
+    print(f"  eski (lower + in) : {len(messages) / old_sec:>10.0f} mesaj/sn  kritik={critical_old}")
+    print(f"  RiskMatcher       : {len(messages) / new_sec:>10.0f} mesaj/sn  kritik={critical_new}")
+
+
+if __name__ == "__main__":
+    main()
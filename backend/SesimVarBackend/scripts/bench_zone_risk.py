@@ -0,0 +1,118 @@
+# scripts/bench_zone_risk.py
+# -*- coding: utf-8 -*-
+"""
+classify_zone_risk karşılaştırması: eski ABS() taraması ile üretimdeki sorgu (9 hücrenin
+son ZONE_RISK_WINDOW içindeki çağrıları, (cell_id, created_at) indeksinden COUNT).
+Geçici bench_help_requests tablosuna son 48 saate yayılmış N kayıt yükler, her boyut için
+gecikmeleri ölçer. Gerçek tablolara dokunmaz.
+
+Kullanım (backend dizininden):
+    python -m scripts.bench_zone_risk --sizes 10000,100000,1000000 --queries 200
+"""
+import argparse
+import random
+import statistics
+import time
+
+from db import db_connection
+from utils.geo import cell_of, neighbor_cells
+from utils.heatmap import WINDOWS, ZONE_RISK_WINDOW
+
+# Deprem bölgesi benzeri yoğunluk: birkaç il merkezi etrafında kümelenmiş noktalar
+CENTERS = [(38.6766, 39.2238), (37.5858, 36.9371), (37.0662, 37.3833), (36.2021, 36.1600)]
+SPREAD_SECONDS = 48 * 3600
+
+
+def random_point():
+    lat, lon = random.choice(CENTERS)
+    return lat + random.gauss(0, 0.08), lon + random.gauss(0, 0.08)
+
+
+def setup(cursor):
+    cursor.execute("DROP TABLE IF EXISTS bench_help_requests")
+    cursor.execute("""
+        CREATE TABLE bench_help_requests (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            latitude DECIMAL(10, 7) NOT NULL,
+            longitude DECIMAL(10, 7) NOT NULL,
+            cell_id INT NOT NULL,
+            created_at DATETIME NOT NULL,
+            INDEX idx_bench_cell_created (cell_id, created_at)
+        )
+    """)
+
+
+def seed(conn, cursor, rows):
+    sql = """
+        INSERT INTO bench_help_requests (latitude, longitude, cell_id, created_at)
+        VALUES (%s, %s, %s, NOW() - INTERVAL %s SECOND)
+    """
+    batch = []
+    for _ in range(rows):
+        lat, lon = random_point()
+        batch.append((lat, lon, cell_of(lat, lon), random.randint(0, SPREAD_SECONDS)))
+        if len(batch) == 5000:
+            cursor.executemany(sql, batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+    conn.commit()
+
+
+def query_scan(cursor, lat, lon):
+    cursor.execute("""
+        SELECT COUNT(*) FROM bench_help_requests
+        WHERE ABS(latitude - %s) < 0.01 AND ABS(longitude - %s) < 0.01
+    """, (lat, lon))
+    return cursor.fetchone()[0]
+
+
+def query_cells(cursor, lat, lon):
+    # routes/help_routes.classify_zone_risks ile aynı sorgu
+    cells = neighbor_cells(cell_of(lat, lon))
+    cursor.execute(f"""
+        SELECT COUNT(*) FROM bench_help_requests
+        WHERE cell_id IN ({", ".join(["%s"] * len(cells))})
+          AND created_at >= NOW() - INTERVAL %s SECOND
+    """, (*cells, WINDOWS[ZONE_RISK_WINDOW]))
+    return cursor.fetchone()[0]
+
+
+def measure(cursor, fn, points):
+    timings = []
+    for lat, lon in points:
+        start = time.perf_counter()
+        fn(cursor, lat, lon)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zone risk sorgu karşılaştırması")
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    points = [random_point() for _ in range(args.queries)]
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        setup(cursor)
+        loaded = 0
+
+        print(f"{'rows':>10} | {'scan p50':>9} | {'scan p95':>9} | {'cell p50':>9} | {'cell p95':>9}  (ms)")
+        for size in sizes:
+            seed(conn, cursor, size - loaded)
+            loaded = size
+
+            scan_p50, scan_p95 = measure(cursor, query_scan, points)
+            cell_p50, cell_p95 = measure(cursor, query_cells, points)
+            print(f"{size:>10} | {scan_p50:>9.3f} | {scan_p95:>9.3f} | {cell_p50:>9.3f} | {cell_p95:>9.3f}")
+
+        cursor.execute("DROP TABLE bench_help_requests")
+
+
+if __name__ == "__main__":
+    main()
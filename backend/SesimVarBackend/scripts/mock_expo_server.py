@@ -0,0 +1,161 @@
+# scripts/mock_expo_server.py
+# -*- coding: utf-8 -*-
+"""
+Yerel Expo push sunucusu taklidi. Gerçek exp.host'a gitmeden dağıtım hızını ölçmek için.
+Push (send) ve receipt (getReceipts) uçlarını; gecikme, hata oranları, 429 kısıtlama ve
+DeviceNotRegistered yanıtlarını taklit eder. GET /stats istek/mesaj sayaçlarını döner.
+
+Kullanım (backend dizininden):
+    python -m scripts.mock_expo_server --port 8765 --latency-ms 150 --throttle-rate 0.02 --unregistered-rate 0.01
+    EXPO_PUSH_URL=http://127.0.0.1:8765/--/api/v2/push/send \\
+    EXPO_RECEIPTS_URL=http://127.0.0.1:8765/--/api/v2/push/getReceipts python ...
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SEND_PATH = "/--/api/v2/push/send"
+RECEIPTS_PATH = "/--/api/v2/push/getReceipts"
+
+
+class MockExpoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    error_rate = 0.0          # istek başına HTTP 503 olasılığı
+    throttle_rate = 0.0       # istek başına HTTP 429 olasılığı
+    retry_after = 1
+    unregistered_rate = 0.0   # mesaj başına DeviceNotRegistered ticket olasılığı
+    receipt_error_rate = 0.0  # receipt başına DeviceNotRegistered olasılığı
+    stats = None
+    lock = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self, **values):
+        with self.lock:
+            self.stats.update(values)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self, default):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or default)
+
+    def _ticket(self, message):
+        # "unregistered" içeren token'lar her zaman kayıtsız sayılır (deterministik test için)
+        if "unregistered" in message.get("to", "") or random.random() < self.unregistered_rate:
+            self._count(unregistered=1)
+            return {
+                "status": "error",
+                "message": f"\"{message.get('to')}\" is not a registered push notification recipient",
+                "details": {"error": "DeviceNotRegistered"},
+            }
+        return {"status": "ok", "id": str(uuid.uuid4())}
+
+    def do_GET(self):
+        if self.path != "/stats":
+            return self._send_json(404, {"errors": [{"code": "NOT_FOUND"}]})
+        with self.lock:
+            self._send_json(200, dict(self.stats))
+
+    def do_POST(self):
+        if self.path == RECEIPTS_PATH:
+            return self._receipts()
+
+        messages = self._read_json(b"[]")
+        if isinstance(messages, dict):
+            messages = [messages]
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        roll = random.random()
+        if roll < self.throttle_rate:
+            self._count(requests=1, throttled=1)
+            return self._send_json(429, {"errors": [{"code": "TOO_MANY_REQUESTS"}]},
+                                   {"Retry-After": str(self.retry_after)})
+        if roll < self.throttle_rate + self.error_rate:
+            self._count(requests=1, server_errors=1)
+            return self._send_json(503, {"errors": [{"code": "INTERNAL_SERVER_ERROR"}]})
+
+        tickets = [self._ticket(m) for m in messages]
+        self._count(requests=1, messages=len(messages))
+        self._send_json(200, {"data": tickets})
+
+    def _receipts(self):
+        ids = self._read_json(b"{}").get("ids") or []
+        if self.latency:
+            time.sleep(self.latency)
+
+        receipts = {}
+        for ticket_id in ids:
+            if random.random() < self.receipt_error_rate:
+                receipts[ticket_id] = {"status": "error", "details": {"error": "DeviceNotRegistered"}}
+            else:
+                receipts[ticket_id] = {"status": "ok"}
+        self._count(receipt_requests=1, receipts=len(ids))
+        self._send_json(200, {"data": receipts})
+
+
+def serve(host, port, latency_ms, error_rate=0.0, throttle_rate=0.0, unregistered_rate=0.0,
+          receipt_error_rate=0.0, retry_after=1):
+    handler = type("Handler", (MockExpoHandler,), {
+        "latency": latency_ms / 1000,
+        "error_rate": error_rate,
+        "throttle_rate": throttle_rate,
+        "unregistered_rate": unregistered_rate,
+        "receipt_error_rate": receipt_error_rate,
+        "retry_after": retry_after,
+        "stats": Counter(),
+        "lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel Expo push taklidi")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="İstek başına HTTP 503 olasılığı")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="İstek başına HTTP 429 olasılığı")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 yanıtlarındaki Retry-After (sn)")
+    parser.add_argument("--unregistered-rate", type=float, default=0.0,
+                        help="Mesaj başına DeviceNotRegistered ticket olasılığı")
+    parser.add_argument("--receipt-error-rate", type=float, default=0.0,
+                        help="Receipt başına DeviceNotRegistered olasılığı")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    server = serve(args.host, args.port, args.latency_ms, args.error_rate, args.throttle_rate,
+                   args.unregistered_rate, args.receipt_error_rate, args.retry_after)
+    print(f"✅ Mock Expo http://{args.host}:{args.port} (gecikme {args.latency_ms} ms, "
+          f"503 %{args.error_rate * 100:g}, 429 %{args.throttle_rate * 100:g}, "
+          f"DeviceNotRegistered %{args.unregistered_rate * 100:g})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
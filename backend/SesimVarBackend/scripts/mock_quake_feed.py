@@ -0,0 +1,109 @@
+# scripts/mock_quake_feed.py
+# -*- coding: utf-8 -*-
+"""
+Yerel deprem akışı (USGS biçiminde GeoJSON). Dosyaya olay ekler veya dosyayı HTTP ile sunar.
+
+Kullanım (backend dizininden):
+    python -m scripts.mock_quake_feed add --file quakes.geojson --mag 5.4 --lat 38.68 --lon 39.22
+    python -m scripts.mock_quake_feed serve --file quakes.geojson --port 8766
+    EARTHQUAKE_FEED=file:quakes.geojson python scheduler.py
+    EARTHQUAKE_FEED=http://127.0.0.1:8766/ python scheduler.py
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+import uuid
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def load(path):
+    if not os.path.exists(path):
+        return {"type": "FeatureCollection", "features": []}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def add_event(path, magnitude, latitude, longitude, depth_km=10.0, place=None, event_id=None):
+    feed = load(path)
+    event_id = event_id or f"mock{uuid.uuid4().hex[:10]}"
+    feed["features"].append({
+        "type": "Feature",
+        "id": event_id,
+        "properties": {"mag": magnitude, "place": place, "time": int(time.time() * 1000)},
+        "geometry": {"type": "Point", "coordinates": [longitude, latitude, depth_km]},
+    })
+    # Yazarken okunan yarım dosya olmasın
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(feed, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return event_id
+
+
+def serve(path, host, port):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            with open(path, "rb") as f:
+                body = f.read()
+            etag = f"\"{hashlib.md5(body).hexdigest()}\""
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/geo+json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(os.path.getmtime(path), usegmt=True))
+            self.end_headers()
+            self.wfile.write(body)
+
+    # Dosya yoksa boş akış oluştur
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(load(path), f)
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel deprem akışı")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    add = sub.add_parser("add", help="Akışa olay ekle")
+    add.add_argument("--file", required=True)
+    add.add_argument("--mag", type=float, required=True)
+    add.add_argument("--lat", type=float, required=True)
+    add.add_argument("--lon", type=float, required=True)
+    add.add_argument("--depth", type=float, default=10.0)
+    add.add_argument("--place")
+    add.add_argument("--id")
+
+    srv = sub.add_parser("serve", help="Akış dosyasını HTTP ile sun")
+    srv.add_argument("--file", required=True)
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8766)
+
+    args = parser.parse_args()
+    if args.command == "add":
+        event_id = add_event(args.file, args.mag, args.lat, args.lon, args.depth, args.place, args.id)
+        print(f"✅ Olay eklendi: {event_id}")
+        return
+
+    server = serve(args.file, args.host, args.port)
+    print(f"✅ Deprem akışı http://{args.host}:{args.port}/ ({args.file})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
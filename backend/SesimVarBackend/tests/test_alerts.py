@@ -0,0 +1,42 @@
+# tests/test_alerts.py
+# -*- coding: utf-8 -*-
+
+from utils.alerts import neighborhoods_in_ring, resolve_rings
+
+
+class FakeCursor:
+    """Kutu sorgusunu veritabanı gibi uygular: yalnızca kutudaki mahalleler döner."""
+
+    def __init__(self, neighborhoods):
+        self.neighborhoods = neighborhoods
+        self.queries = []
+
+    def execute(self, sql, params):
+        self.queries.append((sql, params))
+        min_lat, max_lat, min_lon, max_lon = params
+        self.rows = [(nid, lat, lon) for nid, lat, lon in self.neighborhoods
+                     if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon]
+
+    def fetchall(self):
+        return self.rows
+
+
+NEIGHBORHOODS = [
+    (1, 38.68, 39.22),   # episentr yanında
+    (2, 38.90, 39.22),   # ~24 km kuzey
+    (3, 39.20, 39.22),   # ~58 km kuzey
+    (4, 41.00, 29.00),   # İstanbul
+]
+
+
+def test_ring_uses_bounding_box_and_exact_distance():
+    cursor = FakeCursor(NEIGHBORHOODS)
+    assert neighborhoods_in_ring(cursor, 38.6766, 39.2238, 0, 30) == [1, 2]
+    sql, (min_lat, max_lat, min_lon, max_lon) = cursor.queries[0]
+    assert "latitude BETWEEN %s AND %s AND longitude BETWEEN %s AND %s" in sql
+    assert min_lat < 38.6766 < max_lat and min_lon < 39.2238 < max_lon
+
+
+def test_rings_do_not_overlap():
+    rings = resolve_rings(FakeCursor(NEIGHBORHOODS), 38.6766, 39.2238, [100, 10, 30])
+    assert rings == [(0, 10, [1]), (10, 30, [2]), (30, 100, [3])]
@@ -0,0 +1,14 @@
+# tests/test_clusters.py
+# -*- coding: utf-8 -*-
+
+from utils.clusters import ClusterIndex
+
+
+def test_apply_delta_updates_risk_and_drops_inactive():
+    index = ClusterIndex()
+    index.load([(1, 37.0, 35.0, 0), (2, 37.001, 35.001, 0)])
+    # Risk yeniden hesaplandı (1), çağrı başka worker'da kapatıldı (2), yeni çağrı (3)
+    index.apply_delta([(1, 37.0, 35.0, 2, True), (2, 37.001, 35.001, 0, False), (3, 37.002, 35.002, 1, True)])
+    _, clusters = index.clusters(36.9, 34.9, 37.1, 35.1, 8)
+    assert [(c["count"], c["max_risk"]) for c in clusters] == [(2, "yüksek")]
+    assert index.stats()["points"] == 2
@@ -0,0 +1,79 @@
+# tests/test_expo_delivery.py
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+import requests
+
+from scripts.mock_expo_server import serve, SEND_PATH
+from utils.notifications import post_batch, get_session, FanoutEngine, EXPO_BATCH_SIZE
+
+
+@pytest.fixture
+def mock_expo():
+    def start(**options):
+        server = serve("127.0.0.1", 0, 0, **options)
+        connections = []
+        process_request = server.process_request
+
+        def counting(request, client_address):
+            connections.append(client_address)
+            return process_request(request, client_address)
+
+        server.process_request = counting
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        host, port = server.server_address
+        return f"http://{host}:{port}{SEND_PATH}", server.RequestHandlerClass.stats, connections
+
+    servers = []
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _messages(count, prefix="ok"):
+    return [{"to": f"ExponentPushToken[{prefix}-{i}]", "title": "t", "body": "b"} for i in range(count)]
+
+
+def test_post_batch_parses_tickets_in_order(mock_expo):
+    url, stats, _ = mock_expo()
+    messages = _messages(3)
+    messages[1]["to"] = "ExponentPushToken[unregistered-1]"
+    status, tickets, retry_after = post_batch(messages, session=requests.Session(), url=url)
+    assert (status, retry_after) == (200, None)
+    assert [t["status"] for t in tickets] == ["ok", "error", "ok"]
+    assert tickets[1]["details"]["error"] == "DeviceNotRegistered"
+    assert stats["messages"] == 3
+
+
+def test_post_batch_reports_throttling(mock_expo):
+    url, _, _ = mock_expo(throttle_rate=1.0, retry_after=7)
+    status, tickets, retry_after = post_batch(_messages(2), session=requests.Session(), url=url)
+    assert (status, retry_after) == (429, 7.0)
+    assert [t["details"]["error"] for t in tickets] == ["HTTP429", "HTTP429"]
+
+
+def test_post_batch_reports_network_error():
+    status, tickets, _ = post_batch(_messages(1), session=requests.Session(), url="http://127.0.0.1:9/")
+    assert status == 0 and tickets[0]["details"]["error"] == "NetworkError"
+
+
+def test_session_reuses_one_connection(mock_expo):
+    url, stats, connections = mock_expo()
+    session = get_session()
+    assert get_session() is session
+    for _ in range(3):
+        assert post_batch(_messages(2), url=url)[0] == 200
+    assert stats["requests"] == 3
+    assert len(connections) == 1
+
+
+def test_fanout_chunks_into_expo_sized_batches(mock_expo):
+    url, stats, _ = mock_expo()
+    count = EXPO_BATCH_SIZE * 2 + 50
+    report = FanoutEngine(concurrency=2, url=url).send(_messages(count))
+    assert (report.total, report.ok, report.batches) == (count, count, 3)
+    assert stats["requests"] == 3 and stats["messages"] == count
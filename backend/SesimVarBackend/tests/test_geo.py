@@ -0,0 +1,38 @@
+# tests/test_geo.py
+# -*- coding: utf-8 -*-
+
+from utils.geo import cell_of, cell_center, neighbor_cells, cell_ranges, parse_bbox, GRID_COLUMNS
+
+
+def test_cell_of_is_stable_on_cell_edges():
+    # 37.01 * 100 kayan noktada 3700.9999... olur; yine de aynı satıra düşmeli
+    assert cell_of(37.01, 35.0) == cell_of(37.015, 35.005)
+    assert cell_of(37.0, 35.0) != cell_of(37.01, 35.0)
+
+
+def test_cell_center_round_trip():
+    for lat, lon in ((37.003, 35.321), (-33.9, 151.2), (0.0, -179.995)):
+        center = cell_center(cell_of(lat, lon))
+        assert cell_of(*center) == cell_of(lat, lon)
+
+
+def test_neighbor_cells_wrap_longitude():
+    cell = cell_of(10.0, 179.995)
+    neighbors = neighbor_cells(cell)
+    assert len(neighbors) == 9 and cell in neighbors
+    assert cell_of(10.0, -179.995) in neighbors
+
+
+def test_cell_ranges_one_range_per_row():
+    ranges = cell_ranges(37.0, 35.2, 37.025, 35.23)
+    assert len(ranges) == 3
+    for first, last in ranges:
+        assert last - first == 3
+    assert ranges[1][0] - ranges[0][0] == GRID_COLUMNS
+
+
+def test_parse_bbox_rejects_invalid():
+    assert parse_bbox({"min_lat": "1", "min_lon": "2", "max_lat": "3", "max_lon": "4"}) == (1.0, 2.0, 3.0, 4.0)
+    assert parse_bbox({"min_lat": "3", "min_lon": "2", "max_lat": "1", "max_lon": "4"}) is None
+    assert parse_bbox({"min_lat": "x", "min_lon": "2", "max_lat": "3", "max_lon": "4"}) is None
+    assert parse_bbox({}) is None
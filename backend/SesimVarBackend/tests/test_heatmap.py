@@ -0,0 +1,27 @@
+# tests/test_heatmap.py
+# -*- coding: utf-8 -*-
+
+import time
+
+from utils.heatmap import HelpCallHeatmap
+
+
+def test_merge_adds_new_calls_and_advances_max_id():
+    now = time.time()
+    heatmap = HelpCallHeatmap()
+    heatmap.load([(1, 10, now - 60), (2, 11, now - 30)], max_id=2)
+    heatmap.merge([(3, 10, now - 10), (4, 12, now - 5)])
+    assert heatmap.max_id == 4
+    assert heatmap.snapshot("15m") == {10: 2, 11: 1, 12: 1}
+
+
+def test_local_add_does_not_advance_max_id():
+    # Diğer worker'ın daha küçük id'li çağrısı sonraki fark okumasında atlanmamalı
+    now = time.time()
+    heatmap = HelpCallHeatmap()
+    heatmap.load([], max_id=5)
+    heatmap.add(9, 10, now)
+    assert heatmap.max_id == 5
+    heatmap.merge([(7, 10, now), (9, 10, now)])
+    assert heatmap.max_id == 9
+    assert heatmap.count([10], "15m") == 2
@@ -0,0 +1,66 @@
+# tests/test_help_routes.py
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+
+import pytest
+
+from routes.help_routes import (encode_cursor, decode_cursor, area_query, group_repeat_calls,
+                                 AREA_UNION_MAX_CELLS)
+from utils.geo import cell_ranges
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 2, 6, 4, 17, 35)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_cursor_rejects_garbage():
+    with pytest.raises(Exception):
+        decode_cursor("not-a-cursor")
+
+
+def test_area_query_per_cell_union():
+    ranges = cell_ranges(37.0, 35.2, 37.015, 35.215)
+    where = ["latitude BETWEEN %s AND %s", "status IN (%s)"]
+    sql, params = area_query(ranges, where, [37.0, 37.015, "aktif"], 11)
+    cells = sum(last - first + 1 for first, last in ranges)
+    assert sql.count("UNION ALL") == cells - 1
+    assert " OR " not in sql
+    assert sql.count("%s") == len(params)
+    assert params[:5] == [ranges[0][0], 37.0, 37.015, "aktif", 11]
+    assert params[-1] == 11
+
+
+def test_area_query_falls_back_to_ranges_for_large_boxes():
+    ranges = cell_ranges(37.0, 35.0, 38.0, 36.0)
+    assert sum(last - first + 1 for first, last in ranges) > AREA_UNION_MAX_CELLS
+    sql, params = area_query(ranges, ["status IN (%s)"], ["aktif"], 11)
+    assert "UNION" not in sql
+    assert sql.count("cell_id BETWEEN") == len(ranges)
+    assert sql.count("%s") == len(params)
+
+
+def _call(i, lat, lon, ts):
+    return (i, f"c{i}", {"latitude": lat, "longitude": lon, "message": f"m{i}"}, ts)
+
+
+def test_group_repeat_calls_merges_into_existing_and_batch_incidents():
+    t0 = datetime(2026, 2, 6, 4, 17).timestamp()
+    candidates = [(7, 37.0, 35.0, datetime.fromtimestamp(t0))]
+    calls = [
+        _call(0, 37.0005, 35.0, t0 + 60),    # mevcut olaya eklenir
+        _call(1, 37.1, 35.1, t0 + 30),       # uzak: yeni olay
+        _call(2, 37.1001, 35.1, t0 + 90),    # paketteki yeni olaya eklenir
+        _call(3, 37.0, 35.0, t0 + 3600),     # süre aşıldı: yeni olay
+    ]
+    incidents = group_repeat_calls(candidates, calls)
+    assert [(inc["id"], inc["first"] and inc["first"][0], [c[0] for c in inc["repeats"]]) for inc in incidents] == [
+        (7, None, [0]), (None, 1, [2]), (None, 3, []),
+    ]
+
+
+def test_group_repeat_calls_skips_untouched_candidates():
+    t0 = datetime(2026, 2, 6, 4, 17).timestamp()
+    incidents = group_repeat_calls([(7, 38.0, 36.0, datetime.fromtimestamp(t0))], [_call(0, 37.0, 35.0, t0)])
+    assert len(incidents) == 1 and incidents[0]["id"] is None
@@ -0,0 +1,109 @@
+# tests/test_notifications.py
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+from utils import notifications
+from utils.notifications import FanoutEngine, PUSH_BACKOFF_MAX
+
+
+def _messages(count):
+    return [{"to": f"ExponentPushToken[{i}]", "title": "t", "body": "b"} for i in range(count)]
+
+
+def _ok(messages):
+    return [{"status": "ok", "id": m["to"]} for m in messages]
+
+
+def _engine(**kwargs):
+    engine = FanoutEngine(concurrency=4, per_host=2, url="http://push.test/send", **kwargs)
+    engine._backoff = lambda attempt, retry_after: 0
+    return engine
+
+
+def test_send_batch_retries_retryable_status(monkeypatch):
+    responses = [(429, [], 1), (503, [], None), (0, [], None)]
+
+    def post_batch(messages, url=None):
+        if responses:
+            status, tickets, retry_after = responses.pop(0)
+            return status, tickets, retry_after
+        return 200, _ok(messages), None
+
+    monkeypatch.setattr(notifications, "post_batch", post_batch)
+    tickets, retries = _engine(max_retries=4).send_batch(_messages(2))
+    assert retries == 3
+    assert [t["status"] for t in tickets] == ["ok", "ok"]
+
+
+def test_send_batch_stops_after_max_retries(monkeypatch):
+    calls = []
+
+    def post_batch(messages, url=None):
+        calls.append(url)
+        return 503, [{"status": "error", "details": {"error": "HTTP_503"}}] * len(messages), None
+
+    monkeypatch.setattr(notifications, "post_batch", post_batch)
+    tickets, retries = _engine(max_retries=2).send_batch(_messages(1))
+    assert retries == 2
+    assert len(calls) == 3
+    assert tickets[0]["details"]["error"] == "HTTP_503"
+
+
+def test_send_batch_does_not_retry_client_error(monkeypatch):
+    calls = []
+
+    def post_batch(messages, url=None):
+        calls.append(url)
+        return 400, [{"status": "error", "details": {"error": "HTTP_400"}}] * len(messages), None
+
+    monkeypatch.setattr(notifications, "post_batch", post_batch)
+    _, retries = _engine().send_batch(_messages(1))
+    assert retries == 0 and len(calls) == 1
+
+
+def test_send_reports_all_batches(monkeypatch):
+    monkeypatch.setattr(notifications, "post_batch", lambda messages, url=None: (200, _ok(messages), None))
+    report = _engine().send(_messages(250))
+    assert (report.total, report.ok, report.batches) == (250, 250, 3)
+    assert sorted(to for to, _ in report.tickets) == sorted(m["to"] for m in _messages(250))
+
+
+def test_backoff_honours_retry_after_and_cap():
+    engine = FanoutEngine()
+    assert engine._backoff(0, 2) == 2
+    assert engine._backoff(0, PUSH_BACKOFF_MAX * 10) == PUSH_BACKOFF_MAX
+    for attempt in range(10):
+        assert 0 <= engine._backoff(attempt, None) <= PUSH_BACKOFF_MAX
+
+
+def test_send_keeps_tickets_in_message_order(monkeypatch):
+    # İlk parti en geç biter; ticket'lar yine de mesaj sırasıyla dönmeli (worker satırlarla eşler)
+    def post_batch(messages, url=None):
+        if messages[0]["to"].endswith("[0]"):
+            time.sleep(0.05)
+        return 200, _ok(messages), None
+
+    monkeypatch.setattr(notifications, "post_batch", post_batch)
+    messages = _messages(300)
+    report = _engine().send(messages)
+    assert [to for to, _ in report.tickets] == [m["to"] for m in messages]
+    assert [t["id"] for _, t in report.tickets] == [m["to"] for m in messages]
+
+
+def test_send_stops_submitting_when_cancelled(monkeypatch):
+    cancelled = threading.Event()
+    sent = []
+
+    def post_batch(messages, url=None):
+        sent.append(len(messages))
+        cancelled.set()
+        return 200, _ok(messages), None
+
+    monkeypatch.setattr(notifications, "post_batch", post_batch)
+    engine = FanoutEngine(concurrency=1, per_host=1, url="http://push.test/send")
+    report = engine.send(_messages(300), cancelled=cancelled)
+    assert sum(sent) < 300
+    assert report.total == 300 and len(report.tickets) == 300
+    assert report.errors["Cancelled"] == 300 - sum(sent)
@@ -0,0 +1,82 @@
+# tests/test_push_outbox.py
+# -*- coding: utf-8 -*-
+
+from utils.push_outbox import _retry_delay, record_results, PUSH_MAX_ATTEMPTS, PUSH_RETRY_BASE_SECONDS, PUSH_RETRY_MAX_SECONDS
+
+
+class FakeCursor:
+    def __init__(self):
+        self.executed = []
+        self.many = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql, list(params)))
+        self.rowcount = 1
+
+    def executemany(self, sql, rows):
+        self.many.append((sql, list(rows)))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cursor_obj = FakeCursor()
+        self.commits = 0
+
+    def cursor(self, *args, **kwargs):
+        return self.cursor_obj
+
+    def commit(self):
+        self.commits += 1
+
+
+def _error(error):
+    return {"status": "error", "message": error.lower(), "details": {"error": error}}
+
+
+def test_retry_delay_doubles_and_caps():
+    assert _retry_delay(1) == PUSH_RETRY_BASE_SECONDS
+    assert _retry_delay(2) == PUSH_RETRY_BASE_SECONDS * 2
+    assert _retry_delay(3) == PUSH_RETRY_BASE_SECONDS * 4
+    assert _retry_delay(50) == PUSH_RETRY_MAX_SECONDS
+
+
+def test_record_results_partitions_tickets():
+    conn = FakeConnection()
+    rows = [
+        {"id": 1, "token": "t1", "attempts": 1},
+        {"id": 2, "token": "t2", "attempts": 1},
+        {"id": 3, "token": "t3", "attempts": 2},
+        {"id": 4, "token": "t4", "attempts": PUSH_MAX_ATTEMPTS},
+        {"id": 5, "token": "t5", "attempts": 1},
+    ]
+    tickets = [
+        {"status": "ok", "id": "ticket-1"},
+        _error("DeviceNotRegistered"),
+        _error("MessageRateExceeded"),
+        _error("MessageRateExceeded"),
+        _error("MessageTooBig"),
+    ]
+
+    result = record_results(conn, "worker-1", rows, tickets)
+
+    assert result == {"sent": 1, "failed": 2, "retry": 1, "dead": 1, "pruned": 1}
+    deletes = [params for sql, params in conn.cursor_obj.executed if sql.startswith("DELETE FROM push_tokens")]
+    assert deletes == [["t2"]]
+    assert conn.commits == 1
+
+    (retry_sql, retry_rows), = conn.cursor_obj.many
+    reason, delay, msg_id, worker_id = retry_rows[0]
+    assert (msg_id, worker_id, delay) == (3, "worker-1", _retry_delay(2))
+    assert reason.startswith("MessageRateExceeded")
+
+    statuses = {params[0]: params for sql, params in conn.cursor_obj.executed if "SET status = %s" in sql}
+    assert statuses["failed"][-1] == "worker-1"
+    assert set(statuses["failed"]) >= {2, 5}
+    assert 4 in statuses["dead"]
+
+
+def test_record_results_ignores_empty_batch():
+    conn = FakeConnection()
+    assert record_results(conn, "worker-1", [], []) == {"sent": 0, "failed": 0, "retry": 0, "dead": 0, "pruned": 0}
+    assert conn.cursor_obj.executed == [] and conn.cursor_obj.many == []
@@ -0,0 +1,42 @@
+# tests/test_push_worker.py
+# -*- coding: utf-8 -*-
+
+import time
+from contextlib import contextmanager
+
+import push_worker
+from push_worker import LeaseRenewer
+
+
+@contextmanager
+def _no_db():
+    yield None
+
+
+def _renewer(monkeypatch, renew, ttl=0.15):
+    monkeypatch.setattr(push_worker, "db_connection", _no_db)
+    monkeypatch.setattr(push_worker, "renew_lease", renew)
+    return LeaseRenewer("worker-1", [1, 2, 3], ttl=ttl)
+
+
+def test_lease_is_renewed_while_sending(monkeypatch):
+    calls = []
+    with _renewer(monkeypatch, lambda conn, worker_id, ids: calls.append(ids) or len(ids)) as lease:
+        time.sleep(0.2)
+    assert len(calls) >= 2 and calls[0] == [1, 2, 3]
+    assert not lease.lost.is_set()
+
+
+def test_taken_over_rows_cancel_the_send(monkeypatch):
+    with _renewer(monkeypatch, lambda conn, worker_id, ids: len(ids) - 1) as lease:
+        assert lease.lost.wait(1)
+
+
+def test_unrenewable_lease_cancels_before_expiry(monkeypatch):
+    def renew(conn, worker_id, ids):
+        raise ConnectionError("db down")
+
+    started = time.monotonic()
+    with _renewer(monkeypatch, renew, ttl=0.6) as lease:
+        assert lease.lost.wait(2)
+        assert time.monotonic() - started < 0.6
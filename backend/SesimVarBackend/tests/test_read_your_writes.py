@@ -0,0 +1,45 @@
+# tests/test_read_your_writes.py
+# -*- coding: utf-8 -*-
+
+import time
+
+import pytest
+from flask import Flask
+
+import db
+from db import LAST_WRITE_HEADER, sign_last_write, _wrote_recently
+
+app = Flask(__name__)
+
+
+@pytest.fixture(autouse=True)
+def secret(monkeypatch):
+    monkeypatch.setattr(db, "_LAST_WRITE_KEY", b"test-secret")
+
+
+def _wrote(value, user_id=7):
+    with app.test_request_context(headers={LAST_WRITE_HEADER: value} if value else {}):
+        return _wrote_recently(user_id)
+
+
+def test_signed_recent_write_routes_to_primary():
+    assert _wrote(sign_last_write(7, time.time() - 1))
+    assert not _wrote(None)
+
+
+def test_expired_write_is_ignored():
+    assert not _wrote(sign_last_write(7, time.time() - db.DB_READ_YOUR_WRITES_SECONDS - 1))
+
+
+def test_forged_or_foreign_values_are_ignored():
+    assert not _wrote("9999999999")
+    assert not _wrote(f"{time.time():.3f}:deadbeef")
+    assert not _wrote(sign_last_write(8, time.time()))
+
+
+def test_future_signed_value_is_clamped_to_now():
+    # Saat farkıyla ileri tarihli imzalı değer en fazla pencere süresince etkili olur
+    future = sign_last_write(7, time.time() + 3600)
+    assert _wrote(future)
+    with app.test_request_context(headers={LAST_WRITE_HEADER: future}):
+        assert db._client_last_write(7) <= time.time()
@@ -0,0 +1,43 @@
+# tests/test_risk_matcher.py
+# -*- coding: utf-8 -*-
+
+from utils.risk_matcher import fold, RiskMatcher
+
+
+def test_fold_turkish_case_and_diacritics():
+    assert fold("İSTANBUL") == "istanbul"
+    assert fold("IŞIK") == "isik"
+    assert fold("  Gaz   Kaçağı ") == "gaz kacagi"
+    assert fold(None) == ""
+
+
+def test_match_is_case_and_diacritic_insensitive():
+    matcher = RiskMatcher({"yangın": 3, "gaz kaçağı": 3}, critical_score=3)
+    assert matcher.match("YANGIN var")[1] == ["yangın"]
+    assert matcher.match("yangin var")[1] == ["yangın"]
+    assert matcher.match("gaz  KAÇAĞI")[1] == ["gaz kaçağı"]
+
+
+def test_match_at_word_start_only():
+    matcher = RiskMatcher({"kan": 3})
+    assert matcher.match("kanama var")[0] == 3
+    assert matcher.match("yakan bir şey")[0] == 0
+
+
+def test_each_term_counted_once():
+    matcher = RiskMatcher({"enkaz": 3, "bebek": 1})
+    score, terms = matcher.match("enkaz enkaz bebek")
+    assert score == 4
+    assert terms == ["enkaz", "bebek"]
+
+
+def test_longer_term_wins_on_overlap():
+    matcher = RiskMatcher({"gaz": 1, "gaz kaçağı": 3})
+    assert matcher.match("gaz kaçağı var") == (3, ["gaz kaçağı"])
+
+
+def test_assess_levels():
+    matcher = RiskMatcher({"enkaz": 3, "acil": 1}, critical_score=3)
+    assert matcher.assess("Enkaz altındayım")["level"] == "kritik"
+    assert matcher.assess("acil")["level"] == "orta"
+    assert RiskMatcher({}).assess("enkaz") == {"level": "orta", "score": 0, "terms": []}
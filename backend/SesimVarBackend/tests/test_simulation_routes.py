@@ -0,0 +1,37 @@
+# tests/test_simulation_routes.py
+# -*- coding: utf-8 -*-
+
+import pytest
+from flask import Flask
+
+import auth
+from routes.simulation_routes import simulation_bp, _parse_epicenter
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(auth, "ALERTS_API_KEY", "test-key")
+    app = Flask(__name__)
+    app.register_blueprint(simulation_bp)
+    return app.test_client()
+
+
+def test_parse_epicenter():
+    assert _parse_epicenter({}) is None
+    assert _parse_epicenter({"latitude": "38.5", "longitude": 39, "radius_km": 50}) == (38.5, 39.0, 50.0)
+    for data in ({"latitude": 38.5}, {"latitude": "x", "longitude": 39, "radius_km": 50},
+                 {"latitude": 95, "longitude": 39, "radius_km": 50}, {"latitude": 38, "longitude": 39, "radius_km": 0},
+                 {"latitude": "nan", "longitude": 39, "radius_km": 50}):
+        with pytest.raises(ValueError):
+            _parse_epicenter(data)
+
+
+@pytest.mark.parametrize("body", [
+    {"latitude": "abc", "longitude": 39.2, "radius_km": 50},
+    {"latitude": 38.6, "longitude": None, "radius_km": 50},
+    {"latitude": 38.6, "longitude": 39.2, "radius_km": "far"},
+])
+def test_invalid_epicenter_is_rejected(client, body):
+    response = client.post("/simulate/earthquake", json=body, headers={"X-Api-Key": "test-key"})
+    assert response.status_code == 400
+    assert response.get_json()["status"] == "error"
@@ -0,0 +1,96 @@
+# tests/test_write_behind.py
+# -*- coding: utf-8 -*-
+
+import time
+
+from utils.write_behind import WriteBehindBuffer, validate_safe_row
+
+
+class Transient(Exception):
+    pass
+
+
+class Rejected(Exception):
+    pass
+
+
+def _buffer(write, **kwargs):
+    kwargs.setdefault("flush_rows", 3)
+    return WriteBehindBuffer(write, name="test-writer", transient=lambda e: isinstance(e, Transient), **kwargs)
+
+
+def test_validate_safe_row():
+    assert validate_safe_row("7", "37.5", 35) == (7, 37.5, 35.0)
+    assert validate_safe_row(0, 37.5, 35) is None
+    assert validate_safe_row(7, 91, 35) is None
+    assert validate_safe_row(7, "x", 35) is None
+
+
+def test_stop_flushes_in_order_and_in_batches():
+    batches = []
+    buffer = _buffer(batches.append)
+    for i in range(7):
+        assert buffer.append(i)
+    buffer.stop()
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+    assert buffer.stats()["flushed"] == 7 and buffer.stats()["pending"] == 0
+
+
+def test_writer_thread_flushes_after_interval():
+    batches = []
+    buffer = _buffer(batches.append, flush_rows=100, flush_ms=10).start()
+    try:
+        buffer.append("a")
+        deadline = time.monotonic() + 2
+        while not batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert batches == [["a"]]
+    finally:
+        buffer.stop()
+
+
+def test_append_rejects_when_full():
+    buffer = _buffer(lambda rows: None, max_rows=2)
+    assert buffer.append(1) and buffer.append(2)
+    assert buffer.append(3, timeout=0) is False
+    assert buffer.stats()["rejected"] == 1
+
+
+def test_transient_error_puts_batch_back_in_order():
+    failures = [Transient("down")]
+    written = []
+
+    def write(rows):
+        if failures:
+            raise failures.pop()
+        written.extend(rows)
+
+    buffer = _buffer(write)
+    for i in range(5):
+        buffer.append(i)
+    with buffer._cond:
+        batch = buffer._take()
+    assert buffer._flush_batch(batch) is False
+    assert buffer.pending(lambda row: True) == [0, 1, 2, 3, 4]
+    buffer.stop()
+    assert written == [0, 1, 2, 3, 4]
+
+
+def test_poison_row_is_isolated():
+    written = []
+    good = [(1, 37.0, 35.0), (2, 37.1, 35.1), (3, 37.2, 35.2)]
+    bad = (4, 91.0, 35.0)
+
+    def write(rows):
+        if bad in rows:
+            raise Rejected("data error")
+        written.extend(rows)
+
+    buffer = _buffer(write)
+    for row in (good[0], bad, good[1], good[2]):
+        buffer.append(row)
+    buffer.stop()
+    stats = buffer.stats()
+    assert written == good
+    assert stats["dead"] == 1 and stats["dead_rows"] == [["4", "91.0", "35.0"]]
+    assert stats["flushed"] == 3
@@ -0,0 +1,71 @@
+# utils/alerts.py
+# -*- coding: utf-8 -*-
+
+from db import db_connection
+from utils.audience import emergency_tokens
+from utils.geo import bounding_box, haversine_km
+from utils.push_outbox import create_push_job, enqueue_tokens
+
+ALERT_TITLE = "Deprem Uyarısı"
+ALERT_MESSAGE = "📢 Deprem tespit edildi. Güvende misiniz?"
+
+
+def neighborhoods_in_ring(cursor, latitude, longitude, inner_km, outer_km):
+    """Episentra uzaklığı (inner_km, outer_km] aralığındaki mahalle id'leri."""
+    # Kutu idx_neighborhoods_lat_lon ile aralık okunur; kesin mesafe yalnızca kutudakiler için hesaplanır
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, outer_km)
+    cursor.execute("""
+        SELECT id, latitude, longitude
+        FROM neighborhoods
+        WHERE latitude BETWEEN %s AND %s AND longitude BETWEEN %s AND %s
+    """, (min_lat, max_lat, min_lon, max_lon))
+
+    ids = []
+    for nid, lat, lon in cursor.fetchall():
+        distance = haversine_km(latitude, longitude, lat, lon)
+        if (inner_km < distance if inner_km else True) and distance <= outer_km:
+            ids.append(nid)
+    return ids
+
+
+def resolve_rings(cursor, latitude, longitude, rings_km):
+    rings = []
+    inner = 0
+    for outer in sorted(rings_km):
+        rings.append((inner, outer, neighborhoods_in_ring(cursor, latitude, longitude, inner, outer)))
+        inner = outer
+    return rings
+
+
+def send_targeted_alert(latitude=None, longitude=None, rings_km=None, neighborhood_ids=None,
+                        title=ALERT_TITLE, message=ALERT_MESSAGE, ring_delay_sec=0, dedupe_key=None):
+    """
+    Episentr + halkalar (km) veya doğrudan mahalle id'leri ile hedefli uyarı kuyruğa alır.
+    Her halka ayrı bir iş olur; içteki halka önce, dıştakiler ring_delay_sec arayla gönderilir.
+    Döner: halka başına {ring_km, job_id, neighborhoods, queued}
+    """
+    results = []
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        if neighborhood_ids:
+            rings = [(None, None, list(neighborhood_ids))]
+        else:
+            rings = resolve_rings(cursor, latitude, longitude, rings_km)
+
+        for i, (inner, outer, ids) in enumerate(rings):
+            ring_key = f"{dedupe_key}:{i}" if dedupe_key else None
+            job_id, created = create_push_job(cursor, "earthquake", title, message, ring_key, lane="emergency")
+            queued = 0
+            if created and ids:
+                tokens = emergency_tokens(cursor, ids)
+                queued = enqueue_tokens(cursor, job_id, tokens, delay_seconds=i * ring_delay_sec)
+            results.append({
+                "ring_km": [inner, outer] if outer is not None else None,
+                "job_id": job_id,
+                "neighborhoods": len(ids),
+                "queued": queued,
+            })
+        conn.commit()
+
+    print(f"[ALERT] Hedefli uyarı kuyruğa alındı: {results}")
+    return results
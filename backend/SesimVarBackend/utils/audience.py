@@ -0,0 +1,38 @@
+# utils/audience.py
+# -*- coding: utf-8 -*-
+
+# 👥 Bildirim hedef kitlesi, kuyruğa alma anında doğrudan veritabanından çözülür.
+# Süreç başına kopya tutulmaz: başka worker'da az önce yazılan token/ayar/adres da kapsanır ve
+# web süreçleri açılışta tüm token'ları yüklemez. Sorgular idx_addresses_neighborhood ve
+# push_tokens/notification_settings birincil anahtarlarını kullanır.
+
+
+def all_tokens(cursor):
+    cursor.execute("SELECT token FROM push_tokens")
+    return [token for (token,) in cursor.fetchall()]
+
+
+def emergency_tokens(cursor, neighborhood_ids=None):
+    """
+    Acil durum uyarısı almak isteyenlerin token'ları; neighborhood_ids verilirse yalnızca o mahallelerde
+    adresi olanlar. Ayar satırı yoksa GET /user/notifications varsayılanları (emergency açık, sessiz mod kapalı).
+    """
+    if neighborhood_ids is not None:
+        neighborhood_ids = list(neighborhood_ids)
+        if not neighborhood_ids:
+            return []
+    query = """
+        SELECT DISTINCT t.token
+        FROM push_tokens t
+        LEFT JOIN notification_settings s ON s.user_id = t.user_id
+    """
+    params = []
+    if neighborhood_ids is not None:
+        query += f"""
+        JOIN addresses a ON a.user_id = t.user_id
+            AND a.neighborhood_id IN ({", ".join(["%s"] * len(neighborhood_ids))})
+        """
+        params = neighborhood_ids
+    query += " WHERE COALESCE(s.emergency, 1) = 1 AND COALESCE(s.silent_mode, 0) = 0"
+    cursor.execute(query, params)
+    return [token for (token,) in cursor.fetchall()]
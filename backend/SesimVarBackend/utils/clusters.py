@@ -0,0 +1,235 @@
+# utils/clusters.py
+# -*- coding: utf-8 -*-
+
+import math
+import os
+import random
+import threading
+import time
+from datetime import timedelta
+
+from db import db_connection
+
+# 🗺️ Zoom seviyesi başına ızgara: z seviyesinde hücre kenarı 180 / 2^z derece,
+# her hücre bir üst seviyede 4 alt hücreye bölünür (z=14 ≈ 1.2 km)
+MIN_ZOOM = 2
+MAX_ZOOM = 16
+# Tek yanıtta taranacak en fazla hücre; aşılırsa daha kaba seviyeye inilir
+CLUSTER_MAX_CELLS = int(os.getenv("CLUSTER_MAX_CELLS", "4096"))
+# Diğer worker'ların yazımları ve risk yeniden hesaplaması CLUSTER_DELTA_SECONDS'ta bir değişen satırlar
+# okunarak yansır; silinen çağrılar için tam yenileme ±%50 kaydırılarak CLUSTER_RELOAD_SECONDS'ta bir
+CLUSTER_DELTA_SECONDS = int(os.getenv("CLUSTER_DELTA_SECONDS", "5"))
+CLUSTER_RELOAD_SECONDS = int(os.getenv("CLUSTER_RELOAD_SECONDS", "120"))
+# Zaman damgası yazım anında, görünürlük commit'te: geç commit edilen satırlar kaçmasın diye geri örtüşme
+CLUSTER_DELTA_OVERLAP = 2
+
+RISK_LEVELS = ("düşük", "orta", "yüksek")
+_USER_RISK_RANK = {"orta": 1, "kritik": 2}
+_ZONE_RISK_RANK = {"düşük": 0, "orta": 1, "yüksek": 2}
+
+
+def help_risk_rank(user_risk, zone_risk):
+    return max(_USER_RISK_RANK.get(user_risk, 0), _ZONE_RISK_RANK.get(zone_risk, 0))
+
+
+def _cell_size(zoom):
+    return 180.0 / (2 ** zoom)
+
+
+class ClusterIndex:
+    """
+    Her zoom seviyesi için hücre → [adet, enlem toplamı, boylam toplamı, risk başına adet] toplamları.
+    Ekleme/güncelleme/silme her seviyede tek hücreyi günceller (O(seviye sayısı));
+    sorgu yalnızca kutudaki hücreleri okur. Süreç içidir; veritabanındaki değişiklikler fark okumasıyla
+    (apply_delta), silmeler periyodik tam yenilemeyle yansır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._points = {}
+        self._levels = {z: {} for z in range(MIN_ZOOM, MAX_ZOOM + 1)}
+        self.ready = False
+
+    @staticmethod
+    def _key(zoom, latitude, longitude):
+        size = _cell_size(zoom)
+        return math.floor((latitude + 90) / size), math.floor((longitude + 180) / size)
+
+    def _apply(self, latitude, longitude, rank, sign):
+        for zoom, cells in self._levels.items():
+            key = self._key(zoom, latitude, longitude)
+            agg = cells.get(key)
+            if agg is None:
+                agg = cells[key] = [0, 0.0, 0.0, [0] * len(RISK_LEVELS)]
+            agg[0] += sign
+            agg[1] += sign * latitude
+            agg[2] += sign * longitude
+            agg[3][rank] += sign
+            if agg[0] <= 0:
+                del cells[key]
+
+    def upsert(self, point_id, latitude, longitude, rank=0):
+        latitude, longitude = float(latitude), float(longitude)
+        with self._lock:
+            old = self._points.pop(point_id, None)
+            if old is not None:
+                self._apply(*old, -1)
+            self._points[point_id] = (latitude, longitude, rank)
+            self._apply(latitude, longitude, rank, 1)
+
+    def raise_rank(self, point_id, rank):
+        # Konumu değiştirmeden riski yükseltir (ör. tekrar basışta mesaj kritikleşti)
+        with self._lock:
+            old = self._points.get(point_id)
+            if old is None or old[2] >= rank:
+                return
+            self._apply(*old, -1)
+            self._points[point_id] = (old[0], old[1], rank)
+            self._apply(old[0], old[1], rank, 1)
+
+    def remove(self, point_id):
+        with self._lock:
+            old = self._points.pop(point_id, None)
+            if old is not None:
+                self._apply(*old, -1)
+
+    def apply_delta(self, rows):
+        """rows: (point_id, enlem, boylam, risk_rank, aktif mi). Aktif olmayanlar indeksten çıkar."""
+        for point_id, latitude, longitude, rank, active in rows:
+            if active:
+                self.upsert(point_id, latitude, longitude, rank)
+            else:
+                self.remove(point_id)
+
+    def load(self, rows):
+        """rows: (point_id, enlem, boylam, risk_rank). Yeni index kurulup tek seferde değiştirilir."""
+        fresh = ClusterIndex()
+        for point_id, latitude, longitude, rank in rows:
+            fresh._points[point_id] = (float(latitude), float(longitude), rank)
+            fresh._apply(float(latitude), float(longitude), rank, 1)
+        with self._lock:
+            self._points, self._levels = fresh._points, fresh._levels
+            self.ready = True
+
+    def clusters(self, min_lat, min_lon, max_lat, max_lon, zoom):
+        """Döner: (kullanılan zoom, [{count, latitude, longitude, max_risk}])."""
+        zoom = max(MIN_ZOOM, min(int(zoom), MAX_ZOOM))
+        while True:
+            r0, c0 = self._key(zoom, min_lat, min_lon)
+            r1, c1 = self._key(zoom, max_lat, max_lon)
+            span = (r1 - r0 + 1) * (c1 - c0 + 1)
+            if span <= CLUSTER_MAX_CELLS or zoom == MIN_ZOOM:
+                break
+            zoom -= 1
+
+        with self._lock:
+            cells = self._levels[zoom]
+            if span <= len(cells):
+                found = ((key, cells.get(key)) for key in
+                         ((r, c) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)))
+            else:
+                found = ((key, agg) for key, agg in cells.items()
+                         if r0 <= key[0] <= r1 and c0 <= key[1] <= c1)
+
+            result = []
+            for _, agg in found:
+                if not agg:
+                    continue
+                count, sum_lat, sum_lon, risks = agg
+                max_risk = max(i for i, n in enumerate(risks) if n > 0)
+                result.append({
+                    "count": count,
+                    "latitude": round(sum_lat / count, 5),
+                    "longitude": round(sum_lon / count, 5),
+                    "max_risk": RISK_LEVELS[max_risk],
+                })
+        return zoom, result
+
+    def stats(self):
+        with self._lock:
+            return {"points": len(self._points), "cells": {z: len(c) for z, c in self._levels.items()}}
+
+
+# Aktif yardım çağrıları (id başına) ve kullanıcı başına son "güvendeyim" konumu
+help_clusters = ClusterIndex()
+safe_clusters = ClusterIndex()
+
+
+# Fark okumasının devam ettiği veritabanı zamanı (tam yüklemede NOW(3) ile başlar)
+_delta_since = {"help": None, "safe": None}
+
+
+def load_clusters():
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT NOW(3)")
+            since = cursor.fetchone()[0] - timedelta(seconds=CLUSTER_DELTA_OVERLAP)
+            cursor.execute("""
+                SELECT id, latitude, longitude, user_risk, zone_risk
+                FROM help_requests
+                WHERE status = 'aktif'
+            """)
+            help_rows = [(i, lat, lon, help_risk_rank(ur, zr)) for i, lat, lon, ur, zr in cursor.fetchall()]
+
+            cursor.execute("""
+                SELECT user_id, safe_latitude, safe_longitude
+                FROM user_current_status
+                WHERE safe_at IS NOT NULL
+            """)
+            safe_rows = [(user_id, lat, lon, 0) for user_id, lat, lon in cursor.fetchall()]
+
+        help_clusters.load(help_rows)
+        safe_clusters.load(safe_rows)
+        _delta_since.update(help=since, safe=since)
+        print(f"✅ Küme indeksi yüklendi ({len(help_rows)} çağrı, {len(safe_rows)} güvende).")
+    except Exception as e:
+        print(f"[CLUSTER LOAD ERROR] {e}")
+
+
+def refresh_cluster_delta():
+    # changed_at / updated_at indeksinden yalnızca son okumadan beri değişen satırlar
+    if _delta_since["help"] is None:
+        return
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, latitude, longitude, user_risk, zone_risk, status, changed_at
+                FROM help_requests
+                WHERE changed_at >= %s
+            """, (_delta_since["help"],))
+            help_rows = cursor.fetchall()
+
+            cursor.execute("""
+                SELECT user_id, safe_latitude, safe_longitude, safe_at, updated_at
+                FROM user_current_status
+                WHERE updated_at >= %s
+            """, (_delta_since["safe"],))
+            safe_rows = cursor.fetchall()
+
+        help_clusters.apply_delta((i, lat, lon, help_risk_rank(ur, zr), status == "aktif")
+                                  for i, lat, lon, ur, zr, status, _ in help_rows)
+        safe_clusters.apply_delta((user_id, lat, lon, 0, True)
+                                  for user_id, lat, lon, safe_at, _ in safe_rows if safe_at is not None)
+        if help_rows:
+            _delta_since["help"] = max(row[-1] for row in help_rows) - timedelta(seconds=CLUSTER_DELTA_OVERLAP)
+        if safe_rows:
+            _delta_since["safe"] = max(row[-1] for row in safe_rows) - timedelta(seconds=CLUSTER_DELTA_OVERLAP)
+    except Exception as e:
+        print(f"[CLUSTER DELTA ERROR] {e}")
+
+
+def start_cluster_refresh():
+    def loop():
+        next_reload = time.monotonic() + CLUSTER_RELOAD_SECONDS * random.uniform(0.5, 1.5)
+        while True:
+            time.sleep(CLUSTER_DELTA_SECONDS)
+            if time.monotonic() >= next_reload:
+                load_clusters()
+                next_reload = time.monotonic() + CLUSTER_RELOAD_SECONDS * random.uniform(0.5, 1.5)
+            else:
+                refresh_cluster_delta()
+
+    load_clusters()
+    threading.Thread(target=loop, name="cluster-refresh", daemon=True).start()
@@ -0,0 +1,227 @@
+# utils/earthquake_feed.py
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+import requests
+from db import db_connection
+from utils.alerts import send_targeted_alert, ALERT_MESSAGE
+
+# Kaynak: "file:/yol/olaylar.geojson" veya "https://..." (USGS biçiminde GeoJSON). Boşsa alım kapalı.
+EARTHQUAKE_FEED = os.getenv("EARTHQUAKE_FEED", "")
+EARTHQUAKE_MIN_MAGNITUDE = float(os.getenv("EARTHQUAKE_MIN_MAGNITUDE", "4.0"))
+# Bölge: "min_lat,min_lon,max_lat,max_lon" (varsayılan Türkiye)
+EARTHQUAKE_REGION = tuple(float(v) for v in os.getenv("EARTHQUAKE_REGION", "35.8,25.6,42.2,44.9").split(","))
+# Bundan eski olaylar için uyarı gönderilmez (ilk çalıştırmada geçmiş olaylar)
+EARTHQUAKE_MAX_AGE_SEC = int(os.getenv("EARTHQUAKE_MAX_AGE_SEC", "900"))
+# Geç yayımlanan olaylar için high-water mark'tan bu kadar geriye bakılır
+EARTHQUAKE_FEED_OVERLAP_SEC = int(os.getenv("EARTHQUAKE_FEED_OVERLAP_SEC", "300"))
+EARTHQUAKE_RING_DELAY_SEC = int(os.getenv("EARTHQUAKE_RING_DELAY_SEC", "0"))
+EARTHQUAKE_FEED_TIMEOUT = float(os.getenv("EARTHQUAKE_FEED_TIMEOUT", "10"))
+
+
+def parse_geojson(payload):
+    """GeoJSON FeatureCollection → olay listesi. Zamanlar UTC (tz'siz) datetime."""
+    events = []
+    for feature in payload.get("features") or []:
+        props = feature.get("properties") or {}
+        coords = (feature.get("geometry") or {}).get("coordinates") or []
+        if not feature.get("id") or props.get("mag") is None or props.get("time") is None or len(coords) < 2:
+            continue
+        events.append({
+            "id": str(feature["id"])[:64],
+            "magnitude": float(props["mag"]),
+            "latitude": float(coords[1]),
+            "longitude": float(coords[0]),
+            "depth_km": float(coords[2]) if len(coords) > 2 and coords[2] is not None else None,
+            "place": (props.get("place") or "")[:255] or None,
+            "occurred_at": datetime.fromtimestamp(props["time"] / 1000, tz=timezone.utc).replace(tzinfo=None),
+        })
+    return events
+
+
+class FileFeed:
+    """Yerel dosya kaynağı (test ve tatbikat için). Dosya değişmediyse fetch() None döner."""
+
+    def __init__(self, path):
+        self.path = path
+        self.name = f"file:{os.path.basename(path)}"[:64]
+        self._mtime = None
+
+    def fetch(self):
+        mtime = os.path.getmtime(self.path)
+        if mtime == self._mtime:
+            return None
+        with open(self.path, encoding="utf-8") as f:
+            events = parse_geojson(json.load(f))
+        self._mtime = mtime
+        return events
+
+
+class HttpFeed:
+    """HTTP kaynağı. ETag / Last-Modified ile koşullu istek; 304 gelirse fetch() None döner."""
+
+    def __init__(self, url):
+        self.url = url
+        self.name = f"http:{urlsplit(url).netloc}{urlsplit(url).path}"[:64]
+        self._session = requests.Session()
+        self._validators = {}
+
+    def fetch(self):
+        response = self._session.get(self.url, headers=self._validators, timeout=EARTHQUAKE_FEED_TIMEOUT)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        self._validators = {}
+        if response.headers.get("ETag"):
+            self._validators["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            self._validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        return parse_geojson(response.json())
+
+
+_feed = None
+
+
+def get_feed():
+    global _feed
+    if _feed is None and EARTHQUAKE_FEED:
+        if EARTHQUAKE_FEED.startswith("file:"):
+            _feed = FileFeed(EARTHQUAKE_FEED[len("file:"):])
+        else:
+            _feed = HttpFeed(EARTHQUAKE_FEED)
+    return _feed
+
+
+def rings_for_magnitude(magnitude):
+    # Büyüklük arttıkça etki alanı genişler; içteki halka önce uyarılır
+    if magnitude >= 6:
+        return [100, 200, 300]
+    if magnitude >= 5:
+        return [50, 100, 150]
+    return [25, 50]
+
+
+def qualifies(event, now_utc):
+    min_lat, min_lon, max_lat, max_lon = EARTHQUAKE_REGION
+    return (
+        event["magnitude"] >= EARTHQUAKE_MIN_MAGNITUDE
+        and min_lat <= event["latitude"] <= max_lat
+        and min_lon <= event["longitude"] <= max_lon
+        and (now_utc - event["occurred_at"]).total_seconds() <= EARTHQUAKE_MAX_AGE_SEC
+    )
+
+
+def alert_for_event(event):
+    return send_targeted_alert(
+        event["latitude"], event["longitude"], rings_for_magnitude(event["magnitude"]),
+        title=f"Deprem Uyarısı (M{event['magnitude']:.1f})",
+        message=ALERT_MESSAGE,
+        ring_delay_sec=EARTHQUAKE_RING_DELAY_SEC,
+        dedupe_key=f"quake:{event['id']}",
+    )
+
+
+def ingest_feed(feed=None):
+    """
+    Kaynaktan yeni olayları okur, id ile tekilleştirir, eşikleri geçenler için hedefli uyarı kuyruğa alır.
+    Uyarı dedupe_key ile idempotent olduğundan olay satırı uyarıdan sonra yazılır;
+    arada süreç ölürse yeniden çalıştırma aynı işi tekrar oluşturmaz.
+    Döner: özet sayaçlar (kaynak yoksa None).
+    """
+    feed = feed or get_feed()
+    if feed is None:
+        return None
+
+    started = time.perf_counter()
+    events = feed.fetch()
+    if events is None:
+        return {"source": feed.name, "fetched": 0, "new": 0, "alerted": 0}
+
+    summary = {"source": feed.name, "fetched": len(events), "new": 0, "alerted": 0}
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT NOW(3), UTC_TIMESTAMP(3)")
+        detected_at, now_utc = cursor.fetchone()
+
+        cursor.execute("SELECT high_water FROM feed_cursors WHERE source = %s", (feed.name,))
+        row = cursor.fetchone()
+        high_water = row[0] if row else None
+        if high_water is not None:
+            since = high_water - timedelta(seconds=EARTHQUAKE_FEED_OVERLAP_SEC)
+            events = [e for e in events if e["occurred_at"] > since]
+        if not events:
+            conn.commit()
+            return summary
+
+        ids = [e["id"] for e in events]
+        cursor.execute(f"SELECT id FROM earthquake_events WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+        seen = {r[0] for r in cursor.fetchall()}
+        conn.commit()
+
+        new_events = sorted((e for e in events if e["id"] not in seen), key=lambda e: e["occurred_at"])
+        rows = []
+        for event in new_events:
+            alerted = qualifies(event, now_utc)
+            if alerted:
+                alert_for_event(event)
+                lag = (now_utc - event["occurred_at"]).total_seconds()
+                print(f"[QUAKE] M{event['magnitude']} {event['place'] or event['id']} → uyarı kuyruğa alındı "
+                      f"(olay→tespit {lag:.1f} sn, tespit→kuyruk {time.perf_counter() - started:.2f} sn)")
+                summary["alerted"] += 1
+            rows.append((
+                event["id"], feed.name, event["magnitude"], event["latitude"], event["longitude"],
+                event["depth_km"], event["place"], event["occurred_at"], detected_at,
+                "alerted" if alerted else "ignored",
+            ))
+        summary["new"] = len(rows)
+
+        if rows:
+            cursor.executemany("""
+                INSERT IGNORE INTO earthquake_events
+                    (id, source, magnitude, latitude, longitude, depth_km, place, occurred_at, detected_at, status)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, rows)
+
+        newest = max(e["occurred_at"] for e in events)
+        cursor.execute("""
+            INSERT INTO feed_cursors (source, high_water) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE high_water = GREATEST(high_water, VALUES(high_water))
+        """, (feed.name, newest))
+        conn.commit()
+
+    return summary
+
+
+def alert_latency(conn, limit=20):
+    """Uyarı gönderilen son olaylar için tespit → ilk push gecikmesi (sn)."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT e.id, e.magnitude, e.place, e.occurred_at, e.detected_at,
+               (SELECT TIMESTAMPDIFF(MICROSECOND, e.detected_at, MIN(m.sent_at)) / 1e6
+                FROM push_jobs j
+                JOIN push_messages m ON m.job_id = j.id
+                WHERE j.dedupe_key LIKE CONCAT('quake:', e.id, ':%%')) AS detection_to_first_push_sec
+        FROM earthquake_events e
+        WHERE e.status = 'alerted'
+        ORDER BY e.detected_at DESC
+        LIMIT %s
+    """, (limit,))
+    events = cursor.fetchall()
+
+    latencies = sorted(float(e["detection_to_first_push_sec"]) for e in events
+                       if e["detection_to_first_push_sec"] is not None)
+    for e in events:
+        if e["detection_to_first_push_sec"] is not None:
+            e["detection_to_first_push_sec"] = round(float(e["detection_to_first_push_sec"]), 3)
+        e["magnitude"] = float(e["magnitude"])
+
+    return {
+        "events": events,
+        "p50_sec": round(latencies[len(latencies) // 2], 3) if latencies else None,
+        "max_sec": round(latencies[-1], 3) if latencies else None,
+    }
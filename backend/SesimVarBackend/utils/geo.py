@@ -0,0 +1,70 @@
+# utils/geo.py
+# -*- coding: utf-8 -*-
+
+import math
+
+# 🗺️ Sabit ızgara: 0.01° x 0.01° hücreler (~1.1 km)
+CELLS_PER_DEGREE = 100
+GRID_COLUMNS = 360 * CELLS_PER_DEGREE
+
+
+def cell_of(latitude, longitude):
+    # round(): 37.01 * 100 = 3700.9999... gibi kayan nokta hatalarını önler
+    row = math.floor(round((float(latitude) + 90) * CELLS_PER_DEGREE, 6))
+    col = math.floor(round((float(longitude) + 180) * CELLS_PER_DEGREE, 6)) % GRID_COLUMNS
+    return row * GRID_COLUMNS + col
+
+
+def neighbor_cells(cell_id):
+    # Hücrenin kendisi + 8 komşusu; eski ABS(fark) < 0.01 penceresine karşılık gelir
+    row, col = divmod(cell_id, GRID_COLUMNS)
+    return [
+        (row + dr) * GRID_COLUMNS + (col + dc) % GRID_COLUMNS
+        for dr in (-1, 0, 1)
+        for dc in (-1, 0, 1)
+    ]
+
+
+def cell_ranges(min_lat, min_lon, max_lat, max_lon):
+    # Kutuyu kapsayan hücreler, satır başına bir (ilk, son) cell_id aralığı olarak (indeksli BETWEEN için)
+    first, last = cell_of(min_lat, min_lon), cell_of(max_lat, max_lon)
+    row0, col0 = divmod(first, GRID_COLUMNS)
+    row1, col1 = divmod(last, GRID_COLUMNS)
+    return [(row * GRID_COLUMNS + col0, row * GRID_COLUMNS + col1) for row in range(row0, row1 + 1)]
+
+
+def parse_bbox(values):
+    """Sorgu parametrelerinden (min_lat, min_lon, max_lat, max_lon); geçersizse None."""
+    try:
+        bbox = tuple(float(values[k]) for k in ("min_lat", "min_lon", "max_lat", "max_lon"))
+    except (KeyError, TypeError, ValueError):
+        return None
+    min_lat, min_lon, max_lat, max_lon = bbox
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lon <= max_lon <= 180):
+        return None
+    return bbox
+
+
+def cell_center(cell_id):
+    row, col = divmod(cell_id, GRID_COLUMNS)
+    latitude = (row + 0.5) / CELLS_PER_DEGREE - 90
+    longitude = (col + 0.5) / CELLS_PER_DEGREE - 180
+    return latitude, longitude
+
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (float(lat1), float(lon1), float(lat2), float(lon2)))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    # Yarıçapı kapsayan enlem/boylam kutusu (indeksli aralık sorgusu için)
+    latitude, longitude = float(latitude), float(longitude)
+    d_lat = radius_km / KM_PER_DEGREE
+    d_lon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return latitude - d_lat, latitude + d_lat, longitude - d_lon, longitude + d_lon
@@ -0,0 +1,198 @@
+# utils/heatmap.py
+# -*- coding: utf-8 -*-
+
+import os
+import random
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from db import db_connection
+
+# 🔥 Zaman pencereli yardım çağrısı yoğunluğu (ızgara hücresi başına)
+WINDOWS = {"15m": 15 * 60, "1h": 60 * 60, "24h": 24 * 60 * 60}
+RETENTION = max(WINDOWS.values())
+PRUNE_INTERVAL = 60
+# Yeni çağrılar (id > son görülen) kısa aralıkla okunur; tam yenileme (silinen/taşınan çağrılar için)
+# seyrek ve worker'lar aynı anda 24 saati taramasın diye ±%50 rastgele kaydırılarak yapılır
+HEATMAP_DELTA_SECONDS = int(os.getenv("HEATMAP_DELTA_SECONDS", "30"))
+HEATMAP_RELOAD_SECONDS = int(os.getenv("HEATMAP_RELOAD_SECONDS", "900"))
+# Bölge riski bu penceredeki çağrılara göre hesaplanır (15m, 1h, 24h)
+ZONE_RISK_WINDOW = os.getenv("ZONE_RISK_WINDOW", "1h")
+
+
+def zone_risk_level(count):
+    # Hücre + 8 komşusundaki çağrı sayısına göre bölge riski
+    if count > 20:
+        return "yüksek"
+    elif count > 10:
+        return "orta"
+    else:
+        return "düşük"
+
+
+class HelpCallHeatmap:
+    """
+    Hücre başına zamana göre sıralı (ts, help_id) listeleri tutar.
+    Pencere sorgusu bisect ile O(log n); eski kayıtlar periyodik olarak atılır.
+    Süreç içidir: diğer worker'ların yeni çağrıları HEATMAP_DELTA_SECONDS'ta bir primary key üzerinden
+    okunan farkla, durum/konum değişiklikleri HEATMAP_RELOAD_SECONDS'lık tam yenilemeyle yansır.
+    Yalnızca ısı haritası uç noktası kullanır; bölge riski veritabanından hesaplanır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cells = defaultdict(list)
+        self._calls = {}
+        self._last_prune = 0.0
+        # Veritabanından okunan en büyük id (fark sorgusu buradan devam eder). Yerel add()
+        # ilerletmez; yoksa diğer worker'ların daha küçük id'li çağrıları atlanırdı.
+        self.max_id = 0
+        self.ready = False
+
+    def add(self, help_id, cell_id, ts=None):
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            self._remove(help_id)
+            self._calls[help_id] = (cell_id, ts)
+            insort(self._cells[cell_id], (ts, help_id))
+            self._maybe_prune()
+
+    def move(self, help_id, cell_id):
+        with self._lock:
+            entry = self._calls.get(help_id)
+            if entry is None or entry[0] == cell_id:
+                return
+            ts = entry[1]
+            self._remove(help_id)
+            self._calls[help_id] = (cell_id, ts)
+            insort(self._cells[cell_id], (ts, help_id))
+
+    def remove(self, help_id):
+        with self._lock:
+            self._remove(help_id)
+
+    def _remove(self, help_id):
+        entry = self._calls.pop(help_id, None)
+        if entry is None:
+            return
+        cell_id, ts = entry
+        items = self._cells[cell_id]
+        i = bisect_left(items, (ts, help_id))
+        if i < len(items) and items[i] == (ts, help_id):
+            del items[i]
+        if not items:
+            del self._cells[cell_id]
+
+    def _maybe_prune(self):
+        now = time.time()
+        if now - self._last_prune < PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        cutoff = now - RETENTION
+        for cell_id in list(self._cells):
+            items = self._cells[cell_id]
+            i = bisect_left(items, (cutoff,))
+            for _, help_id in items[:i]:
+                self._calls.pop(help_id, None)
+            del items[:i]
+            if not items:
+                del self._cells[cell_id]
+
+    def count(self, cell_ids, window):
+        cutoff = time.time() - WINDOWS[window]
+        with self._lock:
+            total = 0
+            for cell_id in cell_ids:
+                items = self._cells.get(cell_id)
+                if items:
+                    total += len(items) - bisect_left(items, (cutoff,))
+            return total
+
+    def snapshot(self, window):
+        cutoff = time.time() - WINDOWS[window]
+        with self._lock:
+            result = {}
+            for cell_id, items in self._cells.items():
+                n = len(items) - bisect_left(items, (cutoff,))
+                if n:
+                    result[cell_id] = n
+            return result
+
+    def load(self, rows, max_id=None):
+        # Yeni yapı kilit dışında kurulur, tek seferde değiştirilir
+        cells, calls = defaultdict(list), {}
+        for help_id, cell_id, ts in rows:
+            calls[help_id] = (cell_id, ts)
+            cells[cell_id].append((ts, help_id))
+        for items in cells.values():
+            items.sort()
+        with self._lock:
+            self._cells, self._calls = cells, calls
+            self.max_id = max(calls, default=0) if max_id is None else max_id
+            self.ready = True
+
+    def merge(self, rows):
+        # Fark sorgusunun satırları; bu süreçte zaten eklenmiş çağrılar yerinde kalır
+        with self._lock:
+            for help_id, cell_id, ts in rows:
+                if help_id not in self._calls:
+                    self._calls[help_id] = (cell_id, ts)
+                    insort(self._cells[cell_id], (ts, help_id))
+                self.max_id = max(self.max_id, help_id)
+            self._maybe_prune()
+
+
+heatmap = HelpCallHeatmap()
+
+
+def seed_heatmap():
+    # Başlangıçta (ve tam yenilemede) son 24 saatin çağrılarını yükle
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM help_requests")
+            max_id = cursor.fetchone()[0]
+            cursor.execute("""
+                SELECT id, cell_id, UNIX_TIMESTAMP(created_at)
+                FROM help_requests
+                WHERE created_at >= NOW() - INTERVAL %s SECOND AND cell_id IS NOT NULL AND id <= %s
+            """, (RETENTION, max_id))
+            rows = [(help_id, cell_id, float(ts)) for help_id, cell_id, ts in cursor.fetchall()]
+        heatmap.load(rows, max_id)
+        print(f"✅ Isı haritası yüklendi ({len(rows)} çağrı).")
+    except Exception as e:
+        print(f"[HEATMAP SEED ERROR] {e}")
+
+
+def refresh_heatmap_delta():
+    # Son okunan id'den sonraki çağrılar (primary key aralığı; 24 saati taramaz)
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, cell_id, UNIX_TIMESTAMP(created_at)
+                FROM help_requests
+                WHERE id > %s AND cell_id IS NOT NULL
+                ORDER BY id
+            """, (heatmap.max_id,))
+            rows = [(help_id, cell_id, float(ts)) for help_id, cell_id, ts in cursor.fetchall()]
+        heatmap.merge(rows)
+    except Exception as e:
+        print(f"[HEATMAP DELTA ERROR] {e}")
+
+
+def start_heatmap_refresh():
+    def loop():
+        next_reload = time.monotonic() + HEATMAP_RELOAD_SECONDS * random.uniform(0.5, 1.5)
+        while True:
+            time.sleep(HEATMAP_DELTA_SECONDS)
+            if time.monotonic() >= next_reload:
+                seed_heatmap()
+                next_reload = time.monotonic() + HEATMAP_RELOAD_SECONDS * random.uniform(0.5, 1.5)
+            else:
+                refresh_heatmap_delta()
+
+    seed_heatmap()
+    threading.Thread(target=loop, name="heatmap-refresh", daemon=True).start()
@@ -0,0 +1,100 @@
+# utils/leader.py
+# -*- coding: utf-8 -*-
+
+import os
+import socket
+import threading
+import time
+import uuid
+
+from db import db_connection
+
+LEADER_LEASE_SECONDS = float(os.getenv("LEADER_LEASE_SECONDS", "30"))
+
+
+class LeaderLease:
+    """
+    scheduler_leases tablosunda kira tabanlı lider seçimi.
+    Kira süresinin üçte birinde bir yenilenir; yenilenemezse liderlik yerel olarak da bırakılır,
+    böylece veritabanına ulaşamayan eski lider ile yenisi aynı anda iş çalıştırmaz.
+    """
+
+    def __init__(self, name, ttl=LEADER_LEASE_SECONDS, on_elected=None, on_revoked=None):
+        self.name = name
+        self.ttl = ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"[:128]
+        self.on_elected = on_elected
+        self.on_revoked = on_revoked
+        self._valid_until = 0.0
+        self._leader = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        return self._leader and time.monotonic() < self._valid_until
+
+    def try_acquire(self):
+        """Kira boşsa, süresi dolmuşsa veya zaten bizdeyse alır/yeniler. Döner: lider miyiz?"""
+        started = time.monotonic()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            # Atamalar soldan sağa değerlendirilir: owner güncellendiyse expires_at da yenilenir
+            cursor.execute("""
+                INSERT INTO scheduler_leases (name, owner, expires_at)
+                VALUES (%s, %s, NOW(3) + INTERVAL %s SECOND)
+                ON DUPLICATE KEY UPDATE
+                    owner = IF(owner = VALUES(owner) OR expires_at < NOW(3), VALUES(owner), owner),
+                    expires_at = IF(owner = VALUES(owner), VALUES(expires_at), expires_at)
+            """, (self.name, self.owner, self.ttl))
+            cursor.execute("SELECT owner FROM scheduler_leases WHERE name = %s", (self.name,))
+            acquired = cursor.fetchone()[0] == self.owner
+            conn.commit()
+
+        if acquired:
+            self._valid_until = started + self.ttl
+        return acquired
+
+    def release(self):
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE scheduler_leases SET expires_at = NOW(3)
+                WHERE name = %s AND owner = %s
+            """, (self.name, self.owner))
+            conn.commit()
+
+    def _set_leader(self, leader):
+        if leader == self._leader:
+            return
+        self._leader = leader
+        print(f"[LEADER] {self.name}: {self.owner} {'lider oldu' if leader else 'liderliği bıraktı'}")
+        callback = self.on_elected if leader else self.on_revoked
+        if callback:
+            callback()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                leader = self.try_acquire()
+            except Exception as e:
+                print(f"[LEADER ERROR] {e}")
+                leader = self.is_leader
+            self._set_leader(leader)
+            self._stop.wait(self.ttl / 3)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"leader-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if self._leader:
+            self._set_leader(False)
+            try:
+                self.release()
+            except Exception as e:
+                print(f"[LEADER ERROR] {e}")
@@ -1,47 +1,244 @@
 # utils/notifications.py
 # -*- coding: utf-8 -*-
 
-import requests
-from db import get_db_connection
+import os
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlsplit
 
-EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
 import requests
-from db import get_db_connection
+from db import db_connection
+from utils.audience import emergency_tokens
+from utils.push_outbox import create_push_job, enqueue_tokens
+
+EXPO_PUSH_URL = os.getenv("EXPO_PUSH_URL", "https://exp.host/--/api/v2/push/send")
+# Expo tek istekte en fazla 100 mesaj kabul eder
+EXPO_BATCH_SIZE = 100
+EXPO_TIMEOUT = float(os.getenv("EXPO_TIMEOUT", "15"))
+
+# 🚀 Eşzamanlı dağıtım: aynı anda uçuşta olan toplu istek sayısı ve yeniden deneme ayarları
+PUSH_CONCURRENCY = int(os.getenv("PUSH_CONCURRENCY", "32"))
+PUSH_HOST_CONCURRENCY = int(os.getenv("PUSH_HOST_CONCURRENCY", str(PUSH_CONCURRENCY)))
+PUSH_MAX_RETRIES = int(os.getenv("PUSH_MAX_RETRIES", "4"))
+PUSH_BACKOFF_BASE = float(os.getenv("PUSH_BACKOFF_BASE", "0.5"))
+PUSH_BACKOFF_MAX = 30.0
+
+_local = threading.local()
+
+
+def get_session():
+    # Keep-alive: aynı thread'deki tüm istekler tek TCP/TLS bağlantısını kullanır
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Content-Type": "application/json",
+        })
+        _local.session = session
+    return session
+
+
+def build_message(token, title, message):
+    return {
+        "to": token,
+        "sound": "default",
+        "title": title,
+        "body": message,
+        "priority": "high",
+    }
+
+
+def chunked(items, size=EXPO_BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _error_tickets(count, error, message):
+    return [{"status": "error", "message": message, "details": {"error": error}} for _ in range(count)]
+
+
+def post_batch(messages, session=None, url=None):
+    """
+    En fazla 100 mesajı tek istekte gönderir.
+    Döner: (http_status, ticket listesi, retry_after). Ağ hatasında http_status 0'dır.
+    """
+    session = session or get_session()
+    try:
+        response = session.post(url or EXPO_PUSH_URL, json=messages, timeout=EXPO_TIMEOUT)
+    except requests.RequestException as e:
+        return 0, _error_tickets(len(messages), "NetworkError", str(e)), None
+
+    if response.status_code != 200:
+        retry_after = response.headers.get("Retry-After")
+        retry_after = float(retry_after) if retry_after and retry_after.isdigit() else None
+        tickets = _error_tickets(len(messages), f"HTTP{response.status_code}", response.text[:200])
+        return response.status_code, tickets, retry_after
+
+    try:
+        tickets = response.json().get("data") or []
+    except ValueError:
+        return 200, _error_tickets(len(messages), "InvalidResponse", response.text[:200]), None
+
+    if len(tickets) != len(messages):
+        tickets = _error_tickets(len(messages), "TicketMismatch", f"{len(tickets)} ticket / {len(messages)} mesaj")
+    return 200, tickets, None
+
 
-EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+def _is_retryable(status):
+    return status == 0 or status == 429 or status >= 500
 
-def send_push_notification(title, message):
+
+class PushReport:
+    """Toplu gönderimin özet sayaçları ve mesaj başına ticket'ları (gönderilen mesaj sırasıyla)."""
+
+    def __init__(self, keep_tickets=True):
+        self.keep_tickets = keep_tickets
+        self.total = 0
+        self.ok = 0
+        self.failed = 0
+        self.batches = 0
+        self.retries = 0
+        self.errors = Counter()
+        self.tickets = []
+        self._batch_tickets = []
+        self._started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, messages, tickets, order=0):
+        """Partiler tamamlanma sırasıyla gelir; order (partinin mesaj listesindeki yeri) ile sıraya konur."""
+        self.batches += 1
+        pairs = []
+        for msg, ticket in zip(messages, tickets):
+            self.total += 1
+            if ticket.get("status") == "ok":
+                self.ok += 1
+            else:
+                self.failed += 1
+                self.errors[(ticket.get("details") or {}).get("error", "Unknown")] += 1
+            if self.keep_tickets:
+                pairs.append((msg["to"], ticket))
+        if pairs:
+            self._batch_tickets.append((order, pairs))
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self._started
+        self._batch_tickets.sort(key=lambda item: item[0])
+        self.tickets = [pair for _, pairs in self._batch_tickets for pair in pairs]
+        return self
+
+    @property
+    def rate(self):
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return {
+            "total": self.total,
+            "ok": self.ok,
+            "failed": self.failed,
+            "batches": self.batches,
+            "retries": self.retries,
+            "errors": dict(self.errors),
+            "elapsed_sec": round(self.elapsed, 3),
+            "messages_per_sec": round(self.rate, 1),
+        }
+
+
+class FanoutEngine:
+    """
+    Toplu istekleri thread havuzunda eşzamanlı gönderir.
+    Uçuştaki istek sayısı `concurrency` ile, hedef sunucu başına `per_host` ile sınırlanır;
+    429/5xx/ağ hatalarında Retry-After veya üstel geri çekilme ile yeniden dener.
+    """
+
+    def __init__(self, concurrency=PUSH_CONCURRENCY, per_host=PUSH_HOST_CONCURRENCY,
+                 max_retries=PUSH_MAX_RETRIES, url=None):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.max_retries = max_retries
+        self.url = url or EXPO_PUSH_URL
+        self._host_limits = {}
+        self._host_lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self._host_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def _backoff(self, attempt, retry_after):
+        if retry_after is not None:
+            return min(retry_after, PUSH_BACKOFF_MAX)
+        delay = min(PUSH_BACKOFF_BASE * (2 ** attempt), PUSH_BACKOFF_MAX)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def send_batch(self, messages):
+        """Döner: (ticket listesi, yeniden deneme sayısı)"""
+        limit = self._host_limit(self.url)
+        attempt = 0
+        while True:
+            with limit:
+                status, tickets, retry_after = post_batch(messages, url=self.url)
+            if not _is_retryable(status) or attempt >= self.max_retries:
+                return tickets, attempt
+            time.sleep(self._backoff(attempt, retry_after))
+            attempt += 1
+
+    def send(self, messages, keep_tickets=True, cancelled=None):
+        """
+        cancelled (threading.Event) kurulursa kalan partiler gönderilmez, "Cancelled" ticket'ı alır;
+        uçuştaki partiler tamamlanır.
+        """
+        report = PushReport(keep_tickets)
+        batches = enumerate(list(chunked(messages)))
+        pending = {}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="push") as pool:
+            # Bellekte en fazla 2 x concurrency bekleyen iş tutulur
+            def submit_next():
+                item = next(batches, None)
+                while item is not None and cancelled is not None and cancelled.is_set():
+                    order, batch = item
+                    report.add(batch, _error_tickets(len(batch), "Cancelled", "Gönderim iptal edildi"), order)
+                    item = next(batches, None)
+                if item is not None:
+                    pending[pool.submit(self.send_batch, item[1])] = item
+                return item is not None
+
+            for _ in range(self.concurrency * 2):
+                if not submit_next():
+                    break
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    order, batch = pending.pop(future)
+                    tickets, retries = future.result()
+                    report.retries += retries
+                    report.add(batch, tickets, order)
+                    submit_next()
+
+        return report.finish()
+
+
+def send_push_notification(title, message, kind="broadcast"):
+    """Acil durum bildirimini açık ve sessiz modda olmayan herkese kuyruğa alır; push_worker.py gönderir."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        # Get user notification tokens and settings
-        cursor.execute("""
-            SELECT nt.expo_token, ns.emergency, ns.silent_mode
-            FROM notification_tokens nt
-            JOIN notification_settings ns ON nt.user_id = ns.user_id
-        """)
-        users = cursor.fetchall()
-        conn.close()
-
-        # Filter users to be notified
-        tokens = []
-        for user in users:
-            if user["expo_token"] and user["emergency"] and not user["silent_mode"]:
-                tokens.append(user["expo_token"])
-
-        # Send notification
-        for token in tokens:
-            payload = {
-                "to": token,
-                "sound": "default",
-                "title": title,
-                "body": message,
-                "priority": "high",
-            }
-
-            response = requests.post(EXPO_PUSH_URL, json=payload)
-            print(f"[Push] Sent to: {token} | Status: {response.status_code}")
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            # Acil kitle kuyruğa alma anında veritabanından okunur (diğer worker'ların yazımları dahil)
+            tokens = emergency_tokens(cursor)
+            job_id, _ = create_push_job(cursor, kind, title, message, lane="emergency")
+            queued = enqueue_tokens(cursor, job_id, tokens)
+            conn.commit()
+
+        print(f"[Push] İş #{job_id} kuyruğa alındı ({queued} alıcı)")
+        return job_id
 
     except Exception as e:
         print(f"[Push Error] {e}")
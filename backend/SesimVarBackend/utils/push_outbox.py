@@ -0,0 +1,364 @@
+# utils/push_outbox.py
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+from utils.audience import all_tokens, emergency_tokens
+from utils.push_tokens import delete_tokens
+
+# 📬 Outbox ayarları. Kira gönderim sürerken PUSH_LEASE_SECONDS / 3'te bir yenilenir (push_worker.LeaseRenewer);
+# tek bir partinin en kötü süresi (tekrar denemeler + zaman aşımları) kiradan uzun olabilir
+PUSH_LEASE_SECONDS = int(os.getenv("PUSH_LEASE_SECONDS", "60"))
+PUSH_MAX_ATTEMPTS = int(os.getenv("PUSH_MAX_ATTEMPTS", "6"))
+PUSH_RETRY_BASE_SECONDS = int(os.getenv("PUSH_RETRY_BASE_SECONDS", "5"))
+PUSH_RETRY_MAX_SECONDS = 15 * 60
+
+# 🚦 Öncelik şeritleri: bağımsız eşzamanlılık bütçesi ve kuyruk derinliği (None = sınırsız)
+LANES = ("emergency", "general", "test")
+LANE_CONCURRENCY = {
+    "emergency": int(os.getenv("PUSH_LANE_EMERGENCY_CONCURRENCY", "64")),
+    "general": int(os.getenv("PUSH_LANE_GENERAL_CONCURRENCY", "16")),
+    "test": int(os.getenv("PUSH_LANE_TEST_CONCURRENCY", "4")),
+}
+LANE_MAX_DEPTH = {
+    "emergency": None,
+    "general": int(os.getenv("PUSH_LANE_GENERAL_MAX_DEPTH", "2000000")),
+    "test": int(os.getenv("PUSH_LANE_TEST_MAX_DEPTH", "10000")),
+}
+
+# Tekrar denemenin anlamsız olduğu Expo hataları
+PERMANENT_ERRORS = {"DeviceNotRegistered", "InvalidCredentials", "MessageTooBig", "InvalidProviderToken"}
+
+
+class LaneFull(Exception):
+    pass
+
+
+def _placeholders(n):
+    return ", ".join(["%s"] * n)
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def prune_tokens(cursor, tokens):
+    """Artık kayıtlı olmayan cihazların token'larını siler."""
+    tokens = list(dict.fromkeys(tokens))
+    return delete_tokens(cursor, tokens)
+
+
+def create_push_job(cursor, kind, title, body, dedupe_key=None, lane="general"):
+    """Yeni iş oluşturur. Aynı dedupe_key ile iş zaten varsa (job_id, False) döner."""
+    if dedupe_key:
+        cursor.execute("SELECT id FROM push_jobs WHERE dedupe_key = %s", (dedupe_key,))
+        row = cursor.fetchone()
+        if row:
+            return row[0], False
+
+    cursor.execute("""
+        INSERT INTO push_jobs (kind, title, body, dedupe_key, lane)
+        VALUES (%s, %s, %s, %s, %s)
+    """, (kind, title, body, dedupe_key, lane))
+    return cursor.lastrowid, True
+
+
+def create_deferred_job(cursor, kind, title, body, target, lane="general"):
+    """
+    Token'ları istek içinde değil push_worker'da eklenecek iş. target: {"neighborhood_ids": [...]}
+    (o mahallelerdeki acil kitle) veya {} (tüm token'lar). Döner: job_id.
+    """
+    cursor.execute("""
+        INSERT INTO push_jobs (kind, title, body, lane, audience, expand_status)
+        VALUES (%s, %s, %s, %s, %s, 'pending')
+    """, (kind, title, body, lane, json.dumps(target)))
+    return cursor.lastrowid
+
+
+def resolve_target(cursor, target):
+    if target.get("neighborhood_ids") is not None:
+        return emergency_tokens(cursor, target["neighborhood_ids"])
+    return all_tokens(cursor)
+
+
+def expand_pending_job(conn):
+    """
+    Bekleyen bir işi kilitleyip (SKIP LOCKED) kitlesini çözer ve kuyruğa ekler; tek işlem.
+    Döner: (job_id, eklenen) veya bekleyen iş yoksa None.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, audience FROM push_jobs
+        WHERE expand_status = 'pending'
+        ORDER BY id
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    """)
+    row = cursor.fetchone()
+    if row is None:
+        conn.commit()
+        return None
+
+    job_id, target = row
+    try:
+        queued = enqueue_tokens(cursor, job_id, resolve_target(cursor, json.loads(target or "{}")))
+    except LaneFull as e:
+        conn.rollback()
+        cursor.execute("""
+            UPDATE push_jobs SET expand_status = 'failed', expand_error = %s WHERE id = %s
+        """, (str(e)[:255], job_id))
+        conn.commit()
+        return job_id, 0
+
+    cursor.execute("UPDATE push_jobs SET expand_status = 'done' WHERE id = %s", (job_id,))
+    conn.commit()
+    return job_id, queued
+
+
+def lane_depth(cursor, lane):
+    cursor.execute("SELECT COUNT(*) FROM push_messages WHERE status = 'pending' AND lane = %s", (lane,))
+    return cursor.fetchone()[0]
+
+
+def enqueue_tokens(cursor, job_id, tokens, delay_seconds=0):
+    """İşin şeridine token'ları ekler. Şerit derinlik sınırını aşacaksa LaneFull fırlatır."""
+    cursor.execute("SELECT lane FROM push_jobs WHERE id = %s", (job_id,))
+    lane = cursor.fetchone()[0]
+
+    rows = [(job_id, token, lane, delay_seconds) for token in dict.fromkeys(tokens) if token]
+    max_depth = LANE_MAX_DEPTH[lane]
+    if max_depth is not None and lane_depth(cursor, lane) + len(rows) > max_depth:
+        raise LaneFull(f"'{lane}' şeridi dolu (sınır {max_depth})")
+
+    for batch in chunked(rows, 1000):
+        cursor.executemany("""
+            INSERT IGNORE INTO push_messages (job_id, token, lane, next_attempt_at)
+            VALUES (%s, %s, %s, NOW(3) + INTERVAL %s SECOND)
+        """, batch)
+    cursor.execute("UPDATE push_jobs SET total = total + %s WHERE id = %s", (len(rows), job_id))
+    return len(rows)
+
+
+def emergency_due(conn):
+    """Gönderilmeyi bekleyen acil mesaj var mı? (alt şeritler bu durumda bekler)"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT 1 FROM push_messages
+        WHERE status = 'pending' AND lane = 'emergency' AND next_attempt_at <= NOW(3)
+        LIMIT 1
+    """)
+    found = cursor.fetchone() is not None
+    conn.commit()
+    return found
+
+
+def lease_messages(conn, worker_id, limit, lane="emergency"):
+    """Şeritteki zamanı gelmiş mesajları kilitleyip bu worker'a kiralar."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT m.id, m.token, m.attempts, j.title, j.body
+        FROM push_messages m
+        JOIN push_jobs j ON j.id = m.job_id
+        WHERE m.status = 'pending' AND m.lane = %s AND m.next_attempt_at <= NOW(3)
+        ORDER BY m.next_attempt_at
+        LIMIT %s
+        FOR UPDATE OF m SKIP LOCKED
+    """, (lane, limit))
+    rows = cursor.fetchall()
+
+    if rows:
+        ids = [r["id"] for r in rows]
+        cursor.execute(f"""
+            UPDATE push_messages
+            SET lease_owner = %s,
+                attempts = attempts + 1,
+                next_attempt_at = NOW(3) + INTERVAL %s SECOND
+            WHERE id IN ({_placeholders(len(ids))})
+        """, (worker_id, PUSH_LEASE_SECONDS, *ids))
+    conn.commit()
+
+    for r in rows:
+        r["attempts"] += 1
+    return rows
+
+
+def renew_lease(conn, worker_id, ids):
+    """Gönderimi süren satırların kirasını uzatır. Döner: kirası hâlâ bu worker'da olan satır sayısı."""
+    cursor = conn.cursor()
+    kept = 0
+    for batch in chunked(ids, 500):
+        cursor.execute(f"""
+            UPDATE push_messages
+            SET next_attempt_at = NOW(3) + INTERVAL %s SECOND
+            WHERE id IN ({_placeholders(len(batch))}) AND lease_owner = %s AND status = 'pending'
+        """, (PUSH_LEASE_SECONDS, *batch, worker_id))
+        kept += cursor.rowcount
+    conn.commit()
+    return kept
+
+
+def _retry_delay(attempts):
+    return min(PUSH_RETRY_BASE_SECONDS * (2 ** (attempts - 1)), PUSH_RETRY_MAX_SECONDS)
+
+
+def record_results(conn, worker_id, rows, tickets):
+    """
+    Gönderim sonuçlarını yazar. Yalnızca kirası hâlâ bu worker'da olan satırlar güncellenir;
+    böylece kirası dolup başka worker'a geçmiş mesaj iki kez işaretlenmez.
+    """
+    sent, failed, retry, dead, unregistered = [], [], [], [], []
+    for row, ticket in zip(rows, tickets):
+        if ticket.get("status") == "ok":
+            sent.append((row["id"], ticket.get("id")))
+            continue
+
+        error = (ticket.get("details") or {}).get("error") or "Unknown"
+        reason = f"{error}: {ticket.get('message', '')}"[:255]
+        if error == "DeviceNotRegistered":
+            unregistered.append(row["token"])
+        if error in PERMANENT_ERRORS:
+            failed.append((row["id"], reason))
+        elif row["attempts"] >= PUSH_MAX_ATTEMPTS:
+            dead.append((row["id"], reason))
+        else:
+            retry.append((row["id"], reason, _retry_delay(row["attempts"])))
+
+    cursor = conn.cursor()
+    for batch in chunked(sent, 500):
+        ids = [i for i, _ in batch]
+        cursor.execute(f"""
+            UPDATE push_messages
+            SET status = 'sent',
+                sent_at = NOW(3),
+                lease_owner = NULL,
+                ticket_id = CASE id {" ".join(["WHEN %s THEN %s"] * len(batch))} END
+            WHERE id IN ({_placeholders(len(ids))}) AND lease_owner = %s AND status = 'pending'
+        """, (*[v for pair in batch for v in pair], *ids, worker_id))
+
+    for status, items in (("failed", failed), ("dead", dead)):
+        for batch in chunked(items, 500):
+            ids = [i for i, _ in batch]
+            cursor.execute(f"""
+                UPDATE push_messages
+                SET status = %s,
+                    lease_owner = NULL,
+                    last_error = CASE id {" ".join(["WHEN %s THEN %s"] * len(batch))} END
+                WHERE id IN ({_placeholders(len(ids))}) AND lease_owner = %s AND status = 'pending'
+            """, (status, *[v for pair in batch for v in pair], *ids, worker_id))
+
+    if retry:
+        cursor.executemany("""
+            UPDATE push_messages
+            SET lease_owner = NULL,
+                last_error = %s,
+                next_attempt_at = NOW(3) + INTERVAL %s SECOND
+            WHERE id = %s AND lease_owner = %s AND status = 'pending'
+        """, [(reason, delay, msg_id, worker_id) for msg_id, reason, delay in retry])
+
+    pruned = prune_tokens(cursor, unregistered) if unregistered else 0
+
+    conn.commit()
+    return {"sent": len(sent), "failed": len(failed), "retry": len(retry), "dead": len(dead), "pruned": pruned}
+
+
+def outbox_stats(conn):
+    """Şerit başına derinlik, en eski bekleyen mesajın yaşı ve son 1 dk'lık gönderim hızı."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT status, lane, COUNT(*) AS count
+        FROM push_messages
+        GROUP BY status, lane
+    """)
+    counts = {(r["status"], r["lane"]): r["count"] for r in cursor.fetchall()}
+
+    lanes = {}
+    for lane in LANES:
+        cursor.execute("""
+            SELECT TIMESTAMPDIFF(SECOND, MIN(j.created_at), NOW(3)) AS oldest_pending_sec
+            FROM push_messages m
+            JOIN push_jobs j ON j.id = m.job_id
+            WHERE m.status = 'pending' AND m.lane = %s
+        """, (lane,))
+        oldest = cursor.fetchone()["oldest_pending_sec"]
+
+        cursor.execute("""
+            SELECT COUNT(*) AS sent_last_min
+            FROM push_messages
+            WHERE lane = %s AND sent_at >= NOW(3) - INTERVAL 60 SECOND
+        """, (lane,))
+        sent_last_min = cursor.fetchone()["sent_last_min"]
+
+        lanes[lane] = {
+            "depth": counts.get(("pending", lane), 0),
+            "max_depth": LANE_MAX_DEPTH[lane],
+            "concurrency": LANE_CONCURRENCY[lane],
+            "oldest_pending_sec": oldest,
+            "sent_per_sec": round(sent_last_min / 60, 1),
+            "sent": counts.get(("sent", lane), 0),
+            "failed": counts.get(("failed", lane), 0),
+            "dead": counts.get(("dead", lane), 0),
+        }
+    return lanes
+
+
+def job_progress(conn, job_id):
+    """Tek bir işin ilerlemesi: durum sayaçları, gönderim hızı, tahmini bitiş ve hata özeti. İş yoksa None."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT id, kind, lane, total, created_at, expand_status, expand_error,
+               TIMESTAMPDIFF(MICROSECOND, created_at, NOW(3)) / 1e6 AS age_sec
+        FROM push_jobs WHERE id = %s
+    """, (job_id,))
+    job = cursor.fetchone()
+    if not job:
+        return None
+
+    cursor.execute("""
+        SELECT status, COUNT(*) AS count,
+               TIMESTAMPDIFF(MICROSECOND, %s, MAX(sent_at)) / 1e6 AS span_sec
+        FROM push_messages
+        WHERE job_id = %s
+        GROUP BY status
+    """, (job["created_at"], job_id))
+    rows = {r["status"]: r for r in cursor.fetchall()}
+    counts = {status: rows[status]["count"] if status in rows else 0 for status in ("pending", "sent", "failed", "dead")}
+
+    # Hız: ilk gönderimden değil işin oluşturulmasından son başarılı gönderime kadar
+    span = float(rows["sent"]["span_sec"] or 0) if "sent" in rows else 0.0
+    rate = counts["sent"] / span if span > 0 else 0.0
+    eta = round(counts["pending"] / rate, 1) if rate and counts["pending"] else (0.0 if not counts["pending"] else None)
+
+    # Hata özeti: last_error "Kod: açıklama" biçiminde, koda göre gruplanır
+    cursor.execute("""
+        SELECT SUBSTRING_INDEX(last_error, ':', 1) AS error, COUNT(*) AS count
+        FROM push_messages
+        WHERE job_id = %s AND status IN ('failed', 'dead')
+        GROUP BY error
+        ORDER BY count DESC
+        LIMIT 10
+    """, (job_id,))
+    errors = {r["error"] or "Unknown": r["count"] for r in cursor.fetchall()}
+
+    # Genişletilmeyi bekleyen iş: "queued"; şerit doluydu: "failed"
+    if job["expand_status"] == "pending":
+        state = "queued"
+    elif job["expand_status"] == "failed":
+        state = "failed"
+    else:
+        state = "running" if counts["pending"] else "done"
+
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "lane": job["lane"],
+        "state": state,
+        "expand_error": job["expand_error"],
+        "queued": job["total"],
+        **counts,
+        "elapsed_sec": round(float(job["age_sec"]), 1),
+        "messages_per_sec": round(rate, 1),
+        "eta_sec": eta,
+        "errors": errors,
+    }
@@ -0,0 +1,147 @@
+# utils/push_receipts.py
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+import requests
+from db import db_connection
+from utils.notifications import get_session, EXPO_TIMEOUT
+from utils.push_outbox import prune_tokens, chunked
+
+EXPO_RECEIPTS_URL = os.getenv("EXPO_RECEIPTS_URL", "https://exp.host/--/api/v2/push/getReceipts")
+# Expo tek istekte en fazla 1000 receipt id kabul eder
+RECEIPT_BATCH_SIZE = 1000
+# Expo receipt'leri ~15 dk içinde hazırlar, 24 saat saklar
+RECEIPT_DELAY_MINUTES = int(os.getenv("RECEIPT_DELAY_MINUTES", "15"))
+RECEIPT_TTL_HOURS = 24
+
+
+def fetch_receipts(ticket_ids, session=None):
+    session = session or get_session()
+    response = session.post(EXPO_RECEIPTS_URL, json={"ids": ticket_ids}, timeout=EXPO_TIMEOUT)
+    response.raise_for_status()
+    return response.json().get("data") or {}
+
+
+def poll_receipts(max_batches=50):
+    """
+    Receipt'i henüz kontrol edilmemiş gönderimleri 1000'erli sorgular.
+    DeviceNotRegistered dönen token'lar silinir. Döner: özet sayaçlar.
+    """
+    summary = {"checked": 0, "ok": 0, "errors": 0, "unregistered": 0, "pruned": 0, "expired": 0}
+    started = time.perf_counter()
+
+    with db_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+
+        # 24 saati geçmiş, artık sorgulanamayan ticket'lar
+        cursor.execute("""
+            UPDATE push_messages
+            SET receipt_checked_at = NOW(3), receipt_error = 'Expired'
+            WHERE status = 'sent' AND receipt_checked_at IS NULL
+              AND sent_at < NOW(3) - INTERVAL %s HOUR
+        """, (RECEIPT_TTL_HOURS,))
+        summary["expired"] = cursor.rowcount
+        conn.commit()
+
+        last_id = 0
+        for _ in range(max_batches):
+            cursor.execute("""
+                SELECT id, token, ticket_id
+                FROM push_messages
+                WHERE status = 'sent' AND receipt_checked_at IS NULL AND id > %s
+                  AND ticket_id IS NOT NULL
+                  AND sent_at <= NOW(3) - INTERVAL %s MINUTE
+                ORDER BY id
+                LIMIT %s
+            """, (last_id, RECEIPT_DELAY_MINUTES, RECEIPT_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+
+            try:
+                receipts = fetch_receipts([r["ticket_id"] for r in rows])
+            except (requests.RequestException, ValueError) as e:
+                print(f"[RECEIPTS ERROR] {e}")
+                break
+
+            checked, unregistered = [], []
+            for row in rows:
+                receipt = receipts.get(row["ticket_id"])
+                if receipt is None:
+                    # Henüz hazır değil; sonraki turda tekrar sorgulanır
+                    continue
+                error = None
+                if receipt.get("status") != "ok":
+                    error = ((receipt.get("details") or {}).get("error") or "Unknown")[:64]
+                    if error == "DeviceNotRegistered":
+                        unregistered.append(row["token"])
+                checked.append((row["id"], error))
+
+            for batch in chunked(checked, 500):
+                ids = [i for i, _ in batch]
+                cursor.execute(f"""
+                    UPDATE push_messages
+                    SET receipt_checked_at = NOW(3),
+                        receipt_error = CASE id {" ".join(["WHEN %s THEN %s"] * len(batch))} END
+                    WHERE id IN ({", ".join(["%s"] * len(ids))})
+                """, (*[v for pair in batch for v in pair], *ids))
+
+            if unregistered:
+                summary["pruned"] += prune_tokens(cursor, unregistered)
+            conn.commit()
+
+            summary["checked"] += len(checked)
+            summary["errors"] += sum(1 for _, error in checked if error)
+            summary["ok"] += sum(1 for _, error in checked if not error)
+            summary["unregistered"] += len(unregistered)
+
+    summary["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    print(f"[RECEIPTS] {summary}")
+    return summary
+
+
+def audience_metrics(conn, recent_jobs=20):
+    """Son işlerin hedef kitle büyüklüğü ve kayıtsız cihaza giden (boşa) gönderim sayıları."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT COUNT(*) AS registered_tokens
+        FROM push_tokens
+    """)
+    registered = cursor.fetchone()["registered_tokens"]
+
+    cursor.execute("""
+        SELECT id, kind, total, created_at
+        FROM push_jobs
+        ORDER BY id DESC
+        LIMIT %s
+    """, (recent_jobs,))
+    jobs = cursor.fetchall()
+
+    wasted = {}
+    if jobs:
+        ids = [j["id"] for j in jobs]
+        cursor.execute(f"""
+            SELECT job_id, COUNT(*) AS wasted
+            FROM push_messages
+            WHERE job_id IN ({", ".join(["%s"] * len(ids))})
+              AND (receipt_error = 'DeviceNotRegistered' OR last_error LIKE 'DeviceNotRegistered%%')
+            GROUP BY job_id
+        """, ids)
+        wasted = {r["job_id"]: r["wasted"] for r in cursor.fetchall()}
+
+    return {
+        "registered_tokens": registered,
+        "jobs": [
+            {
+                "job_id": j["id"],
+                "kind": j["kind"],
+                "fanout": j["total"],
+                "wasted": wasted.get(j["id"], 0),
+                "created_at": j["created_at"].strftime("%Y-%m-%d %H:%M:%S") if j["created_at"] else None,
+            }
+            for j in jobs
+        ],
+    }
@@ -0,0 +1,37 @@
+# utils/push_tokens.py
+# -*- coding: utf-8 -*-
+
+
+def register_token(cursor, user_id, token, device_id=None):
+    """
+    Token'ı tek kayıt tablosuna yazar (token benzersiz; başka kullanıcıdaysa bu kullanıcıya geçer).
+    device_id verilirse aynı cihazın eski token'ları silinir. Döner: silinen eski token'lar.
+    """
+    replaced = []
+    if device_id:
+        cursor.execute("""
+            SELECT token FROM push_tokens
+            WHERE user_id = %s AND device_id = %s AND token <> %s
+        """, (user_id, device_id, token))
+        replaced = [row[0] for row in cursor.fetchall()]
+        if replaced:
+            cursor.execute(f"DELETE FROM push_tokens WHERE token IN ({', '.join(['%s'] * len(replaced))})", replaced)
+
+    cursor.execute("""
+        INSERT INTO push_tokens (user_id, token, device_id)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            user_id = VALUES(user_id),
+            device_id = COALESCE(VALUES(device_id), device_id),
+            last_seen_at = NOW()
+    """, (user_id, token, device_id))
+    return replaced
+
+
+def delete_tokens(cursor, tokens):
+    removed = 0
+    for i in range(0, len(tokens), 500):
+        batch = tokens[i:i + 500]
+        cursor.execute(f"DELETE FROM push_tokens WHERE token IN ({', '.join(['%s'] * len(batch))})", batch)
+        removed += cursor.rowcount
+    return removed
@@ -0,0 +1,119 @@
+# utils/risk_matcher.py
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import re
+
+# Terim → ağırlık. Toplam ağırlık RISK_CRITICAL_SCORE'a ulaşırsa çağrı "kritik" sayılır.
+# RISK_LEXICON_PATH ile aynı biçimde bir JSON dosyası verilirse varsayılanın yerine geçer.
+DEFAULT_LEXICON = {
+    "enkaz": 3,
+    "yangın": 3,
+    "nefes": 3,
+    "kan": 3,
+    "yaralı": 3,
+    "çökme": 3,
+    "sıkıştım": 3,
+    "göçük": 3,
+    "mahsur": 3,
+    "bilinci": 3,
+    "gaz kaçağı": 3,
+    "kırık": 2,
+    "bebek": 1,
+    "çocuk": 1,
+    "yaşlı": 1,
+    "acil": 1,
+}
+RISK_LEXICON_PATH = os.getenv("RISK_LEXICON_PATH", "")
+RISK_CRITICAL_SCORE = float(os.getenv("RISK_CRITICAL_SCORE", "3"))
+
+# Türkçe büyük/küçük harf: İ→i, I→ı (str.lower() "I"yı "i" yapar, "İ"yi "i̇" yapar)
+_TR_UPPER = str.maketrans({"İ": "i", "I": "ı"})
+# Klavyesiz/Latin yazılmış mesajlar için aksanlar düşürülür: "yangin" = "yangın"
+_DIACRITICS = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_SPACES = re.compile(r"\s+")
+# Katlanmış harfin mesajda karşılık gelebileceği tüm biçimler (büyük/küçük, aksanlı/aksansız)
+_VARIANTS = {"a": "aâAÂ", "c": "cçCÇ", "g": "gğGĞ", "i": "iıîIİÎ", "o": "oöOÖ", "s": "sşSŞ", "u": "uüûUÜÛ"}
+
+
+def fold(text):
+    """Türkçe kurallarıyla küçült, aksanları kaldır, boşlukları tekle."""
+    return _SPACES.sub(" ", (text or "").translate(_TR_UPPER).lower().translate(_DIACRITICS)).strip()
+
+
+def load_lexicon(path=RISK_LEXICON_PATH):
+    if not path:
+        return dict(DEFAULT_LEXICON)
+    with open(path, encoding="utf-8") as f:
+        return {term: float(weight) for term, weight in json.load(f).items()}
+
+
+def _term_pattern(term):
+    parts = []
+    for ch in term:
+        if ch == " ":
+            parts.append(r"\s+")
+        else:
+            variants = _VARIANTS.get(ch, ch + ch.upper())
+            parts.append(f"[{re.escape(variants)}]" if len(variants) > 1 else re.escape(ch))
+    return "".join(parts)
+
+
+class RiskMatcher:
+    """
+    Sözlükteki tüm terimler tek bir derlenmiş düzenli ifadede birleştirilir; mesaj tek geçişte taranır.
+    Harf katlama ifadenin içindedir (her harf için karakter sınıfı), mesajın tamamı dönüştürülmez;
+    yalnızca eşleşen parçalar fold() ile sözlük anahtarına çevrilir.
+    Terimler kelime başında eşleşir ("kan" → "kanama" evet, "yakan" hayır), böylece Türkçe ekler yakalanır.
+    """
+
+    def __init__(self, lexicon=None, critical_score=RISK_CRITICAL_SCORE):
+        lexicon = lexicon if lexicon is not None else load_lexicon()
+        self.critical_score = critical_score
+        self.weights = {}
+        self.terms = {}
+        for term, weight in lexicon.items():
+            key = fold(term)
+            if key:
+                self.weights[key] = max(weight, self.weights.get(key, 0))
+                self.terms.setdefault(key, term)
+
+        # Uzun terimler önce: "gaz kacagi" ile "gaz" çakışırsa uzun olan kazanır
+        alternatives = "|".join(_term_pattern(t) for t in sorted(self.weights, key=len, reverse=True))
+        self._pattern = re.compile(rf"(?<!\w)(?:{alternatives})") if alternatives else None
+
+    def match(self, message):
+        """Döner: (skor, eşleşen terimler). Her terim bir kez sayılır."""
+        if self._pattern is None:
+            return 0, []
+        found = dict.fromkeys(fold(m) for m in self._pattern.findall(message or ""))
+        return sum(self.weights[t] for t in found), [self.terms[t] for t in found]
+
+    def assess(self, message):
+        score, terms = self.match(message)
+        return {
+            "level": "kritik" if score >= self.critical_score else "orta",
+            "score": score,
+            "terms": terms,
+        }
+
+    def assess_many(self, messages):
+        return [self.assess(m) for m in messages]
+
+
+_matcher = None
+
+
+def get_matcher():
+    global _matcher
+    if _matcher is None:
+        _matcher = RiskMatcher()
+    return _matcher
+
+
+def reload_matcher(lexicon=None):
+    """Sözlük değiştiğinde derlenmiş ifadeyi yeniden kurar."""
+    global _matcher
+    _matcher = RiskMatcher(lexicon)
+    return _matcher
@@ -0,0 +1,131 @@
+# utils/risk_recompute.py
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+from db import db_connection
+from utils.geo import cell_of, neighbor_cells
+from utils.heatmap import WINDOWS, ZONE_RISK_WINDOW, zone_risk_level
+from utils.risk_matcher import get_matcher
+
+# Aktif çağrılar bu boyutta parçalarla okunur ve yazılır (her parça kendi transaction'ında)
+RISK_RECOMPUTE_CHUNK = int(os.getenv("RISK_RECOMPUTE_CHUNK", "5000"))
+RISK_RECOMPUTE_SECONDS = int(os.getenv("RISK_RECOMPUTE_SECONDS", "300"))
+
+
+def window_cell_counts(conn, window_sec):
+    """Penceredeki çağrı sayısı, hücre başına; tek GROUP BY sorgusu (created_at indeksi)."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT cell_id, COUNT(*)
+        FROM help_requests
+        WHERE created_at >= NOW() - INTERVAL %s SECOND AND cell_id IS NOT NULL
+        GROUP BY cell_id
+    """, (window_sec,))
+    return dict(cursor.fetchall())
+
+
+class ZoneGrid:
+    """Hücre sayaçlarından bölge riski; aynı hücrenin komşu toplamı bir kez hesaplanır."""
+
+    def __init__(self, cell_counts):
+        self.cell_counts = cell_counts
+        self._levels = {}
+
+    def level(self, cell_id):
+        level = self._levels.get(cell_id)
+        if level is None:
+            counts = self.cell_counts
+            level = self._levels[cell_id] = zone_risk_level(sum(counts.get(c, 0) for c in neighbor_cells(cell_id)))
+        return level
+
+
+def recompute_rows(rows, grid, matcher):
+    """
+    rows: (id, cell_id, enlem, boylam, mesaj, user_risk, zone_risk, repeat_count).
+    Döner: değişen satırlar için (id, eski user_risk, yeni user_risk, eski zone_risk, yeni zone_risk).
+    Tekrar basılmış çağrılarda kullanıcı riski düşürülmez (birleştirmedeki kural).
+    """
+    assessed = matcher.assess_many([row[4] for row in rows])
+    changes = []
+    for row, assessment in zip(rows, assessed):
+        help_id, cell_id, latitude, longitude, _, user_risk, zone_risk, repeat_count = row
+        if cell_id is None:
+            cell_id = cell_of(latitude, longitude)
+        new_zone = grid.level(cell_id)
+        new_user = assessment["level"]
+        if repeat_count and user_risk == "kritik":
+            new_user = user_risk
+        if new_zone != zone_risk or new_user != user_risk:
+            changes.append((help_id, user_risk, new_user, zone_risk, new_zone))
+    return changes
+
+
+def apply_changes(cursor, changes):
+    """
+    Tek UPDATE ... CASE ile parçayı yazar. Her değer okunduğu haliyle karşılaştırılır;
+    arada istek üzerinden değişen satırın yeni değeri ezilmez.
+    """
+    if not changes:
+        return 0
+    user_cases, zone_cases, params_user, params_zone, ids = [], [], [], [], []
+    for help_id, old_user, new_user, old_zone, new_zone in changes:
+        user_cases.append("WHEN %s THEN IF(user_risk = %s, %s, user_risk)")
+        params_user += [help_id, old_user, new_user]
+        zone_cases.append("WHEN %s THEN IF(zone_risk = %s, %s, zone_risk)")
+        params_zone += [help_id, old_zone, new_zone]
+        ids.append(help_id)
+    cursor.execute(f"""
+        UPDATE help_requests
+        SET user_risk = CASE id {" ".join(user_cases)} ELSE user_risk END,
+            zone_risk = CASE id {" ".join(zone_cases)} ELSE zone_risk END
+        WHERE id IN ({", ".join(["%s"] * len(ids))}) AND status = 'aktif'
+    """, params_user + params_zone + ids)
+    return cursor.rowcount
+
+
+def recompute_risks(chunk_size=RISK_RECOMPUTE_CHUNK, window=ZONE_RISK_WINDOW):
+    """
+    Aktif çağrıların bölge ve kullanıcı riskini yeniden hesaplar. Ekleme anında donmuş zone_risk,
+    bölge sonradan yoğunlaştığında güncellenir; sözlük değiştiğinde user_risk de yeniden sınıflanır.
+    Satır başına sorgu yoktur: pencere sayaçları tek sorguda alınır, çağrılar id sırasıyla parça parça
+    okunur, değişenler parça başına tek UPDATE ile yazılır.
+    Izgara sayımı NumPy yerine sözlük + hücre başına önbellekle yapılır (NumPy bağımlılık değil);
+    süre sözlük eşleştirmesinde geçer, ızgara 1M satırda saniyenin altındadır
+    (scripts/bench_risk_recompute.py).
+    """
+    started = time.perf_counter()
+    summary = {"scanned": 0, "changed": 0, "updated": 0}
+    matcher = get_matcher()
+
+    with db_connection() as conn:
+        grid = ZoneGrid(window_cell_counts(conn, WINDOWS[window]))
+        conn.commit()
+
+        cursor = conn.cursor()
+        last_id = 0
+        while True:
+            cursor.execute("""
+                SELECT id, cell_id, latitude, longitude, message, user_risk, zone_risk, repeat_count
+                FROM help_requests
+                WHERE id > %s AND status = 'aktif'
+                ORDER BY id
+                LIMIT %s
+            """, (last_id, chunk_size))
+            rows = cursor.fetchall()
+            if not rows:
+                conn.commit()
+                break
+            last_id = rows[-1][0]
+
+            changes = recompute_rows(rows, grid, matcher)
+            summary["updated"] += apply_changes(cursor, changes)
+            conn.commit()
+            summary["scanned"] += len(rows)
+            summary["changed"] += len(changes)
+
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    print(f"[RISK RECOMPUTE] {summary['scanned']} çağrı tarandı, {summary['updated']} güncellendi "
+          f"({summary['seconds']} sn).")
+    return summary
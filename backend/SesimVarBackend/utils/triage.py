@@ -0,0 +1,94 @@
+# utils/triage.py
+# -*- coding: utf-8 -*-
+
+import os
+
+from utils.user_status import set_help_status
+
+# Sahiplenilen çağrı bu süre içinde yenilenmez veya kapatılmazsa kuyruğa geri döner
+TRIAGE_LEASE_SECONDS = int(os.getenv("TRIAGE_LEASE_SECONDS", "900"))
+TRIAGE_MAX_CLAIM = 20
+
+# Kuyruk: aktif, sahipsiz (veya kirası dolmuş) çağrılar; kritik → bölge riski → en eski
+_QUEUE_SQL = """
+    SELECT id, message, latitude, longitude, zone_risk, user_risk, triage_priority, created_at
+    FROM help_requests
+    WHERE status = 'aktif' AND (claim_expires_at IS NULL OR claim_expires_at < NOW(3))
+    ORDER BY triage_priority DESC, created_at, id
+    LIMIT %s
+"""
+
+
+def _format(row):
+    return {
+        "id": row["id"],
+        "message": row["message"],
+        "latitude": float(row["latitude"]),
+        "longitude": float(row["longitude"]),
+        "zone_risk": row["zone_risk"],
+        "user_risk": row["user_risk"],
+        "priority": row["triage_priority"],
+        "created_at": row["created_at"].strftime("%Y-%m-%d %H:%M:%S") if row["created_at"] else None,
+    }
+
+
+def peek_queue(conn, limit):
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(_QUEUE_SQL, (limit,))
+    return [_format(row) for row in cursor.fetchall()]
+
+
+def claim_calls(conn, team, count=1, lease_seconds=TRIAGE_LEASE_SECONDS):
+    """
+    Kuyruğun başındaki çağrıları ekibe kiralar. SKIP LOCKED sayesinde aynı anda sahiplenen
+    iki ekip aynı satırı alamaz, birbirini de beklemez.
+    """
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(_QUEUE_SQL.replace("LIMIT %s", "LIMIT %s FOR UPDATE SKIP LOCKED"), (count,))
+    rows = cursor.fetchall()
+    if rows:
+        ids = [row["id"] for row in rows]
+        cursor.execute(f"""
+            UPDATE help_requests
+            SET claimed_by = %s, claim_expires_at = NOW(3) + INTERVAL %s SECOND
+            WHERE id IN ({", ".join(["%s"] * len(ids))})
+        """, (team, lease_seconds, *ids))
+    conn.commit()
+    return [_format(row) for row in rows]
+
+
+def renew_claim(conn, help_id, team, lease_seconds=TRIAGE_LEASE_SECONDS):
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE help_requests
+        SET claim_expires_at = NOW(3) + INTERVAL %s SECOND
+        WHERE id = %s AND claimed_by = %s AND claim_expires_at >= NOW(3) AND status = 'aktif'
+    """, (lease_seconds, help_id, team))
+    conn.commit()
+    return cursor.rowcount == 1
+
+
+def release_claim(conn, help_id, team):
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE help_requests
+        SET claimed_by = NULL, claim_expires_at = NULL
+        WHERE id = %s AND claimed_by = %s
+    """, (help_id, team))
+    conn.commit()
+    return cursor.rowcount == 1
+
+
+def resolve_call(conn, help_id, team, status):
+    """Ekibin kirası geçerliyken çağrıyı kapatır (tamamlandı / iptal)."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE help_requests
+        SET status = %s, claim_expires_at = NULL
+        WHERE id = %s AND claimed_by = %s AND claim_expires_at >= NOW(3) AND status = 'aktif'
+    """, (status, help_id, team))
+    resolved = cursor.rowcount == 1
+    if resolved:
+        set_help_status(cursor, help_id, status)
+    conn.commit()
+    return resolved
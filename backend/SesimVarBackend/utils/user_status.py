@@ -0,0 +1,84 @@
+# utils/user_status.py
+# -*- coding: utf-8 -*-
+
+# 👤 Kullanıcı başına güncel durum (user_current_status). Yazan istek kendi işleminde çağırır;
+# commit çağırana aittir. Sıra dışı gelen yazımlar (toplu yazım, eşzamanlı istek) daha yeni
+# kaydı ezmesin diye güncellemeler zamana / id'ye göre koşulludur.
+# MySQL ON DUPLICATE KEY UPDATE atamaları soldan sağa uygular: koşul sütunu en sona yazılır.
+
+STATUS_LOOKUP_MAX = 500
+
+
+def record_safe(cursor, rows):
+    """rows: (user_id, enlem, boylam, zaman). Zaman None ise NOW(). Kullanıcı başına en yenisi yazılır."""
+    latest = {}
+    for user_id, latitude, longitude, at in rows:
+        latest[user_id] = (user_id, latitude, longitude, at)
+    if not latest:
+        return
+    cursor.execute(f"""
+        INSERT INTO user_current_status (user_id, safe_latitude, safe_longitude, safe_at)
+        VALUES {", ".join(["(%s, %s, %s, COALESCE(%s, NOW()))"] * len(latest))}
+        ON DUPLICATE KEY UPDATE
+            safe_latitude = IF(safe_at IS NULL OR VALUES(safe_at) >= safe_at, VALUES(safe_latitude), safe_latitude),
+            safe_longitude = IF(safe_at IS NULL OR VALUES(safe_at) >= safe_at, VALUES(safe_longitude), safe_longitude),
+            safe_at = IF(safe_at IS NULL OR VALUES(safe_at) >= safe_at, VALUES(safe_at), safe_at)
+    """, [v for row in latest.values() for v in row])
+
+
+def record_help(cursor, user_id, help_id, status, at=None):
+    """Kullanıcının en yeni (en büyük id'li) çağrısı güncel çağrı sayılır."""
+    cursor.execute("""
+        INSERT INTO user_current_status (user_id, help_id, help_status, help_at)
+        VALUES (%s, %s, %s, COALESCE(%s, NOW()))
+        ON DUPLICATE KEY UPDATE
+            help_status = IF(help_id IS NULL OR VALUES(help_id) >= help_id, VALUES(help_status), help_status),
+            help_at = IF(help_id IS NULL OR VALUES(help_id) >= help_id, VALUES(help_at), help_at),
+            help_id = IF(help_id IS NULL OR VALUES(help_id) >= help_id, VALUES(help_id), help_id)
+    """, (user_id, help_id, status, at))
+
+
+def set_help_status(cursor, help_id, status):
+    # Yalnızca güncel çağrı buysa; daha eski bir çağrının kapanması durumu değiştirmez
+    cursor.execute("""
+        UPDATE user_current_status SET help_status = %s, help_at = NOW() WHERE help_id = %s
+    """, (status, help_id))
+
+
+def clear_help(cursor, help_id):
+    cursor.execute("""
+        UPDATE user_current_status SET help_id = NULL, help_status = NULL, help_at = NULL WHERE help_id = %s
+    """, (help_id,))
+
+
+def _format(row):
+    def fmt(value):
+        return value.strftime("%Y-%m-%d %H:%M:%S") if value else None
+
+    return {
+        "user_id": row["user_id"],
+        "safe": {
+            "latitude": float(row["safe_latitude"]),
+            "longitude": float(row["safe_longitude"]),
+            "created_at": fmt(row["safe_at"]),
+        } if row["safe_at"] else None,
+        "help": {
+            "id": row["help_id"],
+            "status": row["help_status"],
+            "updated_at": fmt(row["help_at"]),
+        } if row["help_id"] else None,
+    }
+
+
+def get_statuses(conn, user_ids):
+    """user_id → güncel durum; kaydı olmayan kullanıcılar sonuçta yer almaz. Tek PK sorgusu."""
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return {}
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f"""
+        SELECT user_id, safe_latitude, safe_longitude, safe_at, help_id, help_status, help_at
+        FROM user_current_status
+        WHERE user_id IN ({", ".join(["%s"] * len(user_ids))})
+    """, user_ids)
+    return {row["user_id"]: _format(row) for row in cursor.fetchall()}
@@ -0,0 +1,255 @@
+# utils/write_behind.py
+# -*- coding: utf-8 -*-
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import mysql.connector
+from db import db_connection, PoolTimeout
+from utils.user_status import record_safe
+
+# Açıksa "güvendeyim" istekleri tampona eklenince yanıtlanır, yazım arka planda toplu yapılır
+SAFE_STATUS_WRITE_BEHIND = os.getenv("SAFE_STATUS_WRITE_BEHIND", "0") == "1"
+# Tampon üst sınırı; doluysa istek en fazla SAFE_BUFFER_WAIT_MS bekler, sonra 503 ile geri çevrilir
+SAFE_BUFFER_MAX = int(os.getenv("SAFE_BUFFER_MAX", "20000"))
+SAFE_BUFFER_WAIT_MS = int(os.getenv("SAFE_BUFFER_WAIT_MS", "200"))
+# Bu kadar satır birikince veya ilk satırın üzerinden bu kadar süre geçince yazılır
+SAFE_FLUSH_ROWS = int(os.getenv("SAFE_FLUSH_ROWS", "500"))
+SAFE_FLUSH_MS = int(os.getenv("SAFE_FLUSH_MS", "20"))
+SAFE_FLUSH_RETRY_SEC = 1.0
+# Kalıcı hata alan (ayrılan) son satırlar izleme için tutulur
+SAFE_DEAD_KEEP = 100
+
+_INSERT_SQL = "INSERT INTO safe_status (user_id, latitude, longitude, created_at) VALUES "
+
+
+def validate_safe_row(user_id, latitude, longitude):
+    """Tampona girmeden önce kontrol; geçersizse None. Böylece veritabanının reddedeceği satır kuyruğa girmez."""
+    try:
+        user_id, latitude, longitude = int(user_id), float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None
+    if user_id <= 0 or not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return user_id, latitude, longitude
+
+
+def insert_safe_rows(conn, rows):
+    """
+    rows: (user_id, enlem, boylam, kuyruğa alınma zamanı). Tek çok satırlı INSERT + güncel durum, aynı işlemde.
+    created_at diğer durum yazımlarıyla aynı saatten gelsin diye veritabanının NOW()'ıdır (yazım anı);
+    kuyruk zamanı yalnızca henüz yazılmamış satırı göstermek için kullanılır.
+    """
+    cursor = conn.cursor()
+    cursor.execute(_INSERT_SQL + ", ".join(["(%s, %s, %s, NOW())"] * len(rows)),
+                   [v for row in rows for v in row[:3]])
+    record_safe(cursor, [(user_id, latitude, longitude, None) for user_id, latitude, longitude, _ in rows])
+    conn.commit()
+
+
+def is_transient(error):
+    # Bağlantı/sunucu hataları geçicidir (tekrar denenir); veri hataları satıra özgüdür
+    return isinstance(error, (PoolTimeout, mysql.connector.errors.OperationalError,
+                              mysql.connector.errors.InterfaceError))
+
+
+def _format_row(row):
+    # İzleme çıktısı (JSON) için; demet alan alan, diğer satırlar tek değer olarak
+    return [str(v) for v in row] if isinstance(row, tuple) else str(row)
+
+
+class WriteBehindBuffer:
+    """
+    Sınırlı bellek içi tampon + tek yazıcı iş parçacığı. İstek satırı ekleyip hemen döner;
+    yazıcı SAFE_FLUSH_ROWS satır veya SAFE_FLUSH_MS dolunca tek INSERT ile yazar.
+    Geçici hatada (bağlantı) parti sıranın başına geri konur ve tekrar denenir. Diğer hatalarda
+    parti satır satır yazılır; reddedilen satırlar ayrılır (dead sayacı), diğerlerini bekletmez.
+    Kapanışta (stop / atexit) kalan satırlar yazılır. Süreç çökerse tampondakiler kaybolur;
+    bu yüzden varsayılan kapalıdır.
+    """
+
+    def __init__(self, write, max_rows=SAFE_BUFFER_MAX, flush_rows=SAFE_FLUSH_ROWS, flush_ms=SAFE_FLUSH_MS,
+                 name="write-behind", transient=is_transient):
+        self._write = write
+        self._transient = transient
+        self.max_rows = max_rows
+        self.flush_rows = flush_rows
+        self.flush_sec = flush_ms / 1000
+        self.name = name
+        self._rows = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._oldest = None
+        self._appended = 0
+        self._rejected = 0
+        self._flushed = 0
+        self._batches = 0
+        self._errors = 0
+        self._dead = 0
+        self._dead_rows = deque(maxlen=SAFE_DEAD_KEEP)
+
+    def append(self, row, timeout=SAFE_BUFFER_WAIT_MS / 1000):
+        """Satırı tampona ekler. Tampon timeout içinde boşalmazsa False (geri basınç)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while len(self._rows) >= self.max_rows and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._rejected += 1
+                    return False
+                self._cond.wait(remaining)
+            if self._stopping:
+                self._rejected += 1
+                return False
+            first = not self._rows
+            if first:
+                self._oldest = time.monotonic()
+            self._rows.append(row)
+            self._appended += 1
+            # İlk satır boşta bekleyen yazıcıyı uyandırır (SAFE_FLUSH_MS sayacı başlar)
+            if first or len(self._rows) >= self.flush_rows:
+                self._cond.notify_all()
+        return True
+
+    def pending(self, predicate):
+        """Henüz yazılmamış satırlardan koşula uyanlar (okuma tutarlılığı için)."""
+        with self._cond:
+            return [row for row in self._rows if predicate(row)]
+
+    def _take(self):
+        # Çağıran kilidi tutar
+        batch = [self._rows.popleft() for _ in range(min(self.flush_rows, len(self._rows)))]
+        self._oldest = time.monotonic() if self._rows else None
+        self._cond.notify_all()
+        return batch
+
+    def _put_back(self, batch):
+        with self._cond:
+            self._rows.extendleft(reversed(batch))
+            self._oldest = self._oldest or time.monotonic()
+
+    def _flush_batch(self, batch):
+        """False: geçici hata, satırlar geri kondu (çağıran bekleyip tekrar dener)."""
+        try:
+            self._write(batch)
+        except Exception as e:
+            with self._cond:
+                self._errors += 1
+            print(f"[{self.name.upper()} FLUSH ERROR] {len(batch)} satır: {e}")
+            if self._transient(e):
+                self._put_back(batch)
+                return False
+            return self._flush_each(batch)
+        with self._cond:
+            self._flushed += len(batch)
+            self._batches += 1
+        return True
+
+    def _flush_each(self, batch):
+        # Parti bir satır yüzünden reddedildi: tek tek yaz, kalıcı hatalıları ayır
+        for i, row in enumerate(batch):
+            try:
+                self._write([row])
+            except Exception as e:
+                if self._transient(e):
+                    self._put_back(batch[i:])
+                    return False
+                print(f"[{self.name.upper()} DEAD ROW] {row}: {e}")
+                with self._cond:
+                    self._dead += 1
+                    self._dead_rows.append(row)
+                continue
+            with self._cond:
+                self._flushed += 1
+        with self._cond:
+            self._batches += 1
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        break
+                    if len(self._rows) >= self.flush_rows:
+                        break
+                    if self._rows:
+                        remaining = self._oldest + self.flush_sec - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._stopping and not self._rows:
+                    return
+                batch = self._take()
+
+            if not self._flush_batch(batch):
+                if self._stopping:
+                    return
+                time.sleep(SAFE_FLUSH_RETRY_SEC)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def stop(self, timeout=10):
+        """Yeni satır kabulünü durdurur, kalanları yazar."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        # Yazıcı hata nedeniyle erken çıktıysa son bir deneme
+        while self._rows:
+            with self._cond:
+                batch = self._take()
+            if not self._flush_batch(batch):
+                print(f"[{self.name.upper()}] Kapanışta {len(self._rows)} satır yazılamadı.")
+                break
+
+    def stats(self):
+        with self._cond:
+            return {
+                "enabled": self._thread is not None,
+                "pending": len(self._rows),
+                "max_rows": self.max_rows,
+                "appended": self._appended,
+                "rejected": self._rejected,
+                "flushed": self._flushed,
+                "batches": self._batches,
+                "errors": self._errors,
+                "dead": self._dead,
+                "dead_rows": [_format_row(row) for row in self._dead_rows],
+            }
+
+
+def _write_safe_rows(rows):
+    with db_connection() as conn:
+        insert_safe_rows(conn, rows)
+
+
+safe_status_buffer = WriteBehindBuffer(_write_safe_rows, name="safe-status-writer")
+
+
+def queue_safe_status(user_id, latitude, longitude):
+    """Döner: True (kabul edildi) / False (tampon dolu). Geçersiz satırda ValueError."""
+    row = validate_safe_row(user_id, latitude, longitude)
+    if row is None:
+        raise ValueError("Geçersiz kullanıcı veya konum")
+    return safe_status_buffer.append((*row, datetime.now()))
+
+
+def start_safe_status_writer():
+    if SAFE_STATUS_WRITE_BEHIND:
+        safe_status_buffer.start()
+        print(f"✅ Güvendeyim yazım tamponu açık ({SAFE_FLUSH_ROWS} satır / {SAFE_FLUSH_MS} ms).")